@@ -0,0 +1,117 @@
+import threading
+import unittest
+
+from tsdetect import InMemoryObserver, SimpleDataPoint
+from tsdetect.algorithms import AlgorithmCache, ThresholdAlgorithm, get_cached_algorithm
+from tsdetect.algorithms.ring_ratio import SimpleRingRatioAlgorithm
+from tsdetect.core.exceptions import InvalidAlgorithmConfigError
+
+
+class _Converter:
+    def convert(self, value, unit):
+        return value
+
+
+class _UnhashableConverter(_Converter):
+    __hash__ = None
+
+
+class TestAlgorithmCache(unittest.TestCase):
+    def test_same_config_shares_instance(self):
+        cache = AlgorithmCache()
+        config = [[{"method": "gt", "threshold": 90}]]
+        first = cache.get(ThresholdAlgorithm, config, unit="percent")
+        second = cache.get(ThresholdAlgorithm, [[{"threshold": 90, "method": "gt"}]], unit="percent")
+
+        self.assertIs(first, second)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        self.assertEqual(len(first.detect(SimpleDataPoint(value=95, timestamp=60))), 1)
+
+    def test_distinct_keys(self):
+        cache = AlgorithmCache()
+        base = cache.get(ThresholdAlgorithm, [[{"method": "gt", "threshold": 90}]])
+
+        self.assertIsNot(base, cache.get(ThresholdAlgorithm, [[{"method": "gt", "threshold": 90.0}]]))
+        self.assertIsNot(base, cache.get(ThresholdAlgorithm, [[{"method": "gt", "threshold": 90}]], unit="ms"))
+        self.assertIsNot(base, cache.get(SimpleRingRatioAlgorithm, {"ceil": 90}))
+        self.assertIsNot(
+            base, cache.get(ThresholdAlgorithm, [[{"method": "gt", "threshold": 90}]], unit_converter=object())
+        )
+
+    def test_key_by_value(self):
+        cache = AlgorithmCache()
+        config = [[{"method": "gt", "threshold": 90}]]
+        first = cache.get(ThresholdAlgorithm, config, extra_config={"tags": {"a", "b"}})
+        self.assertIs(first, cache.get(ThresholdAlgorithm, config, extra_config={"tags": {"b", "a"}}))
+
+        self.assertIsNot(
+            cache.get(ThresholdAlgorithm, config, extra_config={1: "a"}),
+            cache.get(ThresholdAlgorithm, config, extra_config={"1": "a"}),
+        )
+
+        converter = _Converter()
+        self.assertIs(
+            cache.get(ThresholdAlgorithm, config, unit_converter=converter),
+            cache.get(ThresholdAlgorithm, config, unit_converter=converter),
+        )
+
+    def test_unhashable_values_not_cached(self):
+        cache = AlgorithmCache()
+        config = [[{"method": "gt", "threshold": 90}]]
+        first = cache.get(ThresholdAlgorithm, config, unit_converter=_UnhashableConverter())
+        second = cache.get(ThresholdAlgorithm, config, unit_converter=_UnhashableConverter())
+
+        self.assertIsNot(first, second)
+        self.assertEqual((len(cache), cache.uncached), (0, 2))
+
+    def test_stateful_algorithms_not_shared(self):
+        cache = AlgorithmCache()
+        first = cache.get(SimpleRingRatioAlgorithm, {"ceil": 90})
+        second = cache.get(SimpleRingRatioAlgorithm, {"ceil": 90})
+
+        self.assertIsNot(first, second)
+        self.assertIsNot(first.history_store, second.history_store)
+        self.assertIsNot(
+            cache.get(ThresholdAlgorithm, [[{"method": "gt", "threshold": 90}]], observer=InMemoryObserver()),
+            cache.get(ThresholdAlgorithm, [[{"method": "gt", "threshold": 90}]]),
+        )
+        self.assertEqual((len(cache), cache.uncached), (1, 3))
+
+    def test_config_copied_and_lru_eviction(self):
+        cache = AlgorithmCache(maxsize=2)
+        config = [[{"method": "gt", "threshold": 90}]]
+        algo = cache.get(ThresholdAlgorithm, config)
+        config[0][0]["threshold"] = 10
+
+        self.assertEqual(algo.config[0][0]["threshold"], 90)
+        cache.get(ThresholdAlgorithm, config)
+        cache.get(ThresholdAlgorithm, [[{"method": "lt", "threshold": 1}]])
+        self.assertEqual(len(cache), 2)
+        self.assertIsNot(algo, cache.get(ThresholdAlgorithm, [[{"method": "gt", "threshold": 90}]]))
+
+    def test_invalid_config_not_cached(self):
+        cache = AlgorithmCache()
+        with self.assertRaises(InvalidAlgorithmConfigError):
+            cache.get(SimpleRingRatioAlgorithm, {})
+        self.assertEqual(len(cache), 0)
+
+    def test_concurrent_single_build(self):
+        cache = AlgorithmCache()
+        results = []
+
+        def worker():
+            for _ in range(100):
+                results.append(cache.get(ThresholdAlgorithm, [[{"method": "gt", "threshold": 5}]]))
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len({id(algo) for algo in results}), 1)
+        self.assertEqual((cache.hits, cache.misses), (799, 1))
+
+    def test_registry_name(self):
+        algo = get_cached_algorithm("Threshold", [[{"method": "lt", "threshold": 3}]])
+        self.assertIs(algo, get_cached_algorithm(ThresholdAlgorithm, [[{"method": "lt", "threshold": 3}]]))
@@ -0,0 +1,75 @@
+import unittest
+from datetime import datetime
+
+from tsdetect import SimpleDataPoint, create_threshold_algorithm, render_all
+from tsdetect.algorithms.threshold import ThresholdAlgorithm
+from tsdetect.core.interfaces import ITemplateEngine
+
+
+class _CountingEngine(ITemplateEngine):
+    """记录编译和渲染次数的模板引擎"""
+
+    def __init__(self):
+        self.compiles = 0
+        self.renders = 0
+
+    def render(self, template, context):
+        self.renders += 1
+        return template.format(**context)
+
+    def compile(self, template):
+        self.compiles += 1
+        return template
+
+    def render_compiled(self, compiled, context):
+        self.renders += 1
+        return compiled.format(**context)
+
+
+def _points(count: int = 10):
+    return [SimpleDataPoint(value=100 + i, timestamp=60 * (i + 1)) for i in range(count)]
+
+
+class TestLazyAnomaly(unittest.TestCase):
+    def test_message_rendered_on_first_access(self):
+        engine = _CountingEngine()
+        algo = create_threshold_algorithm(threshold=50, template_engine=engine)
+        anomalies = algo.detect_records(_points())
+
+        self.assertEqual(len(anomalies), 10)
+        self.assertEqual(engine.renders, 0)
+        self.assertFalse(anomalies[0].message_rendered)
+
+        self.assertEqual(anomalies[0].anomaly_message, "value > 50.0")
+        self.assertEqual(anomalies[0].anomaly_message, "value > 50.0")
+        self.assertEqual(engine.renders, 1)
+
+    def test_render_all_compiles_once_per_template(self):
+        engine = _CountingEngine()
+        config = [[{"method": "gt", "threshold": 50}], [{"method": "gt", "threshold": 105}]]
+        algo = ThresholdAlgorithm(config=config, template_engine=engine)
+        anomalies = algo.detect_records(_points())
+
+        messages = render_all(anomalies)
+
+        self.assertEqual(engine.compiles, 2)
+        self.assertEqual(messages[0], "value > 50.0")
+        self.assertEqual(messages[-1], "value > 50.0; value > 105.0")
+        self.assertEqual(messages, [a.anomaly_message for a in anomalies])
+        self.assertEqual(engine.renders, 14)
+
+    def test_merged_message_matches_children(self):
+        config = [[{"method": "gt", "threshold": 50}], [{"method": "lt", "threshold": 200}]]
+        anomaly = ThresholdAlgorithm(config=config).detect(SimpleDataPoint(value=100, timestamp=60))[0]
+        self.assertEqual(anomaly.anomaly_message, "value > 50.0; value < 200.0")
+        self.assertEqual(len(anomaly.child_detectors), 2)
+
+    def test_context_snapshot_and_time_are_lazy(self):
+        anomaly = create_threshold_algorithm(threshold=50).detect(SimpleDataPoint(value=100, timestamp=60))[0]
+        self.assertIsNone(anomaly._context)
+        self.assertIsNone(anomaly._anomaly_time)
+
+        data = anomaly.as_dict()
+        self.assertEqual(data["context"]["value"], 100)
+        self.assertEqual(data["anomaly"]["anomaly_message"], "value > 50.0")
+        datetime.strptime(data["anomaly"]["anomaly_time"], "%Y-%m-%d %H:%M:%S")
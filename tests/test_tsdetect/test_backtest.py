@@ -0,0 +1,119 @@
+import random
+import unittest
+
+from tsdetect import (
+    SimpleDataPoint,
+    ThresholdAlgorithm,
+    config_grid,
+)
+from tsdetect.algorithms.amplitude import YearRoundAmplitudeAlgorithm
+from tsdetect.algorithms.intelligent import SimpleIntelligentAlgorithm
+from tsdetect.algorithms.ring_ratio import AdvancedRingRatioAlgorithm
+from tsdetect.algorithms.year_round import AdvancedYearRoundAlgorithm
+from tsdetect.batch.frame import np
+from tsdetect.core.interfaces import IHistoryFetcher
+
+if np is not None:
+    from tsdetect.batch import BacktestRunner, DetectFrame, load_frame_history
+
+ONE_DAY = 86400
+INTERVAL = 3600
+
+
+class _DictHistoryFetcher(IHistoryFetcher):
+    """按 (维度, 时间戳) 查表的历史数据获取器"""
+
+    def __init__(self, points):
+        self.by_key = {(dp.dimensions["ip"], dp.timestamp): dp for dp in points}
+
+    def fetch(self, data_point, offsets):
+        return [self.by_key.get((data_point.dimensions["ip"], data_point.timestamp - o)) for o in offsets]
+
+    def batch_fetch(self, data_points, offsets):
+        return {dp.record_id: self.fetch(dp, offsets) for dp in data_points}
+
+
+def _points(days: int = 10):
+    rng = random.Random(7)
+    points = []
+    for ip in ("a", "b"):
+        for ts in range(0, days * ONE_DAY, INTERVAL):
+            # 少量缺失点和尖峰
+            if rng.random() < 0.05:
+                continue
+            value = 100.0 + rng.gauss(0, 10) + (200.0 if rng.random() < 0.03 else 0.0)
+            points.append(SimpleDataPoint(value=value, timestamp=ts, dimensions={"ip": ip}))
+    return points
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class TestBacktestRunner(unittest.TestCase):
+    def setUp(self):
+        self.points = _points()
+        self.start = 8 * ONE_DAY
+        self.fetcher = _DictHistoryFetcher(self.points)
+
+    def _assert_matches_detect(self, algorithm_class, configs, **kwargs):
+        runner = BacktestRunner(algorithm_class, configs, **kwargs)
+        results = runner.run(self.points, start=self.start)
+        replay = [dp for dp in self.points if dp.timestamp >= self.start]
+
+        self.assertEqual(len(results), len(configs))
+        for config, result in zip(configs, results, strict=True):
+            algorithm = algorithm_class(config=config, history_fetcher=self.fetcher, **kwargs)
+            expected = sorted(a.data_point.timestamp for a in algorithm.detect_records(replay))
+            self.assertEqual(sorted(result.timestamps.tolist()), expected, config)
+            self.assertEqual(result.alert_count, len(expected))
+        # 网格里至少有配置产生告警，比较才有意义
+        self.assertTrue(any(result.alert_count for result in results))
+
+    def test_config_grid(self):
+        grid = config_grid(floor=[10, 20], ceil=[30, 40], fetch_type="avg")
+        self.assertEqual(len(grid), 4)
+        self.assertEqual(grid[0], {"floor": 10, "ceil": 30, "fetch_type": "avg"})
+
+    def test_advanced_ring_ratio(self):
+        configs = config_grid(
+            floor=[20, 50], ceil=[50, 100], floor_interval=[1, 3], ceil_interval=[2, 5], fetch_type=["avg", "last"]
+        )
+        self._assert_matches_detect(AdvancedRingRatioAlgorithm, configs, agg_interval=INTERVAL)
+
+    def test_advanced_year_round(self):
+        configs = config_grid(floor=[20, 50], ceil=[50, 100], floor_interval=[1, 7], ceil_interval=[3, 7])
+        self._assert_matches_detect(AdvancedYearRoundAlgorithm, configs)
+
+    def test_year_round_amplitude(self):
+        configs = config_grid(ratio=[1, 2], shock=[0, 20], days=[1, 3, 7], method=["avg", "max"])
+        self._assert_matches_detect(YearRoundAmplitudeAlgorithm, configs, agg_interval=INTERVAL)
+
+    def test_generic_evaluator(self):
+        configs = [[{"method": "gte", "threshold": t}] for t in (150, 250)]
+        runner = BacktestRunner(ThresholdAlgorithm, configs)
+        results = runner.run(DetectFrame.from_points(self.points), start=self.start, end=9 * ONE_DAY)
+        expected = [
+            sum(1 for dp in self.points if self.start <= dp.timestamp < 9 * ONE_DAY and dp.value >= t)
+            for t in (150, 250)
+        ]
+        self.assertEqual([r.alert_count for r in results], expected)
+
+    def test_unsupported_algorithm(self):
+        with self.assertRaises(ValueError):
+            BacktestRunner(SimpleIntelligentAlgorithm, [{}])
+
+    def test_load_frame_history(self):
+        frame = DetectFrame.from_points(self.points)
+        history = load_frame_history(frame, [INTERVAL, ONE_DAY])
+        row = next(i for i, dp in enumerate(self.points) if dp.timestamp >= ONE_DAY)
+        dp = self.points[row]
+        for offset in (INTERVAL, ONE_DAY):
+            hp = self.fetcher.fetch(dp, [offset])[0]
+            value = history.row(offset)[row]
+            if hp is None:
+                self.assertTrue(np.isnan(value))
+            else:
+                self.assertEqual(value, hp.value)
+        self.assertEqual(history.select([ONE_DAY]).offsets, [ONE_DAY])
+
+
+if __name__ == "__main__":
+    unittest.main()
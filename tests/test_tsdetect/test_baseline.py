@@ -0,0 +1,159 @@
+import random
+import unittest
+
+from tsdetect import (
+    DetectionPipeline,
+    SimpleDataPoint,
+    create_advanced_ring_ratio,
+    create_advanced_year_round,
+    create_year_round_amplitude,
+)
+from tsdetect.core.baseline import RollingBaseline, RollingStats
+from tsdetect.core.exceptions import InvalidAlgorithmConfigError
+from tsdetect.core.history import MISSING
+from tsdetect.core.interfaces import IHistoryFetcher
+
+
+class _SeriesFetcher(IHistoryFetcher):
+    """从内存序列中获取历史数据，记录查询的数据点数"""
+
+    def __init__(self, series: dict[tuple[str, int], float]):
+        self.series = series
+        self.fetched = 0
+
+    def fetch(self, data_point, offsets):
+        self.fetched += 1
+        ip = data_point.dimensions.get("ip", "")
+        results = []
+        for offset in offsets:
+            ts = data_point.timestamp - offset
+            value = self.series.get((ip, ts))
+            results.append(None if value is None else SimpleDataPoint(value=value, timestamp=ts))
+        return results
+
+    def batch_fetch(self, data_points, offsets):
+        return {dp.record_id: self.fetch(dp, offsets) for dp in data_points}
+
+
+def _make_series(interval: int, count: int, seed: int = 7):
+    rng = random.Random(seed)
+    series = {}
+    for ip in ("a", "b"):
+        for i in range(count):
+            # 约 15% 的周期缺失
+            if rng.random() < 0.15:
+                continue
+            series[(ip, interval * i)] = float(rng.choice([10, 50, 100, 100, 100, 160, 300]))
+    return series
+
+
+class TestRollingStats(unittest.TestCase):
+    def test_sum_count_max(self):
+        stats = RollingStats(3)
+        for slot, value in enumerate([5, 1, 4]):
+            stats.push(slot, value)
+        self.assertEqual((stats.sum, stats.count, stats.max), (10, 3, 5))
+        stats.pop(0, 5)
+        stats.push(3, 2)
+        self.assertEqual((stats.sum, stats.count, stats.max), (7, 3, 4))
+
+
+class TestRollingBaseline(unittest.TestCase):
+    def test_warm_start_and_incremental_mean(self):
+        baseline = RollingBaseline(interval=60, lookback=3, window_sizes=(3,))
+        dp = SimpleDataPoint(value=1, timestamp=600)
+        self.assertIs(baseline.mean(dp, 3), MISSING)
+
+        baseline.warm_start(dp, [30, 20, 10])
+        self.assertEqual(baseline.mean(dp, 3), 20)
+        self.assertEqual(baseline.last(dp), 30)
+        self.assertEqual(baseline.window_max(dp, 3), 30)
+
+        baseline.observe(dp)
+        nxt = SimpleDataPoint(value=2, timestamp=660)
+        self.assertEqual(baseline.mean(nxt, 3), (1 + 30 + 20) / 3)
+        self.assertEqual(baseline.value_at(nxt, 1), 1)
+
+    def test_mean_matches_fetch_path_exactly(self):
+        baseline = RollingBaseline(interval=60, lookback=5, window_sizes=(5,))
+        rng = random.Random(3)
+        values = [round(rng.uniform(0, 100), 3) for _ in range(200)]
+        baseline.warm_start(SimpleDataPoint(value=values[5], timestamp=60 * 5), values[4::-1])
+        for i in range(5, len(values)):
+            dp = SimpleDataPoint(value=values[i], timestamp=60 * i)
+            history = values[i - 1 : i - 6 : -1] if i > 5 else values[4::-1]
+            self.assertEqual(baseline.mean(dp, 5), sum(history) / len(history), i)
+            baseline.observe(dp)
+
+    def test_context_loading_does_not_observe(self):
+        fetcher = _SeriesFetcher({("a", 60 * i): float(i) for i in range(10)})
+        algo = create_advanced_ring_ratio(
+            floor=30, floor_interval=3, history_fetcher=fetcher, incremental_baseline=True
+        )
+        points = [SimpleDataPoint(value=1, timestamp=600 + 60 * i, dimensions={"ip": "a"}) for i in range(2)]
+        algo.prepare_records(points[:1])
+        baseline = algo.rolling_baseline
+
+        algo.get_context(points[1]).materialize()
+        self.assertIsNone(baseline.value_at(SimpleDataPoint(value=1, timestamp=780, dimensions={"ip": "a"}), 2))
+        algo.detect(points[1])
+        self.assertEqual(baseline.value_at(SimpleDataPoint(value=1, timestamp=780, dimensions={"ip": "a"}), 2), 1)
+
+    def test_gaps_use_first_present_values(self):
+        baseline = RollingBaseline(interval=60, lookback=4, window_sizes=(2,))
+        dp = SimpleDataPoint(value=1, timestamp=600)
+        baseline.warm_start(dp, [None, 20, None, 40])
+        self.assertEqual(baseline.mean(dp, 2), 30)
+        self.assertEqual(baseline.last(dp), 20)
+
+    def test_unknown_history_not_answered(self):
+        baseline = RollingBaseline(interval=60, lookback=2)
+        baseline.observe(SimpleDataPoint(value=1, timestamp=600))
+        self.assertFalse(baseline.covers(SimpleDataPoint(value=1, timestamp=660)))
+        baseline.observe(SimpleDataPoint(value=1, timestamp=660))
+        self.assertTrue(baseline.covers(SimpleDataPoint(value=1, timestamp=720)))
+
+
+class TestIncrementalAlgorithms(unittest.TestCase):
+    def _compare(self, factory, interval, count, window_size):
+        series = _make_series(interval, count)
+        records = [
+            {"value": value, "timestamp": ts, "dimensions": {"ip": ip}}
+            for (ip, ts), value in sorted(series.items(), key=lambda item: item[0][1])
+            if ts >= interval * (count // 2)
+        ]
+
+        plain_fetcher = _SeriesFetcher(series)
+        plain = DetectionPipeline(factory(history_fetcher=plain_fetcher), window_size=window_size)
+        expected = [(a.timestamp, a.anomaly_message) for a in plain.run(records)]
+
+        fetcher = _SeriesFetcher(series)
+        algo = factory(history_fetcher=fetcher, incremental_baseline=True)
+        incremental = DetectionPipeline(algo, window_size=window_size)
+        actual = [(a.timestamp, a.anomaly_message) for a in incremental.run(records)]
+
+        self.assertTrue(expected)
+        self.assertEqual(actual, expected)
+        # 只有每条序列的第一个点需要获取历史数据
+        self.assertEqual(fetcher.fetched, 2)
+        self.assertGreater(plain_fetcher.fetched, fetcher.fetched)
+
+    def test_advanced_ring_ratio_matches(self):
+        for fetch_type in ("avg", "last"):
+
+            def factory(fetch_type=fetch_type, **kwargs):
+                return create_advanced_ring_ratio(
+                    floor=30, ceil=30, floor_interval=3, ceil_interval=5, fetch_type=fetch_type, **kwargs
+                )
+
+            self._compare(factory, 60, 120, window_size=7)
+
+    def test_advanced_year_round_matches(self):
+        def factory(**kwargs):
+            return create_advanced_year_round(floor=30, ceil=30, floor_interval=2, ceil_interval=4, **kwargs)
+
+        self._compare(factory, 86400, 40, window_size=5)
+
+    def test_unsupported_offsets(self):
+        with self.assertRaises(InvalidAlgorithmConfigError):
+            create_year_round_amplitude(ratio=1, shock=1, days=2, incremental_baseline=True)
@@ -0,0 +1,143 @@
+import random
+import unittest
+
+from tsdetect import (
+    SimpleDataPoint,
+    create_advanced_year_round,
+    create_simple_ring_ratio,
+    create_threshold_algorithm,
+    create_year_round_amplitude,
+)
+from tsdetect.algorithms.intelligent import create_intelligent_algorithm
+from tsdetect.algorithms.threshold import ThresholdAlgorithm
+from tsdetect.batch.frame import np
+from tsdetect.core.interfaces import IHistoryFetcher
+from tsdetect.units.base import SimpleUnitConverter
+
+if np is not None:
+    from tsdetect.batch import BatchDetector, DetectFrame
+
+
+class _DictHistoryFetcher(IHistoryFetcher):
+    """按 (维度, 时间戳) 查表的历史数据获取器"""
+
+    def __init__(self, series: dict[int, float]):
+        self.series = series
+
+    def fetch(self, data_point, offsets):
+        results = []
+        for offset in offsets:
+            value = self.series.get(data_point.timestamp - offset)
+            results.append(
+                None if value is None else SimpleDataPoint(value=value, timestamp=data_point.timestamp - offset)
+            )
+        return results
+
+    def batch_fetch(self, data_points, offsets):
+        return {dp.record_id: self.fetch(dp, offsets) for dp in data_points}
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class TestDetectFrame(unittest.TestCase):
+    def test_from_points_interns_dimensions(self):
+        points = [
+            SimpleDataPoint(value=1, timestamp=60, dimensions={"ip": "a"}),
+            SimpleDataPoint(value=2, timestamp=120, dimensions={"ip": "b"}),
+            SimpleDataPoint(value=3, timestamp=180, dimensions={"ip": "a"}),
+        ]
+        frame = DetectFrame.from_points(points)
+        self.assertEqual(len(frame), 3)
+        self.assertEqual(frame.dimension_ids.tolist(), [0, 1, 0])
+        self.assertIs(frame.point(1), points[1])
+
+    def test_from_records_builds_points_lazily(self):
+        frame = DetectFrame.from_records([{"value": 5, "timestamp": 60, "unit": "KB", "dimensions": {"ip": "a"}}])
+        dp = frame.point(0)
+        self.assertEqual((dp.value, dp.timestamp, dp.unit, dp.dimensions), (5.0, 60, "KB", {"ip": "a"}))
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class TestBatchDetector(unittest.TestCase):
+    def test_threshold_matches_per_point_detection(self):
+        rng = random.Random(7)
+        config = [
+            [{"method": "gte", "threshold": 80}, {"method": "lt", "threshold": 95}],
+            [{"method": "gt", "threshold": 120}],
+        ]
+        algo = ThresholdAlgorithm(config=config, unit="KB", unit_converter=SimpleUnitConverter())
+        points = [
+            SimpleDataPoint(value=rng.uniform(0, 150), timestamp=60 * i, unit=rng.choice(["KB", "B", "MB"]))
+            for i in range(300)
+        ]
+
+        result = BatchDetector(algo).detect_points(points)
+
+        expected = [bool(algo.detect(dp)) for dp in points]
+        self.assertEqual(result.mask.tolist(), expected)
+        self.assertEqual(len(result.anomalies()), sum(expected))
+
+    def test_range_ratio_algorithms_match_per_point_detection(self):
+        rng = random.Random(11)
+        day = 86400
+        series = {t: rng.uniform(50, 150) for t in range(0, 9 * day, 60) if rng.random() < 0.8}
+        fetcher = _DictHistoryFetcher(series)
+        points = [SimpleDataPoint(value=rng.uniform(0, 200), timestamp=8 * day + 60 * i) for i in range(200)]
+        algorithms = [
+            create_simple_ring_ratio(floor=20, ceil=20, history_fetcher=fetcher),
+            create_advanced_year_round(floor=25, ceil=25, history_fetcher=fetcher),
+            create_advanced_year_round(floor=25, fetch_type="last", history_fetcher=fetcher),
+            create_year_round_amplitude(ratio=1.2, shock=2, days=3, history_fetcher=fetcher),
+            create_year_round_amplitude(ratio=1.2, shock=2, days=3, method="max", history_fetcher=fetcher),
+        ]
+
+        for algo in algorithms:
+            with self.subTest(algorithm=type(algo).__name__):
+                result = BatchDetector(algo).detect_points(points)
+                self.assertEqual(result.mask.tolist(), [bool(algo.detect(dp)) for dp in points])
+
+    def test_simple_ring_ratio_mask(self):
+        fetcher = _DictHistoryFetcher({0: 100.0, 60: 100.0, 120: 100.0})
+        algo = create_simple_ring_ratio(floor=20, ceil=20, history_fetcher=fetcher)
+        frame = DetectFrame(values=[70, 110, 130, 10], timestamps=[60, 120, 180, 600])
+
+        result = BatchDetector(algo).detect(frame)
+
+        # 第 4 行没有历史数据，不应触发
+        self.assertEqual(result.mask.tolist(), [True, False, True, False])
+        self.assertEqual(result.indices.tolist(), [0, 2])
+
+    def test_advanced_year_round_skips_missing_days(self):
+        day = 86400
+        now = 10 * day
+        # 第 1 天缺失，前 2 个存在的值为第 2、3 天
+        fetcher = _DictHistoryFetcher({now - 2 * day: 100.0, now - 3 * day: 200.0, now - 4 * day: 1000.0})
+        algo = create_advanced_year_round(ceil=10, ceil_interval=2, history_fetcher=fetcher)
+
+        result = BatchDetector(algo).detect(DetectFrame(values=[166, 164], timestamps=[now, now]))
+
+        self.assertEqual(result.mask.tolist(), [True, False])
+
+    def test_year_round_amplitude(self):
+        day = 86400
+        now = 10 * day
+        fetcher = _DictHistoryFetcher({now - 60: 100.0, now - day: 100.0, now - day - 60: 90.0})
+        algo = create_year_round_amplitude(ratio=2, shock=5, days=1, history_fetcher=fetcher)
+
+        result = BatchDetector(algo).detect(DetectFrame(values=[126, 124], timestamps=[now, now]))
+
+        self.assertEqual(result.mask.tolist(), [True, False])
+
+    def test_unregistered_algorithm_falls_back_to_points(self):
+        algo = create_intelligent_algorithm()
+        detector = BatchDetector(algo)
+        self.assertFalse(detector.vectorized)
+        result = detector.detect(DetectFrame(values=[1.0], timestamps=[60]))
+        self.assertEqual(result.mask.tolist(), [False])
+
+    def test_anomalies_carry_level(self):
+        algo = create_threshold_algorithm(threshold=10, method="gt")
+        result = BatchDetector(algo, level=2).detect(DetectFrame(values=[5, 20], timestamps=[60, 120]))
+        anomalies = result.anomalies()
+        self.assertEqual(len(anomalies), 1)
+        self.assertEqual(anomalies[0].level, 2)
+        self.assertEqual(anomalies[0].value, 20.0)
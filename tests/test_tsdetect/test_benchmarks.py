@@ -0,0 +1,53 @@
+import unittest
+
+from tsdetect.algorithms import ALGORITHM_REGISTRY
+from tsdetect.benchmarks.suite import BENCHMARK_CASES, compare, run_suite
+from tsdetect.benchmarks.workloads import SyntheticWorkload
+
+
+class TestSyntheticWorkload(unittest.TestCase):
+    def test_points_and_series(self):
+        workload = SyntheticWorkload(points=250, series=10)
+        points = list(workload)
+        self.assertEqual(len(points), 250)
+        self.assertEqual(len({p.record_id for p in points}), 250)
+        self.assertEqual(len({tuple(sorted(p.dimensions.items())) for p in points}), 10)
+        self.assertEqual([len(b) for b in workload.batches(100)], [100, 100, 50])
+
+    def test_history_matches_generator(self):
+        workload = SyntheticWorkload(points=20, series=4)
+        fetcher = workload.history_fetcher()
+        dp = list(workload)[-1]
+        history = fetcher.fetch(dp, [0, 86400])
+        self.assertEqual(history[0].value, dp.value)
+        self.assertEqual(history[1].timestamp, dp.timestamp - 86400)
+        self.assertEqual(fetcher.fetch_count, 1)
+
+
+class TestBenchmarkSuite(unittest.TestCase):
+    def test_every_registered_algorithm_has_a_case(self):
+        self.assertEqual(set(ALGORITHM_REGISTRY), set(BENCHMARK_CASES))
+
+    def test_run_suite(self):
+        report = run_suite(SyntheticWorkload(points=200, series=20), batch_size=50)
+        self.assertEqual(set(report["results"]), set(BENCHMARK_CASES))
+        for result in report["results"].values():
+            self.assertEqual(result["points"], 200)
+            self.assertGreater(result["points_per_sec"], 0)
+            self.assertGreaterEqual(result["p99_batch_ms"], 0)
+            self.assertGreater(result["peak_bytes_per_point"], 0)
+
+    def test_compare(self):
+        workload = {"points": 100, "series": 10, "batch_size": 10}
+        baseline = {"workload": workload, "results": {"Threshold": {"points_per_sec": 1000.0, "p99_batch_ms": 1.0}}}
+        ok = {"workload": workload, "results": {"Threshold": {"points_per_sec": 900.0, "p99_batch_ms": 1.1}}}
+        slow = {"workload": workload, "results": {"Threshold": {"points_per_sec": 500.0, "p99_batch_ms": 3.0}}}
+
+        self.assertEqual(compare(baseline, ok, tolerance=0.2), [])
+        self.assertEqual(len(compare(baseline, slow, tolerance=0.2)), 2)
+        other = dict(slow, workload=dict(workload, points=200))
+        self.assertIn("workload mismatch", compare(baseline, other)[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
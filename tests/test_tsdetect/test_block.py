@@ -0,0 +1,114 @@
+import unittest
+
+from tsdetect import (
+    CompactDataPoint,
+    DataPointBlock,
+    IDataPoint,
+    SimpleDataPoint,
+    create_threshold_algorithm,
+)
+from tsdetect.batch.frame import np
+from tsdetect.core.exceptions import InvalidDataPointError
+
+if np is not None:
+    from tsdetect.batch import DetectFrame
+
+
+RECORDS = [
+    {"value": 10, "timestamp": 60, "unit": "%", "dimensions": {"ip": "a"}},
+    {"value": 95, "timestamp": 120, "unit": "%", "dimensions": {"ip": "b"}},
+    {"value": 99, "time": 180, "unit": "", "dimensions": {"ip": "a"}},
+]
+
+
+class TestCompactDataPoint(unittest.TestCase):
+    def test_matches_simple_data_point(self):
+        compact = CompactDataPoint.from_dict(RECORDS[0])
+        simple = SimpleDataPoint(dict(RECORDS[0]))
+        self.assertIsInstance(compact, IDataPoint)
+        for field in ("value", "timestamp", "unit", "dimensions", "record_id"):
+            self.assertEqual(getattr(compact, field), getattr(simple, field), field)
+
+    def test_slots_only(self):
+        compact = CompactDataPoint(value=1, timestamp=60)
+        self.assertFalse(hasattr(compact, "__dict__"))
+        self.assertEqual(compact.values, {})
+        self.assertEqual(compact.time, 60)
+
+    def test_missing_fields(self):
+        with self.assertRaises(InvalidDataPointError):
+            CompactDataPoint.from_dict({"timestamp": 60})
+        with self.assertRaises(InvalidDataPointError):
+            CompactDataPoint.from_dict({"value": 1})
+
+
+class TestDataPointBlock(unittest.TestCase):
+    def test_parallel_arrays_and_interning(self):
+        block = DataPointBlock.from_records(RECORDS)
+        self.assertEqual(len(block), 3)
+        self.assertEqual(block.values.typecode, "d")
+        self.assertEqual(block.timestamps.typecode, "q")
+        self.assertEqual(list(block.dimension_ids), [0, 1, 0])
+        self.assertEqual(block.unit_names, ["%", ""])
+        self.assertEqual(block.nbytes, 3 * 4 * 8)
+
+    def test_row_views(self):
+        block = DataPointBlock.from_records(RECORDS)
+        view = block[-1]
+        simple = SimpleDataPoint(value=99, timestamp=180, dimensions={"ip": "a"})
+        self.assertIsInstance(view, IDataPoint)
+        self.assertEqual((view.value, view.timestamp, view.unit), (99.0, 180, ""))
+        self.assertEqual(view.record_id, simple.record_id)
+        self.assertEqual(block[0], block[0])
+        with self.assertRaises(IndexError):
+            block[3]
+
+    def test_slice_and_to_points(self):
+        block = DataPointBlock.from_records(RECORDS)
+        sub = block[1:]
+        self.assertEqual(list(sub.values), [95.0, 99.0])
+        self.assertEqual(sub.dimensions, block.dimensions)
+        self.assertEqual([v.record_id for v in sub], [v.record_id for v in block][1:])
+        points = block.to_points()
+        self.assertEqual([p.record_id for p in points], [v.record_id for v in block])
+
+    def test_append_to_slice_keeps_parent_tables(self):
+        block = DataPointBlock.from_records(RECORDS)
+        sub = block[:1]
+        sub.append(1, 240, "ms", {"ip": "c"})
+        self.assertEqual(len(block.dimensions), 2)
+        self.assertEqual(block.unit_names, ["%", ""])
+        self.assertEqual(len(block._digests), 2)
+        self.assertEqual(sub[-1].dimensions, {"ip": "c"})
+        self.assertEqual(block.intern_dimensions({"ip": "c"}), 2)
+
+    def test_values_and_record_id_columns(self):
+        points = [
+            SimpleDataPoint({"record_id": "r-1", "values": {"is_anomaly": 1}}, value=1, timestamp=60),
+            SimpleDataPoint(value=2, timestamp=120, dimensions={"ip": "a"}),
+        ]
+        block = DataPointBlock.from_points(points)
+        self.assertEqual(block[0].values, {"is_anomaly": 1})
+        self.assertEqual(block[1].values, {})
+        self.assertEqual([v.record_id for v in block], [p.record_id for p in points])
+
+        for sub in (block.take([1, 0]), block.take([1, 0], compact=True)):
+            self.assertEqual([v.record_id for v in sub], [points[1].record_id, "r-1"])
+            self.assertEqual(sub[1].values, {"is_anomaly": 1})
+        restored = block.to_points()
+        self.assertEqual(restored[0].values, {"is_anomaly": 1})
+        self.assertEqual(restored[0].record_id, "r-1")
+
+    def test_detect_on_views(self):
+        algo = create_threshold_algorithm(threshold=90, method="gt")
+        anomalies = algo.detect_records(list(DataPointBlock.from_records(RECORDS)))
+        self.assertEqual([a.value for a in anomalies], [95.0, 99.0])
+
+    @unittest.skipIf(np is None, "numpy is not installed")
+    def test_frame_from_block_is_zero_copy(self):
+        block = DataPointBlock.from_records(RECORDS)
+        frame = DetectFrame.from_block(block)
+        self.assertEqual(frame.values.tolist(), [10.0, 95.0, 99.0])
+        self.assertEqual(frame.unit_names, ["%", ""])
+        block.values[0] = 42.0
+        self.assertEqual(frame.values[0], 42.0)
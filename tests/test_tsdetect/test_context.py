@@ -0,0 +1,91 @@
+import unittest
+
+from tsdetect import SimpleDataPoint, create_simple_ring_ratio
+from tsdetect.core.algorithms import DetectContext, ExpressionDetector
+from tsdetect.core.interfaces import IHistoryFetcher
+
+
+class _CountingFetcher(IHistoryFetcher):
+    """记录调用次数的历史数据获取器"""
+
+    def __init__(self, value: float):
+        self.value = value
+        self.calls = 0
+
+    def fetch(self, data_point, offsets):
+        self.calls += 1
+        return [SimpleDataPoint(value=self.value, timestamp=data_point.timestamp - o) for o in offsets]
+
+    def batch_fetch(self, data_points, offsets):
+        return {}
+
+
+class TestDetectContext(unittest.TestCase):
+    def test_resolver_called_once(self):
+        calls = []
+        context = DetectContext(resolvers={"value": lambda: calls.append(1) or 42})
+        self.assertEqual(context["value"], 42)
+        self.assertEqual(context.value, 42)
+        self.assertEqual(len(calls), 1)
+
+    def test_group_loaded_only_for_unknown_keys(self):
+        calls = []
+        context = DetectContext({"a": 1})
+        context.register_group(lambda: calls.append(1) or {"b": 2, "a": 100})
+
+        self.assertEqual(context["a"], 1)
+        self.assertEqual(calls, [])
+        self.assertEqual(context["b"], 2)
+        # 变量组不会覆盖已有变量
+        self.assertEqual(context["a"], 1)
+        self.assertEqual(len(calls), 1)
+
+    def test_mapping_protocol_materializes(self):
+        context = DetectContext({"a": 1}, resolvers={"b": lambda: 2})
+        context.register_group(lambda: {"c": 3})
+        self.assertIn("c", context)
+        self.assertNotIn("d", context)
+        self.assertEqual(dict(context), {"a": 1, "b": 2, "c": 3})
+        self.assertEqual("{a}-{b}-{c}".format(**context), "1-2-3")
+
+    def test_setitem_overrides_resolver(self):
+        context = DetectContext(resolvers={"value": lambda: 1})
+        context.value = 5
+        self.assertEqual(context["value"], 5)
+        with self.assertRaises(AttributeError):
+            context.missing  # noqa: B018
+
+
+class TestLazyAlgorithmContext(unittest.TestCase):
+    def test_extra_context_skipped_when_not_referenced(self):
+        fetcher = _CountingFetcher(100.0)
+        algo = create_simple_ring_ratio(floor=20, history_fetcher=fetcher)
+        detector = ExpressionDetector(expr="value > 1000")
+        context = algo.get_context(SimpleDataPoint(value=10, timestamp=120))
+
+        self.assertFalse(detector._detect(context.data_point, context))
+        self.assertEqual(fetcher.calls, 0)
+
+    def test_children_share_one_context(self):
+        fetcher = _CountingFetcher(100.0)
+        algo = create_simple_ring_ratio(floor=20, ceil=20, history_fetcher=fetcher)
+        dp = SimpleDataPoint(value=50, timestamp=120)
+        context = algo.get_context(dp)
+
+        self.assertEqual([d._detect(dp, context) for d in algo.detectors], [True, False])
+        # 两个子检测器共用同一次历史数据查询
+        self.assertEqual(fetcher.calls, 1)
+
+    def test_detect_session_builds_context_once(self):
+        fetcher = _CountingFetcher(100.0)
+        algo = create_simple_ring_ratio(floor=20, ceil=20, history_fetcher=fetcher)
+
+        anomalies = algo.detect(SimpleDataPoint(value=50, timestamp=120))
+
+        self.assertEqual(len(anomalies), 1)
+        # 检测、异常点创建、消息格式化和合并共用一次历史数据查询
+        self.assertEqual(fetcher.calls, 1)
+        self.assertIn("decreased by more than 20.0%", anomalies[0].anomaly_message)
+        self.assertIn("history: 100.0", anomalies[0].anomaly_message)
+        self.assertEqual(anomalies[0].context["floor_history_value"], 100.0)
+        self.assertEqual(anomalies[0].child_detectors, [algo.detectors[0]])
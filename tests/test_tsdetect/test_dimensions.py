@@ -0,0 +1,72 @@
+import hashlib
+import json
+import unittest
+
+from tsdetect import SimpleDataPoint
+from tsdetect.core.dimensions import DimensionKeyTable, canonical_dimension_key, dimensions_digest
+
+
+class TestDimensionKeyTable(unittest.TestCase):
+    def test_md5_matches_legacy_digest(self):
+        for dims in ({}, {"ip": "a", "bk_biz_id": 2}, {"tags": ["x", "y"]}, {"nested": {"b": 1, "a": None}}):
+            expected = hashlib.md5(json.dumps(dims, sort_keys=True).encode()).hexdigest()
+            self.assertEqual(dimensions_digest(dims), expected, dims)
+
+    def test_each_dimension_set_hashed_once(self):
+        table = DimensionKeyTable()
+        for _ in range(100):
+            table.digest({"ip": "a", "port": 80})
+            table.digest({"port": 80, "ip": "a"})
+        self.assertEqual(table.misses, 1)
+        self.assertEqual(table.hits, 199)
+        self.assertEqual(len(table), 1)
+
+    def test_value_types_are_distinguished(self):
+        keys = {canonical_dimension_key({"a": v}) for v in (1, 1.0, True, "1")}
+        self.assertEqual(len(keys), 4)
+        table = DimensionKeyTable()
+        self.assertNotEqual(table.digest({"a": 1}), table.digest({"a": True}))
+
+    def test_lru_eviction(self):
+        table = DimensionKeyTable(maxsize=2)
+        for i in range(5):
+            table.digest({"i": i})
+        self.assertEqual(len(table), 2)
+
+    def test_blake2b_digest(self):
+        table = DimensionKeyTable(algorithm="blake2b")
+        digest = table.digest({"ip": "a"})
+        self.assertEqual(len(digest), 16)
+        self.assertEqual(digest, table.digest({"ip": "a"}))
+        with self.assertRaises(ValueError):
+            DimensionKeyTable(algorithm="crc")
+
+
+class TestCachedRecordId(unittest.TestCase):
+    def test_record_id_computed_at_construction(self):
+        dp = SimpleDataPoint(value=1, timestamp=60, dimensions={"ip": "a"})
+        self.assertEqual(dp._record_id, f"{dimensions_digest({'ip': 'a'})}.60")
+        self.assertIs(dp.record_id, dp.record_id)
+
+    def test_setters_invalidate_record_id(self):
+        dp = SimpleDataPoint(value=1, timestamp=60, dimensions={"ip": "a"})
+        dp.timestamp = 120
+        self.assertTrue(dp.record_id.endswith(".120"))
+        dp.dimensions = {"ip": "b"}
+        self.assertEqual(dp.record_id, f"{dimensions_digest({'ip': 'b'})}.120")
+
+    def test_dimensions_copied_on_assignment(self):
+        dims = {"ip": "a"}
+        dp = SimpleDataPoint(value=1, timestamp=60, dimensions=dims)
+        record_id = dp.record_id
+        dims["ip"] = "b"
+        self.assertEqual(dp.dimensions, {"ip": "a"})
+        self.assertEqual(dp.record_id, record_id)
+
+        dp.dimensions = dims
+        dims["ip"] = "c"
+        self.assertEqual(dp.record_id, f"{dimensions_digest({'ip': 'b'})}.60")
+
+    def test_preset_record_id(self):
+        dp = SimpleDataPoint({"value": 1, "timestamp": 60, "record_id": "custom.60"})
+        self.assertEqual(dp.record_id, "custom.60")
@@ -0,0 +1,84 @@
+import unittest
+
+from tsdetect import SimpleDataPoint, create_ring_ratio_amplitude, create_threshold_algorithm
+from tsdetect.core.algorithms import ExpressionDetector
+from tsdetect.core.exceptions import ExpressionError
+from tsdetect.utils.expression import build_ratio_expr, compile_expression
+
+
+class TestCompileExpression(unittest.TestCase):
+    def test_names_in_source_order_without_builtins(self):
+        compiled = compile_expression("unit_convert_min(abs(history_value - value), unit) >= 3")
+        self.assertEqual(compiled.names, ("unit_convert_min", "history_value", "value", "unit"))
+
+    def test_positional_call_and_evaluate(self):
+        compiled = compile_expression(build_ratio_expr(20, direction="ceil"))
+        self.assertTrue(compiled(130.0, 100.0))
+        self.assertFalse(compiled.evaluate({"value": 110.0, "history_value": 100.0, "unused": object()}))
+
+    def test_builtins_available(self):
+        self.assertEqual(compile_expression("max(abs(a), b)")(-5, 3), 5)
+
+    def test_cached(self):
+        self.assertIs(compile_expression("value > 1"), compile_expression("value > 1"))
+
+    def test_missing_variable_raises_key_error(self):
+        with self.assertRaises(KeyError):
+            compile_expression("value > threshold").evaluate({"value": 1})
+
+    def test_rejects_unsafe_expressions(self):
+        for expr in ("value.__class__", "value >", "foo(value)", "open('x')", "values[0](1)", "[y := 1 for y in v]"):
+            with self.subTest(expr=expr), self.assertRaises(ExpressionError):
+                compile_expression(expr)
+
+    def test_context_names_whitelist(self):
+        names = frozenset({"value", "unit", "unit_convert_min"})
+        self.assertEqual(compile_expression("unit_convert_min(value, unit) > 1", names).names[0], "unit_convert_min")
+        for expr in ("value > threshold", "helper(value)", "[v for v in values]"):
+            with self.subTest(expr=expr), self.assertRaises(ExpressionError):
+                compile_expression(expr, names)
+        self.assertTrue(compile_expression("[v for v in [value] if v > 1] != []", names)(2))
+
+    def test_binding_expressions(self):
+        cases = {
+            "[v for v in [value] if v > 1] != []": True,
+            "(lambda x: x > 1)(value)": True,
+            "any(v > 5 for v in values)": False,
+            "(v := value * 2) > 3 and v < 5": True,
+            "max(values, key=lambda v: -v) == 1": True,
+        }
+        for expr, expected in cases.items():
+            with self.subTest(expr=expr):
+                compiled = compile_expression(expr)
+                self.assertEqual(compiled.evaluate({"value": 2, "values": [1, 2]}), expected)
+        self.assertEqual(compile_expression("(lambda x: x > 1)(value)").names, ("value",))
+        self.assertTrue(compile_expression("(lambda x: x > 1)(value)")(2))
+
+    def test_free_names_per_scope(self):
+        # 同名变量在内层作用域中绑定，在外层作用域中仍是自由变量
+        compiled = compile_expression("(lambda value: value)(value)")
+        self.assertEqual(compiled.names, ("value",))
+        self.assertEqual(compiled(3), 3)
+
+        compiled = compile_expression("any(value > x for value in values) or value > 0")
+        self.assertEqual(compiled.names, ("x", "values", "value"))
+        self.assertTrue(compiled(5, [1, 2], 1))
+
+
+class TestAlgorithmExpression(unittest.TestCase):
+    def test_threshold_detect(self):
+        algo = create_threshold_algorithm(threshold=90, method="gte")
+        self.assertEqual(len(algo.detect(SimpleDataPoint(value=95, timestamp=60))), 1)
+        self.assertEqual(algo.detect(SimpleDataPoint(value=85, timestamp=60)), [])
+
+    def test_expression_can_call_allowed_builtins(self):
+        # 振幅表达式使用 abs()，编译后的表达式需要能直接调用
+        algo = create_ring_ratio_amplitude(threshold=0, ratio=0.1, shock=1)
+        amplitude_detector = algo.detectors[1]
+        self.assertIn("abs", amplitude_detector.expr)
+        self.assertNotIn("abs", amplitude_detector._compiled.names)
+
+    def test_custom_detector_with_comprehension(self):
+        detector = ExpressionDetector(expr="[v for v in [value] if v > 1] != []")
+        self.assertEqual(len(detector.detect(SimpleDataPoint(value=5, timestamp=60))), 1)
+        self.assertEqual(detector.detect(SimpleDataPoint(value=0, timestamp=60)), [])
@@ -0,0 +1,356 @@
+import asyncio
+import unittest
+
+from tsdetect import (
+    AdvancedRingRatioAlgorithm,
+    DetectionPipeline,
+    DetectionPlan,
+    HistoryPlanner,
+    SimpleDataPoint,
+    create_advanced_ring_ratio,
+    create_simple_ring_ratio,
+    create_simple_year_round,
+    create_threshold_algorithm,
+    create_year_round_amplitude,
+)
+from tsdetect.core.history import MISSING, HistoryStore
+from tsdetect.core.interfaces import IAsyncHistoryFetcher, IHistoryFetcher
+
+
+class _MapFetcher(IHistoryFetcher):
+    """按时间戳返回历史值的获取器，记录调用次数"""
+
+    def __init__(self, value: float = 100):
+        self.value = value
+        self.fetch_calls = 0
+        self.batch_calls = 0
+
+    def fetch(self, data_point, offsets):
+        self.fetch_calls += 1
+        return [SimpleDataPoint(value=self.value, timestamp=data_point.timestamp - o) for o in offsets]
+
+    def batch_fetch(self, data_points, offsets):
+        self.batch_calls += 1
+        return {dp.record_id: self.fetch(dp, offsets) for dp in data_points}
+
+
+class TestHistoryStore(unittest.TestCase):
+    def test_get_put(self):
+        store = HistoryStore()
+        hp = SimpleDataPoint(value=1, timestamp=0)
+        store.put("r", 60, hp)
+        store.put("r", 120, None)
+        self.assertIs(store.get("r", 60), hp)
+        # 已缓存的“不存在”与未命中区分
+        self.assertIsNone(store.get("r", 120))
+        self.assertIs(store.get("r", 180), MISSING)
+        self.assertIn(("r", 120), store)
+
+    def test_update_and_discard(self):
+        store = HistoryStore()
+        store.update({"a": [1, 2], "b": [3]}, [60, 120])
+        self.assertEqual(len(store), 3)
+        self.assertEqual(store.get("a", 120), 2)
+        self.assertIs(store.get("b", 120), MISSING)
+        store.discard("a", [60, 120])
+        self.assertEqual(len(store), 1)
+
+    def test_size_bound_evicts_lru(self):
+        store = HistoryStore(max_size=2)
+        store.put("a", 60, 1)
+        store.put("b", 60, 2)
+        store.get("a", 60)
+        store.put("c", 60, 3)
+        self.assertEqual(len(store), 2)
+        self.assertIs(store.get("b", 60), MISSING)
+        self.assertEqual(store.get("a", 60), 1)
+
+    def test_ttl_expiry(self):
+        store = HistoryStore(ttl=0)
+        store.put("a", 60, 1)
+        self.assertIs(store.get("a", 60), MISSING)
+        self.assertEqual(len(store), 0)
+
+
+class TestRangeRatioHistory(unittest.TestCase):
+    def test_offsets_precomputed(self):
+        algo = create_advanced_ring_ratio(floor=10, ceil=10, floor_interval=3, ceil_interval=2)
+        self.assertEqual(algo.history_offsets, (60, 120, 180))
+
+    def test_single_fetch_result_is_cached(self):
+        fetcher = _MapFetcher(value=100)
+        algo = create_simple_ring_ratio(floor=20, history_fetcher=fetcher)
+        dp = SimpleDataPoint(value=50, timestamp=600)
+        algo.detect(dp)
+        algo.detect(dp)
+        self.assertEqual(fetcher.fetch_calls, 1)
+
+    def test_detect_records_served_from_store(self):
+        fetcher = _MapFetcher(value=100)
+        algo = create_advanced_ring_ratio(floor=20, history_fetcher=fetcher)
+        points = [SimpleDataPoint(value=50, timestamp=600 + 60 * i, dimensions={"ip": "a"}) for i in range(3)]
+        anomalies = algo.detect_records(points)
+        self.assertEqual(len(anomalies), 3)
+        self.assertEqual(fetcher.batch_calls, 1)
+        # batch_fetch 内部每个点调用一次 fetch，之后没有单点回源
+        self.assertEqual(fetcher.fetch_calls, 3)
+        self.assertEqual(len(algo.history_store), 3 * len(algo.history_offsets))
+
+    def test_batch_larger_than_default_store(self):
+        class _BatchOnlyFetcher(_MapFetcher):
+            def batch_fetch(self, data_points, offsets):
+                self.batch_calls += 1
+                return {
+                    dp.record_id: [SimpleDataPoint(value=self.value, timestamp=dp.timestamp - o) for o in offsets]
+                    for dp in data_points
+                }
+
+        fetcher = _BatchOnlyFetcher(value=100)
+        algo = create_year_round_amplitude(ratio=1, shock=1, days=7, history_fetcher=fetcher)
+        algo.history_store.max_size = 20
+        points = [SimpleDataPoint(value=50, timestamp=86400 * 8 + 60 * i, dimensions={"ip": "a"}) for i in range(10)]
+        self.assertGreater(len(points) * len(algo.history_offsets), 20)
+
+        algo.detect_records(points)
+        self.assertEqual(fetcher.batch_calls, 1)
+        self.assertEqual(fetcher.fetch_calls, 0)
+
+    def test_shared_bounded_store(self):
+        store = HistoryStore(max_size=4)
+        fetcher = _MapFetcher()
+        algo = create_advanced_ring_ratio(floor=20, history_fetcher=fetcher, history_store=store)
+        self.assertIs(algo.history_store, store)
+        algo.query_history_points([SimpleDataPoint(value=1, timestamp=60 * i) for i in range(10)])
+        self.assertEqual(len(store), 4)
+        self.assertEqual(store.max_size, 4)
+
+
+class _OffsetRecordingFetcher(_MapFetcher):
+    """记录每次 batch_fetch 请求的偏移量"""
+
+    def __init__(self, value: float = 100):
+        super().__init__(value)
+        self.requested: list[int] = []
+
+    def batch_fetch(self, data_points, offsets):
+        self.requested.extend(offsets)
+        return super().batch_fetch(data_points, offsets)
+
+
+class TestHistoryPlanner(unittest.TestCase):
+    def _algorithms(self, fetcher):
+        return [
+            create_simple_ring_ratio(floor=20, history_fetcher=fetcher),
+            create_advanced_ring_ratio(floor=20, ceil=20, history_fetcher=fetcher),
+            create_simple_year_round(floor=20, history_fetcher=fetcher),
+            create_year_round_amplitude(ratio=1, shock=1, days=2, history_fetcher=fetcher),
+        ]
+
+    def test_offsets_fetched_once(self):
+        fetcher = _OffsetRecordingFetcher(value=100)
+        planner = HistoryPlanner(self._algorithms(fetcher))
+        points = [SimpleDataPoint(value=50, timestamp=86400 * 3 + 60 * i, dimensions={"ip": "a"}) for i in range(4)]
+
+        anomalies = planner.detect_records(points)
+
+        self.assertEqual(sorted(fetcher.requested), sorted(set(fetcher.requested)))
+        self.assertEqual(set(fetcher.requested), set(planner.offsets))
+        self.assertEqual(planner.fetch_count, len(planner.offsets))
+        # 全部由共享存储提供，没有单点回源
+        self.assertEqual(fetcher.fetch_calls, len(planner.offsets) * len(points))
+        self.assertEqual(len(planner.history_store), 0)
+        self.assertTrue(anomalies)
+
+    def test_same_result_as_independent_detection(self):
+        points = [SimpleDataPoint(value=50 + i * 40, timestamp=86400 * 3 + 60 * i) for i in range(4)]
+        independent = []
+        for algo in self._algorithms(_MapFetcher(value=100)):
+            independent.extend(algo.detect_records(points))
+        planned = HistoryPlanner(self._algorithms(_MapFetcher(value=100))).detect_records(points)
+        self.assertEqual([a.anomaly_message for a in planned], [a.anomaly_message for a in independent])
+
+    def test_algorithms_restored_after_detection(self):
+        fetcher = _MapFetcher(value=100)
+        algorithms = self._algorithms(fetcher)
+        algorithms[0].history_fetcher = None
+        originals = [(algo.history_fetcher, algo.history_store) for algo in algorithms]
+        planner = HistoryPlanner(algorithms)
+        points = [SimpleDataPoint(value=50, timestamp=86400 * 3 + 60 * i) for i in range(4)]
+
+        with planner.attached():
+            with planner.attached():
+                self.assertIs(algorithms[0].history_fetcher, fetcher)
+            self.assertTrue(all(algo.history_store is planner.history_store for algo in algorithms))
+        planner.detect_records(points)
+        self.assertEqual([(algo.history_fetcher, algo.history_store) for algo in algorithms], originals)
+
+        # 单独使用时仍然读取自己的存储
+        algorithms[1].detect_records(points)
+        self.assertEqual(len(algorithms[1].history_store), len(points) * len(algorithms[1].history_offsets))
+        self.assertEqual(len(planner.history_store), 0)
+
+    def test_missing_history_not_refetched(self):
+        class _EmptyFetcher(_MapFetcher):
+            def batch_fetch(self, data_points, offsets):
+                self.batch_calls += 1
+                return {}
+
+        fetcher = _EmptyFetcher()
+        planner = HistoryPlanner(self._algorithms(fetcher))
+        planner.detect_records([SimpleDataPoint(value=1, timestamp=86400 * 3)])
+        self.assertEqual(fetcher.batch_calls, len(planner.offsets))
+        self.assertEqual(fetcher.fetch_calls, 0)
+
+
+class TestDetectionPlan(unittest.TestCase):
+    def _points(self):
+        return [SimpleDataPoint(value=v, timestamp=86400 * 3 + 60 * i) for i, v in enumerate([50, 100, 130, 210])]
+
+    def _independent(self, algorithms, points):
+        anomalies = []
+        for algo in algorithms:
+            anomalies.extend(algo.detect_records(points))
+        return [(a.detector.validated_config, a.anomaly_message) for a in anomalies]
+
+    def _planned(self, plan, points):
+        return [(a.detector.validated_config, a.anomaly_message) for a in plan.detect_records(points)]
+
+    def test_duplicate_thresholds_evaluated_once(self):
+        def algorithms():
+            return [create_threshold_algorithm(threshold=t, method="gte") for t in [90, 120, 200] * 4]
+
+        points = self._points()
+        plan = DetectionPlan(algorithms())
+        self.assertEqual(len(plan.context_owners), 1)
+        self.assertEqual(len(plan.comparisons), 3)
+
+        self.assertEqual(self._planned(plan, points), self._independent(algorithms(), points))
+        self.assertEqual(plan.evaluation_count, 3 * len(points))
+
+    def test_ratio_strategies_share_baseline(self):
+        def configs():
+            return [
+                (AdvancedRingRatioAlgorithm, {"floor": floor, "ceil": ceil, "floor_interval": 3, "ceil_interval": 3})
+                for floor in (20, 40)
+                for ceil in (20, 50, 100)
+            ]
+
+        points = self._points()
+        fetcher = _MapFetcher(value=100)
+        plan = DetectionPlan.from_configs(configs(), history_fetcher=fetcher)
+        # 一个历史基准值，2 个下降比较 + 3 个上升比较
+        self.assertEqual(len(plan.context_owners), 1)
+        self.assertEqual(len(plan.comparisons), 5)
+        self.assertEqual(plan.prepared_algorithms, [plan.algorithms[0]])
+
+        independent = [cls(config=config, history_fetcher=_MapFetcher(value=100)) for cls, config in configs()]
+        expected = self._independent(independent, points)
+        self.assertTrue(expected)
+        # 消息使用各自的阈值
+        self.assertEqual(self._planned(plan, points), expected)
+        self.assertEqual(fetcher.batch_calls, len(plan.history_planner.offsets))
+        self.assertLessEqual(plan.evaluation_count, 5 * len(points))
+        self.assertTrue(all(algo.history_store is not plan.history_planner.history_store for algo in plan.algorithms))
+
+    def test_no_fetch_after_release(self):
+        fetcher = _MapFetcher(value=100)
+        configs = [(AdvancedRingRatioAlgorithm, {"floor": 20, "ceil": ceil}) for ceil in (20, 50, 100)]
+        plan = DetectionPlan.from_configs(configs, history_fetcher=fetcher)
+        points = [SimpleDataPoint(value=300, timestamp=86400 * 3 + 60 * i, dimensions={"ip": "a"}) for i in range(10)]
+
+        anomalies = plan.detect_records(points)
+        calls = (fetcher.fetch_calls, fetcher.batch_calls)
+        self.assertEqual(len(plan.history_planner.history_store), 0)
+        self.assertEqual(len(anomalies), 3 * len(points))
+
+        self.assertTrue(all(a.anomaly_message for a in anomalies))
+        self.assertTrue(all(a.context["ceil_history_value"] == 100 for a in anomalies))
+        self.assertEqual((fetcher.fetch_calls, fetcher.batch_calls), calls)
+
+    def test_mixed_strategies(self):
+        def algorithms(fetcher):
+            return [
+                create_simple_ring_ratio(floor=20, history_fetcher=fetcher),
+                create_advanced_ring_ratio(floor=20, ceil=20, floor_interval=2, history_fetcher=fetcher),
+                create_advanced_ring_ratio(floor=20, ceil=20, floor_interval=3, history_fetcher=fetcher),
+                create_year_round_amplitude(ratio=1, shock=1, days=2, history_fetcher=fetcher),
+                create_advanced_ring_ratio(ceil=20, incremental_baseline=True, history_fetcher=fetcher),
+                create_threshold_algorithm(threshold=100, method="gt"),
+            ]
+
+        points = self._points()
+        plan = DetectionPlan(algorithms(_MapFetcher(value=100)))
+        # 不同的回看周期不共享上下文，增量基线独立检测
+        self.assertEqual(len(plan.context_owners), 5)
+        self.assertIsNone(plan.steps[4])
+        self.assertEqual(self._planned(plan, points), self._independent(algorithms(_MapFetcher(value=100)), points))
+
+
+class _AsyncFetcher(IAsyncHistoryFetcher):
+    """带延迟的异步获取器，记录请求数和最大并发数"""
+
+    def __init__(self, value: float = 100, latency: float = 0.01):
+        self.value = value
+        self.latency = latency
+        self.batch_calls = 0
+        self.running = 0
+        self.max_running = 0
+
+    async def fetch(self, data_point, offsets):
+        return [SimpleDataPoint(value=self.value, timestamp=data_point.timestamp - o) for o in offsets]
+
+    async def batch_fetch(self, data_points, offsets):
+        self.batch_calls += 1
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            await asyncio.sleep(self.latency)
+            return {dp.record_id: await self.fetch(dp, offsets) for dp in data_points}
+        finally:
+            self.running -= 1
+
+
+class TestAsyncHistory(unittest.TestCase):
+    def test_adetect_records_matches_sync(self):
+        points = [SimpleDataPoint(value=50 + 40 * i, timestamp=600 + 60 * i) for i in range(4)]
+        sync_algo = create_advanced_ring_ratio(floor=20, ceil=20, history_fetcher=_MapFetcher(value=100))
+        expected = [a.anomaly_message for a in sync_algo.detect_records(points)]
+
+        fetcher = _AsyncFetcher(value=100)
+        algo = create_advanced_ring_ratio(floor=20, ceil=20, async_history_fetcher=fetcher, fetch_concurrency=2)
+        anomalies = asyncio.run(algo.adetect_records(points))
+
+        self.assertEqual([a.anomaly_message for a in anomalies], expected)
+        self.assertEqual(fetcher.batch_calls, len(algo.history_offsets))
+        self.assertEqual(fetcher.max_running, 2)
+
+    def test_inflight_requests_collapsed(self):
+        fetcher = _AsyncFetcher()
+        algo = create_advanced_ring_ratio(floor=20, async_history_fetcher=fetcher)
+        points = [SimpleDataPoint(value=50, timestamp=600)]
+
+        async def run():
+            await asyncio.gather(*(algo.aquery_history_points(points) for _ in range(5)))
+
+        asyncio.run(run())
+        self.assertEqual(fetcher.batch_calls, len(algo.history_offsets))
+        self.assertEqual(len(algo.history_store), len(algo.history_offsets))
+
+    def test_pipeline_uses_async_prefetch(self):
+        fetcher = _AsyncFetcher(value=100)
+        algo = create_simple_ring_ratio(floor=20, async_history_fetcher=fetcher)
+        pipeline = DetectionPipeline(algo, window_size=2)
+        records = [{"value": 50, "timestamp": 600 + 60 * i} for i in range(3)]
+
+        async def collect():
+            return [a async for a in pipeline.arun(records)]
+
+        self.assertEqual(len(asyncio.run(collect())), 3)
+        self.assertEqual(fetcher.batch_calls, 2)
+
+    def test_loader_reusable_across_event_loops(self):
+        fetcher = _AsyncFetcher(latency=0)
+        algo = create_simple_ring_ratio(floor=20, async_history_fetcher=fetcher, fetch_concurrency=1)
+        for ts in (600, 660):
+            asyncio.run(algo.adetect_records([SimpleDataPoint(value=50, timestamp=ts)]))
+        self.assertEqual(fetcher.batch_calls, 2)
@@ -0,0 +1,161 @@
+import asyncio
+import threading
+import time
+import unittest
+
+from tsdetect import SimpleDataPoint, create_intelligent_algorithm
+from tsdetect.algorithms.intelligent import MockSDKClient, SDKResult
+from tsdetect.algorithms.scheduler import PredictScheduler
+
+
+def _points(dims: int = 10, per_dim: int = 3):
+    return [
+        SimpleDataPoint(value=50 + i, timestamp=600 + 60 * i, dimensions={"ip": f"ip-{d}"})
+        for d in range(dims)
+        for i in range(per_dim)
+    ]
+
+
+class _TrackingClient(MockSDKClient):
+    """记录最大并发数，指定维度的批次抛出异常"""
+
+    def __init__(self, fail_ip: str | None = None, **kwargs):
+        super().__init__(**kwargs)
+        self.fail_ip = fail_ip
+        self.running = 0
+        self.max_running = 0
+        self._running_lock = threading.Lock()
+
+    def batch_predict(self, data_groups, **params):
+        with self._running_lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        try:
+            if any(group["dimensions"].get("ip") == self.fail_ip for group in data_groups):
+                raise RuntimeError("backend unavailable")
+            return super().batch_predict(data_groups, **params)
+        finally:
+            with self._running_lock:
+                self.running -= 1
+
+
+class TestPredictScheduler(unittest.TestCase):
+    def test_chunk_by_point_count(self):
+        scheduler = PredictScheduler(MockSDKClient(), max_batch_size=4)
+        groups = [{"data": [{}] * n} for n in (2, 2, 3, 5, 1)]
+        chunks = scheduler.chunk(groups)
+        self.assertEqual([[len(g["data"]) for g in chunk] for chunk in chunks], [[2, 2], [3], [5], [1]])
+
+    def test_groups_packed_into_few_calls(self):
+        client = MockSDKClient(anomaly_threshold=51)
+        algo = create_intelligent_algorithm(use_sdk=True, sdk_client=client, predict_batch_size=9)
+        points = _points()
+        anomalies = algo.detect_records(points)
+
+        self.assertEqual(client.batch_predict_calls, 4)
+        self.assertEqual(client.predict_calls, 0)
+        self.assertEqual(len(anomalies), 10)
+
+    def test_partial_failure_per_chunk(self):
+        client = _TrackingClient(fail_ip="ip-4", anomaly_threshold=51)
+        algo = create_intelligent_algorithm(use_sdk=True, sdk_client=client, predict_batch_size=6)
+        points = _points()
+        algo.pre_detect(points)
+
+        failures = algo.predict_scheduler.failures
+        self.assertEqual(len(failures), 1)
+        self.assertEqual(len(algo._pre_detect_results), len(points) - len(failures[0].indexes))
+
+        # 失败批次的数据点退化为单点调用
+        anomalies = [a for dp in points for a in algo.detect(dp)]
+        self.assertEqual(len(anomalies), 10)
+        self.assertEqual(client.predict_calls, len(failures[0].indexes))
+
+    def test_concurrent_dispatch(self):
+        client = _TrackingClient(latency=0.05)
+        scheduler = PredictScheduler(client, max_batch_size=3, concurrency=4)
+        groups = [{"dimensions": {"ip": str(d)}, "data": [{"__index__": str(d), "value": 1}] * 3} for d in range(8)]
+
+        start = time.perf_counter()
+        results = scheduler.run(groups)
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(len(results), 8)
+        self.assertEqual(client.max_running, 4)
+        self.assertLess(elapsed, 8 * 0.05)
+
+    def test_async_pre_detect(self):
+        client = _TrackingClient(latency=0.01, anomaly_threshold=51)
+        algo = create_intelligent_algorithm(
+            use_sdk=True, sdk_client=client, predict_batch_size=3, predict_concurrency=3
+        )
+        anomalies = asyncio.run(algo.adetect_records(_points()))
+
+        self.assertEqual(len(anomalies), 10)
+        self.assertEqual(client.batch_predict_calls, 10)
+        self.assertEqual(client.max_running, 3)
+        self.assertEqual(client.predict_calls, 0)
+
+    def test_async_retry_uses_scheduler(self):
+        class _FlakyClient(_TrackingClient):
+            def batch_predict(self, data_groups, **params):
+                failing = any(group["dimensions"].get("ip") == self.fail_ip for group in data_groups)
+                try:
+                    return super().batch_predict(data_groups, **params)
+                finally:
+                    # 只失败一次
+                    if failing:
+                        self.fail_ip = None
+
+        client = _FlakyClient(fail_ip="ip-4", anomaly_threshold=51)
+        algo = create_intelligent_algorithm(use_sdk=True, sdk_client=client, predict_batch_size=6)
+
+        def _blocking_pre_detect(data_points):
+            raise AssertionError("pre_detect must not run inside aprepare_records")
+
+        algo.pre_detect = _blocking_pre_detect
+        points = _points()
+        asyncio.run(algo.aprepare_records(points))
+        self.assertEqual(len(algo._pre_detect_results), len(points))
+        # 4 个成功的批次 + 失败批次的重试（抛出异常的调用不计数）
+        self.assertEqual(client.batch_predict_calls, 5)
+        self.assertEqual(client.predict_calls, 0)
+
+    def test_detect_accepts_context(self):
+        algo = create_intelligent_algorithm()
+        dp = SimpleDataPoint(value=1, timestamp=600, values={"is_anomaly": 1})
+        anomalies = algo.detect(dp, algo.get_context(dp))
+        self.assertEqual(len(anomalies), 1)
+
+
+class TestSDKResult(unittest.TestCase):
+    def test_parsed_once_and_immutable(self):
+        raw = {"is_anomaly": 1, "extra_info": '{"anomaly_score": 0.1234, "alert_msg": "spike"}'}
+        result = SDKResult(raw)
+
+        self.assertEqual(result["extra_info"], {"anomaly_score": 0.1234, "alert_msg": "spike"})
+        self.assertEqual(result["anomaly_score"], 0.12)
+        self.assertEqual(result["alert_msg"], "spike")
+        self.assertIs(SDKResult.from_values(result), result)
+        # 原始结果不被修改
+        self.assertIsInstance(raw["extra_info"], str)
+        with self.assertRaises(TypeError):
+            result["is_anomaly"] = 0
+        with self.assertRaises(AttributeError):
+            result.extra = 1
+
+    def test_invalid_or_missing_extra_info(self):
+        self.assertEqual(SDKResult({"extra_info": "{bad"})["extra_info"], {})
+        self.assertEqual(dict(SDKResult(None)), {"extra_info": {}})
+
+    def test_pre_detect_results_shared_with_context(self):
+        client = MockSDKClient(anomaly_threshold=51)
+        algo = create_intelligent_algorithm(use_sdk=True, sdk_client=client)
+        points = _points(dims=2)
+        algo.pre_detect(points)
+        self.assertTrue(all(isinstance(r, SDKResult) for r in algo._pre_detect_results.values()))
+
+        anomalies = [a for dp in points for a in algo.detect(dp)]
+        self.assertEqual(len(anomalies), 2)
+        self.assertEqual(anomalies[0].data_point.record_id, points[2].record_id)
+        self.assertIn("anomaly_score=0.52", anomalies[0].anomaly_message)
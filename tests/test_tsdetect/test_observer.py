@@ -0,0 +1,105 @@
+import io
+import unittest
+
+from tsdetect import (
+    InMemoryObserver,
+    SimpleDataPoint,
+    SimpleRingRatioAlgorithm,
+    ThresholdAlgorithm,
+    create_intelligent_algorithm,
+)
+from tsdetect.algorithms.intelligent import MockSDKClient
+from tsdetect.core.interfaces import IHistoryFetcher
+
+
+class _ConstFetcher(IHistoryFetcher):
+    def __init__(self, value: float):
+        self.value = value
+
+    def fetch(self, data_point, offsets):
+        return [SimpleDataPoint(value=self.value, timestamp=data_point.timestamp - o) for o in offsets]
+
+    def batch_fetch(self, data_points, offsets):
+        return {dp.record_id: self.fetch(dp, offsets) for dp in data_points}
+
+
+def _points(n: int = 10):
+    return [SimpleDataPoint(value=100.0 + 50 * (i % 2), timestamp=600 + 60 * i) for i in range(n)]
+
+
+class TestInMemoryObserver(unittest.TestCase):
+    def test_disabled_by_default(self):
+        algo = SimpleRingRatioAlgorithm(config={"floor": 10, "ceil": 10}, history_fetcher=_ConstFetcher(100))
+        self.assertIsNone(algo.observer)
+        self.assertTrue(all(d.observer is None for d in algo.detectors))
+
+    def test_ring_ratio_phases(self):
+        observer = InMemoryObserver()
+        algo = SimpleRingRatioAlgorithm(
+            config={"floor": 10, "ceil": 10}, history_fetcher=_ConstFetcher(100), observer=observer
+        )
+        anomalies = algo.detect_records(_points())
+        messages = [a.anomaly_message for a in anomalies]
+        self.assertEqual(len(messages), 5)
+
+        name = "SimpleRingRatioAlgorithm"
+        self.assertEqual(observer.get(name, "get_context").count, 10)
+        self.assertEqual(observer.get(name, "extra_context").count, 10)
+        # 子检测器以集合的名称上报
+        self.assertGreaterEqual(observer.get(name, "evaluate").count, 10)
+        self.assertIsNone(observer.get("ExpressionDetector", "evaluate"))
+        # 历史数据已批量预加载
+        self.assertEqual(observer.get(name, "fetch_history_point").outcomes, {"hit": 10})
+        self.assertGreaterEqual(observer.get(name, "format_message").count, 5)
+
+    def test_history_miss(self):
+        observer = InMemoryObserver()
+        algo = SimpleRingRatioAlgorithm(
+            config={"floor": 10, "ceil": 10}, history_fetcher=_ConstFetcher(100), observer=observer
+        )
+        algo.detect(_points(2)[1])
+        self.assertEqual(observer.get("SimpleRingRatioAlgorithm", "fetch_history_point").outcomes, {"miss": 1})
+
+    def test_threshold_and_results_unchanged(self):
+        config = [[{"method": "gt", "threshold": 120}]]
+        observed = ThresholdAlgorithm(config=config, observer=InMemoryObserver())
+        plain = ThresholdAlgorithm(config=config)
+        self.assertEqual(
+            [a.anomaly_message for a in observed.detect_records(_points())],
+            [a.anomaly_message for a in plain.detect_records(_points())],
+        )
+
+    def test_sdk_calls(self):
+        observer = InMemoryObserver()
+        algo = create_intelligent_algorithm(
+            use_sdk=True, sdk_client=MockSDKClient(anomaly_threshold=120), observer=observer
+        )
+        algo.detect_records(_points())
+        stats = observer.get(algo.__class__.__name__, "pre_detect")
+        self.assertEqual(stats.outcomes, {"batch": 1})
+
+    def test_report(self):
+        observer = InMemoryObserver()
+        observer.record("Algo", "evaluate", 0.001)
+        observer.record("Algo", "fetch_history_point", 0.002, "hit")
+        observer.record("Algo", "fetch_history_point", 0.004, "miss")
+
+        snapshot = observer.snapshot()
+        self.assertEqual(snapshot["Algo"]["fetch_history_point"]["count"], 2)
+        self.assertAlmostEqual(snapshot["Algo"]["fetch_history_point"]["mean"], 0.003)
+        self.assertAlmostEqual(snapshot["Algo"]["fetch_history_point"]["max"], 0.004)
+
+        out = io.StringIO()
+        observer.print_report(file=out)
+        lines = out.getvalue().splitlines()
+        self.assertEqual(lines[0], "Algo")
+        # 按总耗时降序
+        self.assertTrue(lines[2].strip().startswith("fetch_history_point"))
+        self.assertIn("hit=1 miss=1", lines[2])
+
+        observer.reset()
+        self.assertEqual(len(observer), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,136 @@
+import threading
+import unittest
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+from tsdetect import (
+    DetectionPipeline,
+    RingBufferHistoryStore,
+    SimpleDataPoint,
+    SimpleRingRatioAlgorithm,
+)
+from tsdetect.core.interfaces import IHistoryFetcher
+
+
+class _CountingFetcher(IHistoryFetcher):
+    """历史值为时间戳 / 60 + 10，timestamp < 0 的点不存在"""
+
+    def __init__(self):
+        self.fetch_calls = 0
+        self.batch_calls = 0
+        self.requested = 0
+
+    def _point(self, dp, offset):
+        ts = dp.timestamp - offset
+        if ts < 0:
+            return None
+        return SimpleDataPoint(value=ts / 60 + 10, timestamp=ts, dimensions=dp.dimensions)
+
+    def fetch(self, data_point, offsets):
+        self.fetch_calls += 1
+        self.requested += len(offsets)
+        return [self._point(data_point, o) for o in offsets]
+
+    def batch_fetch(self, data_points, offsets):
+        self.batch_calls += 1
+        self.requested += len(data_points) * len(offsets)
+        return {dp.record_id: [self._point(dp, o) for o in offsets] for dp in data_points}
+
+
+def _point(ts: int, value: float, ip: str = "a"):
+    return SimpleDataPoint(value=value, timestamp=ts, dimensions={"ip": ip})
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class TestRingBufferHistoryStore(unittest.TestCase):
+    def test_observed_points_are_served_locally(self):
+        store = RingBufferHistoryStore(interval=60, retention=600)
+        store.observe_many([_point(60 * i, float(i)) for i in range(5)])
+
+        dp = _point(300, 5.0)
+        history = store.fetch(dp, [60, 120, 600])
+        self.assertEqual([hp.value for hp in history[:2]], [4.0, 3.0])
+        self.assertEqual(history[0].timestamp, 240)
+        self.assertEqual(history[0].dimensions, {"ip": "a"})
+        # 未写入且没有 fallback
+        self.assertIsNone(history[2])
+        self.assertEqual((store.hits, store.misses), (2, 1))
+
+        # 其他序列互不影响
+        self.assertEqual(store.fetch(_point(300, 5.0, ip="b"), [60]), [None])
+
+    def test_overwritten_slots_are_misses(self):
+        store = RingBufferHistoryStore(interval=60, retention=120)
+        store.observe_many([_point(60 * i, float(i)) for i in range(10)])
+        self.assertEqual(store.capacity, 3)
+        self.assertEqual(store.fetch(_point(600, 0), [60, 120])[1].value, 8.0)
+        self.assertIsNone(store.fetch(_point(600, 0), [240])[0])
+        # 超出保留范围的旧数据不覆盖新数据
+        store.observe(_point(0, 100.0))
+        self.assertEqual(store.fetch(_point(600, 0), [60])[0].value, 9.0)
+
+    def test_fallback_only_for_gaps(self):
+        fallback = _CountingFetcher()
+        store = RingBufferHistoryStore(interval=60, retention=3600, fallback=fallback)
+        store.observe(_point(240, 99.0))
+
+        points = [_point(300, 1.0), _point(300, 1.0, ip="b")]
+        result = store.batch_fetch(points, [60, 120, 600])
+        self.assertEqual(result[points[0].record_id][0].value, 99.0)
+        self.assertEqual(result[points[0].record_id][1].value, 13.0)
+        # timestamp < 0 的历史点不存在
+        self.assertIsNone(result[points[0].record_id][2])
+        self.assertEqual([hp and hp.value for hp in result[points[1].record_id]], [14.0, 13.0, None])
+        self.assertEqual(fallback.batch_calls, 2)
+        self.assertEqual(fallback.requested, 2 + 3)
+
+        # 回填后（包括不存在的点）不再查询 fallback
+        again = store.batch_fetch(points, [60, 120, 600])
+        self.assertEqual(fallback.batch_calls, 2)
+        self.assertEqual(again[points[1].record_id][1].value, 13.0)
+        self.assertEqual(store.fetch(points[1], [60])[0].value, 14.0)
+        self.assertEqual(fallback.fetch_calls, 0)
+
+    def test_empty_store_is_a_fetcher(self):
+        store = RingBufferHistoryStore(interval=60, retention=3600, fallback=_CountingFetcher())
+        algorithm = SimpleRingRatioAlgorithm(config={"ceil": 50}, history_fetcher=store)
+
+        self.assertEqual(len(store), 0)
+        self.assertEqual(len(algorithm.detect_records([_point(300, 100.0)])), 1)
+        self.assertEqual(store.fallback_calls, 1)
+
+    def test_fallback_calls_counted_across_threads(self):
+        store = RingBufferHistoryStore(interval=60, retention=3600, fallback=_CountingFetcher())
+
+        def worker(ip):
+            for i in range(1, 51):
+                store.fetch(_point(60 * i, 1.0, ip=ip), [60])
+
+        threads = [threading.Thread(target=worker, args=(f"ip-{n}",)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(store.fallback_calls, 8 * 50)
+
+    def test_pipeline_feeds_store(self):
+        fallback = _CountingFetcher()
+        store = RingBufferHistoryStore(interval=60, retention=3600, fallback=fallback)
+        algorithm = SimpleRingRatioAlgorithm(config={"floor": 50, "ceil": 50}, history_fetcher=store)
+        pipeline = DetectionPipeline(algorithm, window_size=2, history_recorder=store)
+
+        records = [_point(60 * i, 10.0, ip=ip) for i in range(1, 6) for ip in ("a", "b")]
+        records[-1] = _point(300, 100.0, ip="b")
+        anomalies = list(pipeline.run(records))
+
+        self.assertEqual([a.data_point.record_id for a in anomalies], [records[-1].record_id])
+        # 只有第一个窗口需要查询 fallback，之后的历史数据来自检测流本身
+        self.assertEqual(fallback.batch_calls, 1)
+        self.assertEqual(len(store), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+import pickle
+import unittest
+
+from tsdetect import AlgorithmSpec, DataPointBlock, DetectionError, ShardedDetector, SimpleDataPoint
+from tsdetect import sharded
+from tsdetect.core.base import BaseAnomalyPoint
+from tsdetect.core.interfaces import IHistoryFetcher
+
+
+class _ConstFetcher(IHistoryFetcher):
+    """所有历史点均为固定值（可序列化，供工作进程使用）"""
+
+    def __init__(self, value: float):
+        self.value = value
+
+    def fetch(self, data_point, offsets):
+        return [SimpleDataPoint(value=self.value, timestamp=data_point.timestamp - o) for o in offsets]
+
+    def batch_fetch(self, data_points, offsets):
+        return {dp.record_id: self.fetch(dp, offsets) for dp in data_points}
+
+
+def _points():
+    return [
+        SimpleDataPoint(value=float((i * 7 + d * 13) % 200), timestamp=60 * (i + 1), dimensions={"ip": f"ip-{d}"})
+        for i in range(20)
+        for d in range(12)
+    ]
+
+
+SPECS = [
+    AlgorithmSpec("Threshold", [[{"method": "gt", "threshold": 150}]]),
+    AlgorithmSpec("SimpleRingRatio", {"ceil": 50}, history_fetcher=_ConstFetcher(100.0)),
+]
+
+
+class TestShardedDetector(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.detector = ShardedDetector(SPECS, workers=3)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.detector.close()
+
+    def _sequential(self, points):
+        anomalies = []
+        for spec in SPECS:
+            anomalies.extend(spec.build().detect_records(points))
+        return anomalies
+
+    def test_matches_sequential_detection(self):
+        points = _points()
+        expected = self._sequential(points)
+        anomalies = self.detector.detect_records(points)
+
+        self.assertGreater(len(expected), 0)
+        self.assertEqual(
+            [(a.anomaly_id, a.anomaly_message) for a in anomalies],
+            [(a.anomaly_id, a.anomaly_message) for a in expected],
+        )
+        self.assertTrue(all(a.data_point is e.data_point for a, e in zip(anomalies, expected, strict=True)))
+        self.assertEqual(
+            [[type(c).__name__ for c in a.child_detectors] for a in anomalies],
+            [[type(c).__name__ for c in a.child_detectors] for a in expected],
+        )
+
+    def test_block_input(self):
+        points = _points()
+        block = DataPointBlock.from_points(points)
+        anomalies = self.detector.detect_records(block)
+        self.assertEqual([a.anomaly_id for a in anomalies], [a.anomaly_id for a in self._sequential(points)])
+
+    def test_partition_keeps_series_together(self):
+        block = DataPointBlock.from_points(_points())
+        shards = self.detector.partition(block)
+
+        self.assertEqual(sorted(row for rows in shards for row in rows), list(range(len(block))))
+        for rows in shards:
+            series = {block.dimension_ids[row] for row in rows}
+            for other in shards:
+                if other is not rows:
+                    self.assertFalse(series & {block.dimension_ids[row] for row in other})
+
+
+class TestShardedValues(unittest.TestCase):
+    """依赖 values 和预设 record_id 的算法在分片后结果不变"""
+
+    def test_intelligent_matches_sequential(self):
+        points = [
+            SimpleDataPoint(
+                {"record_id": f"preset-{i}", "values": {"is_anomaly": 1 if i % 5 == 0 else 0}},
+                value=float(i),
+                timestamp=60 * (i + 1),
+                dimensions={"ip": f"ip-{i % 3}"},
+            )
+            for i in range(40)
+        ]
+        spec = AlgorithmSpec("IntelligentDetect", {"use_sdk": False})
+        expected = spec.build().detect_records(points)
+
+        with ShardedDetector([spec], workers=2) as detector:
+            anomalies = detector.detect_records(points)
+
+        self.assertEqual(len(expected), 8)
+        self.assertEqual([a.anomaly_id for a in anomalies], [a.anomaly_id for a in expected])
+        self.assertTrue(all(a.anomaly_id.startswith("preset-") for a in anomalies))
+
+
+class TestShardRows(unittest.TestCase):
+    def test_foreign_anomaly_point_raises(self):
+        algorithm = SPECS[0].build()
+        foreign = SimpleDataPoint(value=1000.0, timestamp=60, dimensions={"ip": "foreign"})
+        algorithm.detect_records = lambda points, level=1: [BaseAnomalyPoint(foreign, algorithm, "foreign")]
+        block = DataPointBlock.from_points(_points()[:12])
+
+        original = sharded._worker_algorithms
+        sharded._worker_algorithms = [algorithm]
+        try:
+            with self.assertRaises(DetectionError) as ctx:
+                sharded._detect_shard(block, 1, False)
+        finally:
+            sharded._worker_algorithms = original
+        self.assertIn(foreign.record_id, str(ctx.exception))
+
+
+class TestBlockTransport(unittest.TestCase):
+    def test_compact_take_roundtrip(self):
+        block = DataPointBlock.from_points(_points())
+        sub = block.take(range(0, len(block), 12), compact=True)
+
+        self.assertEqual(len(sub.dimensions), 1)
+        restored = pickle.loads(pickle.dumps(sub))
+        self.assertEqual([dp.record_id for dp in restored], [block[i].record_id for i in range(0, len(block), 12)])
+        self.assertEqual(restored.intern_dimensions({"ip": "ip-0"}), 0)
@@ -0,0 +1,117 @@
+import os
+import tempfile
+import unittest
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+from tsdetect import (
+    HistorySnapshot,
+    MmapHistoryFetcher,
+    SimpleDataPoint,
+    SimpleRingRatioAlgorithm,
+    SnapshotWriter,
+    write_snapshot,
+)
+from tsdetect.core.interfaces import IHistoryFetcher
+
+
+def _points():
+    return [
+        SimpleDataPoint(value=float(i * 10 + d), timestamp=60 * i, unit="ms", dimensions={"ip": f"ip-{d}"})
+        for i in range(10)
+        for d in range(3)
+    ]
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class TestHistorySnapshot(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._tmp.name, "snapshot")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_round_trip(self):
+        # 乱序写入、重复时间戳保留最后写入的值
+        points = list(reversed(_points()))
+        points.append(SimpleDataPoint(value=-1.0, timestamp=0, unit="ms", dimensions={"ip": "ip-0"}))
+        write_snapshot(self.path, points)
+
+        snapshot = HistorySnapshot(self.path)
+        self.assertEqual(len(snapshot), 30)
+        self.assertIsInstance(snapshot.values, np.memmap)
+
+        series_id = snapshot.series_id({"ip": "ip-1"})
+        timestamps, values = snapshot.series(series_id)
+        self.assertEqual(timestamps.tolist(), [60 * i for i in range(10)])
+        self.assertEqual(values.tolist(), [float(i * 10 + 1) for i in range(10)])
+        # 零拷贝切片
+        self.assertTrue(np.shares_memory(values, snapshot.values))
+        self.assertEqual(snapshot.series(snapshot.series_id({"ip": "ip-0"}))[1][0], -1.0)
+        self.assertIsNone(snapshot.series_id({"ip": "missing"}))
+
+    def test_iter_points(self):
+        write_snapshot(self.path, _points())
+        snapshot = HistorySnapshot(self.path)
+
+        replayed = list(snapshot.iter_points(start=120, end=240))
+        self.assertEqual([dp.timestamp for dp in replayed], [120, 120, 120, 180, 180, 180])
+        self.assertEqual([dp.value for dp in replayed[:3]], [20.0, 21.0, 22.0])
+        self.assertEqual(replayed[0].unit, "ms")
+        self.assertEqual(replayed[0].dimensions, {"ip": "ip-0"})
+        self.assertEqual(len(list(snapshot.iter_points())), 30)
+
+    def test_writer_discards_on_error(self):
+        with self.assertRaises(RuntimeError):
+            with SnapshotWriter(self.path) as writer:
+                writer.add_many(_points())
+                raise RuntimeError("boom")
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_fetcher(self):
+        write_snapshot(self.path, _points())
+        fetcher = MmapHistoryFetcher(self.path)
+
+        dp = SimpleDataPoint(value=0.0, timestamp=300, dimensions={"ip": "ip-2"})
+        history = fetcher.fetch(dp, [60, 30, 300, 600])
+        self.assertEqual(history[0].value, 42.0)
+        self.assertEqual(history[0].timestamp, 240)
+        self.assertEqual(history[0].unit, "ms")
+        self.assertIsNone(history[1])
+        self.assertEqual(history[2].value, 2.0)
+        self.assertIsNone(history[3])
+
+        other = SimpleDataPoint(value=0.0, timestamp=300, dimensions={"ip": "missing"})
+        result = fetcher.batch_fetch([dp, other], [60])
+        self.assertEqual(result[dp.record_id][0].value, 42.0)
+        self.assertEqual(result[other.record_id], [None])
+
+    def test_replay(self):
+        points = _points()
+        write_snapshot(self.path, points)
+        snapshot = HistorySnapshot(self.path)
+        by_key = {(dp.dimensions["ip"], dp.timestamp): dp for dp in points}
+
+        class _DictFetcher(IHistoryFetcher):
+            def fetch(self, data_point, offsets):
+                return [by_key.get((data_point.dimensions["ip"], data_point.timestamp - o)) for o in offsets]
+
+            def batch_fetch(self, data_points, offsets):
+                return {dp.record_id: self.fetch(dp, offsets) for dp in data_points}
+
+        def replay(fetcher):
+            algorithm = SimpleRingRatioAlgorithm(config={"floor": 50, "ceil": 50}, history_fetcher=fetcher)
+            anomalies = algorithm.detect_records(list(snapshot.iter_points(start=60)))
+            return [(a.data_point.record_id, a.anomaly_message) for a in anomalies]
+
+        expected = replay(_DictFetcher())
+        self.assertTrue(expected)
+        self.assertEqual(replay(MmapHistoryFetcher(snapshot)), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import asyncio
+import unittest
+
+from tsdetect import SimpleDataPoint, create_simple_ring_ratio, create_threshold_algorithm
+from tsdetect.core.exceptions import InvalidDataPointError
+from tsdetect.core.interfaces import IHistoryFetcher
+from tsdetect.stream import DetectionPipeline
+
+
+class _ConstFetcher(IHistoryFetcher):
+    """所有历史点均为固定值，记录批量请求大小"""
+
+    def __init__(self, value: float):
+        self.value = value
+        self.batch_sizes = []
+
+    def fetch(self, data_point, offsets):
+        return [SimpleDataPoint(value=self.value, timestamp=data_point.timestamp - o) for o in offsets]
+
+    def batch_fetch(self, data_points, offsets):
+        self.batch_sizes.append(len(data_points))
+        return {dp.record_id: self.fetch(dp, offsets) for dp in data_points}
+
+
+def _records(count: int):
+    for i in range(count):
+        yield {"value": 200 if i % 10 == 0 else 100, "timestamp": 60 * (i + 1), "dimensions": {"ip": "a"}}
+
+
+class TestDetectionPipeline(unittest.TestCase):
+    def test_run_prefetches_per_window_and_releases_history(self):
+        fetcher = _ConstFetcher(100.0)
+        algo = create_simple_ring_ratio(ceil=50, history_fetcher=fetcher)
+        pipeline = DetectionPipeline(algo, window_size=8, level=3)
+
+        anomalies = list(pipeline.run(_records(20)))
+
+        self.assertEqual(len(anomalies), 2)
+        self.assertTrue(all(a.level == 3 for a in anomalies))
+        self.assertEqual(fetcher.batch_sizes, [8, 8, 4])
+        self.assertEqual(pipeline.processed, 20)
+        self.assertEqual(len(algo.history_store), 0)
+
+    def test_run_is_lazy(self):
+        pipeline = DetectionPipeline(create_threshold_algorithm(threshold=150), window_size=5)
+        first = next(pipeline.run(_records(10_000_000)))
+        self.assertEqual(first.value, 200.0)
+        self.assertEqual(pipeline.processed, 5)
+
+    def test_invalid_records(self):
+        records = [{"value": 1, "timestamp": 60}, {"timestamp": 120}]
+        pipeline = DetectionPipeline(create_threshold_algorithm(threshold=150))
+        self.assertEqual(list(pipeline.run(records)), [])
+        self.assertEqual(pipeline.skipped, 1)
+
+        with self.assertRaises(InvalidDataPointError):
+            list(DetectionPipeline(create_threshold_algorithm(threshold=150), strict=True).run(records))
+
+    def test_arun_async_iterable(self):
+        async def source():
+            for record in _records(25):
+                yield record
+
+        async def collect():
+            pipeline = DetectionPipeline(create_threshold_algorithm(threshold=150), window_size=10)
+            return [a async for a in pipeline.arun(source())]
+
+        self.assertEqual(len(asyncio.run(collect())), 3)
+
+    def test_arun_flushes_partial_window_after_max_wait(self):
+        async def collect():
+            queue: asyncio.Queue = asyncio.Queue()
+
+            async def source():
+                while True:
+                    record = await queue.get()
+                    if record is None:
+                        return
+                    yield record
+
+            pipeline = DetectionPipeline(create_threshold_algorithm(threshold=150), window_size=100)
+            await queue.put({"value": 200, "timestamp": 60})
+            stream = pipeline.arun(source(), max_wait=0.01)
+            # 窗口未满，但等待超时后应产出异常
+            anomaly = await asyncio.wait_for(anext(stream), timeout=1)
+            await queue.put(None)
+            rest = [a async for a in stream]
+            return anomaly, rest
+
+        anomaly, rest = asyncio.run(collect())
+        self.assertEqual(anomaly.value, 200.0)
+        self.assertEqual(rest, [])
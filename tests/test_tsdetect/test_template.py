@@ -0,0 +1,73 @@
+import unittest
+
+from tsdetect import SimpleDataPoint, create_threshold_algorithm
+from tsdetect.core.algorithms import DetectContext
+from tsdetect.core.interfaces import ITemplateEngine
+from tsdetect.utils.template import UNCOMPILED, FormatTemplateEngine, TemplateCache, compile_format_template
+
+
+class _RenderOnlyEngine(ITemplateEngine):
+    """不支持编译的模板引擎"""
+
+    def __init__(self):
+        self.contexts = []
+
+    def render(self, template, context):
+        self.contexts.append(context)
+        return template.upper()
+
+    def compile(self, template):
+        return None
+
+
+class TestFormatTemplate(unittest.TestCase):
+    def test_field_names(self):
+        compiled = compile_format_template("{value:.{digits}f} {unit} {data_point.value} {dims[ip]} {{x}} {value}")
+        self.assertEqual(compiled.names, ("value", "digits", "unit", "data_point", "dims"))
+        self.assertIs(compiled, compile_format_template(compiled.template))
+
+    def test_only_referenced_keys_resolved(self):
+        resolved = []
+
+        def resolver(name, value):
+            def resolve():
+                resolved.append(name)
+                return value
+
+            return resolve
+
+        context = DetectContext(resolvers={"value": resolver("value", 1.5), "history": resolver("history", 3)})
+        context.register_group(lambda: resolved.append("group") or {"extra": 1})
+
+        engine = FormatTemplateEngine()
+        self.assertEqual(engine.render("value={value:.1f}", context), "value=1.5")
+        self.assertEqual(resolved, ["value"])
+
+        with self.assertRaises(KeyError):
+            engine.render("{missing}", context)
+
+
+class TestTemplateCache(unittest.TestCase):
+    def test_compiles_once_per_engine_and_template(self):
+        cache = TemplateCache()
+        engine = FormatTemplateEngine()
+        for value in range(5):
+            self.assertEqual(cache.render(engine, "v={value}", {"value": value}), f"v={value}")
+        self.assertEqual((cache.hits, cache.misses), (4, 1))
+
+        cache.render(FormatTemplateEngine(), "v={value}", {"value": 1})
+        self.assertEqual(len(cache), 2)
+
+    def test_uncompiled_engine_falls_back_to_render(self):
+        cache = TemplateCache()
+        engine = _RenderOnlyEngine()
+        context = DetectContext({"value": 1})
+
+        self.assertEqual(cache.render(engine, "v={value}", context), "V={VALUE}")
+        self.assertIs(cache.get(engine, "v={value}"), UNCOMPILED)
+        self.assertIsInstance(engine.contexts[0], dict)
+
+    def test_algorithm_message_uses_engine(self):
+        algo = create_threshold_algorithm(threshold=50, template_engine=FormatTemplateEngine())
+        anomaly = algo.detect(SimpleDataPoint(value=100, timestamp=60))[0]
+        self.assertEqual(anomaly.anomaly_message, "value > 50.0")
@@ -0,0 +1,113 @@
+import random
+import unittest
+
+from tsdetect import SimpleDataPoint
+from tsdetect.algorithms.threshold import (
+    THRESHOLD_METHODS,
+    AndThresholdAlgorithm,
+    ThresholdAlgorithm,
+    _ThresholdFastPathMixin,
+)
+from tsdetect.batch.frame import np
+from tsdetect.core.algorithms import BaseAlgorithmCollection
+from tsdetect.units.base import SimpleUnitConverter
+
+if np is not None:
+    from tsdetect.batch import BatchDetector
+
+
+def _random_config(rng: random.Random, groups: int):
+    candidates = [0, 10, 50, 50.5, 80, 100, 120, 150]
+    return [
+        [
+            {"method": rng.choice(list(THRESHOLD_METHODS)), "threshold": rng.choice(candidates)}
+            for _ in range(rng.randint(1, 3))
+        ]
+        for _ in range(groups)
+    ]
+
+
+def _points(rng: random.Random, count: int = 200):
+    values = [0, 10, 50, 50.5, 80, 100, 120, 150, float("nan")]
+    return [
+        SimpleDataPoint(
+            value=rng.choice(values) if rng.random() < 0.5 else rng.uniform(-10, 160),
+            timestamp=60 * i,
+            unit=rng.choice(["KB", "B", "MB"]),
+        )
+        for i in range(count)
+    ]
+
+
+def _expression_detect(algo, dp):
+    """表达式求值的检测结果（绕过快速路径）"""
+    return BaseAlgorithmCollection.detect(algo, dp)
+
+
+class TestThresholdFastPath(unittest.TestCase):
+    def test_matches_expression_evaluation(self):
+        rng = random.Random(3)
+        for groups in (1, 2, 12):
+            for _ in range(20):
+                config = _random_config(rng, groups)
+                for converter in (None, SimpleUnitConverter()):
+                    algo = ThresholdAlgorithm(config=config, unit="KB", unit_converter=converter)
+                    for dp in _points(rng, 50):
+                        fast = algo.detect(dp)
+                        slow = _expression_detect(algo, dp)
+                        self.assertEqual(
+                            [a.anomaly_message for a in fast], [a.anomaly_message for a in slow], (config, dp)
+                        )
+
+    def test_and_threshold(self):
+        config = {"thresholds": [{"method": "gte", "threshold": 90}, {"method": "neq", "threshold": 95}]}
+        algo = AndThresholdAlgorithm(config=config)
+        self.assertEqual(
+            [bool(algo.detect(SimpleDataPoint(value=v, timestamp=60))) for v in (89, 90, 95, 99)],
+            [
+                False,
+                True,
+                False,
+                True,
+            ],
+        )
+
+    def test_bounds_precomputed_per_unit(self):
+        algo = ThresholdAlgorithm(
+            config=[[{"method": "gt", "threshold": 1}]], unit="KB", unit_converter=SimpleUnitConverter()
+        )
+        self.assertIs(algo.threshold_bounds("MB"), algo.threshold_bounds("MB"))
+        # 阈值与数据值按数据单位转换到最小单位后比较
+        self.assertEqual(algo.threshold_bounds("MB").intervals[0].low, 1024**2)
+        self.assertTrue(algo.detect(SimpleDataPoint(value=2, timestamp=60, unit="MB")))
+        self.assertFalse(algo.detect(SimpleDataPoint(value=0.5, timestamp=60, unit="MB")))
+
+    def test_many_groups_use_sorted_intervals(self):
+        config = [
+            [{"method": "gte", "threshold": 10 * i}, {"method": "lt", "threshold": 10 * i + 5}] for i in range(20)
+        ]
+        algo = ThresholdAlgorithm(config=config)
+        bounds = algo.threshold_bounds("")
+        self.assertEqual(len(bounds.merged), 20)
+        for value in (0, 4.99, 5, 9, 10, 195, 199, 200, -1):
+            self.assertEqual(bounds.contains(value), any(10 * i <= value < 10 * i + 5 for i in range(20)), value)
+
+    def test_threshold_groups_required(self):
+        class _NoGroups(_ThresholdFastPathMixin, BaseAlgorithmCollection):
+            def _gen_detectors(self):
+                return iter(())
+
+        with self.assertRaises(TypeError):
+            _NoGroups(config={})
+
+    @unittest.skipIf(np is None, "numpy is not installed")
+    def test_batch_matches_expression_evaluation(self):
+        rng = random.Random(5)
+        for groups in (1, 3, 12):
+            for _ in range(10):
+                algo = ThresholdAlgorithm(
+                    config=_random_config(rng, groups), unit="KB", unit_converter=SimpleUnitConverter()
+                )
+                points = _points(rng)
+                result = BatchDetector(algo).detect_points(points)
+                self.assertEqual(result.mask.tolist(), [bool(_expression_detect(algo, dp)) for dp in points])
@@ -0,0 +1,58 @@
+import random
+import unittest
+
+from tsdetect.batch.frame import np
+from tsdetect.units.base import MappedUnitConverter, SimpleUnitConverter
+
+
+def _linear_auto_convert(converter, value, unit, decimal=2):
+    """逐个单位查找的参考实现"""
+    unit_group = next((units for units in converter.UNIT_GROUPS.values() if unit in units), None)
+    if not unit or not unit_group:
+        return round(value, decimal), unit
+    min_value = converter.convert(value, unit, None)
+    for target_unit in unit_group:
+        multiplier = converter.UNIT_MULTIPLIERS.get(target_unit, 1)
+        converted = min_value / multiplier if multiplier else min_value
+        if 1 <= abs(converted) < 1000 or target_unit == unit_group[-1]:
+            return round(converted, decimal), target_unit
+
+
+def _values(rng: random.Random, count: int = 300):
+    magnitudes = [rng.uniform(0, 10) * 10 ** rng.randint(-12, 18) for _ in range(count)]
+    return [m if rng.random() < 0.8 else -m for m in magnitudes] + [0.0, 1.0, 999.0, 1000.0, 1024.0]
+
+
+class TestUnitIndex(unittest.TestCase):
+    def test_auto_convert_matches_linear_scan(self):
+        rng = random.Random(17)
+        converter = SimpleUnitConverter()
+        for unit in ["B", "KB", "GB", "ns", "ms", "s", "h", "%", "bps", "Mbps", "unknown", ""]:
+            for value in _values(rng):
+                self.assertEqual(converter.auto_convert(value, unit), _linear_auto_convert(converter, value, unit))
+
+    def test_add_unit_updates_index(self):
+        converter = MappedUnitConverter({"g": 1, "kg": 1000}, {"mass": ["g", "kg"]})
+        self.assertEqual(converter.auto_convert(5_000_000, "g"), (5000.0, "kg"))
+
+        converter.add_unit("t", 1_000_000, group="mass")
+        self.assertEqual(converter.auto_convert(5_000_000, "g"), (5.0, "t"))
+        self.assertEqual(converter.auto_convert(5, "lb"), (5, "lb"))
+
+    def test_unordered_group(self):
+        converter = MappedUnitConverter({"a": 1000, "b": 1, "c": 0}, {"g": ["a", "b", "c"]})
+        rng = random.Random(2)
+        for value in _values(rng):
+            self.assertEqual(converter.auto_convert(value, "b"), _linear_auto_convert(converter, value, "b"))
+
+    @unittest.skipIf(np is None, "numpy is not installed")
+    def test_auto_convert_many(self):
+        rng = random.Random(23)
+        converter = SimpleUnitConverter()
+        for unit in ["B", "ms", "Kbps", "unknown", ""]:
+            values = _values(rng) + [float("nan")]
+            converted, units = converter.auto_convert_many(np.array(values), unit)
+            expected = [converter.auto_convert(v, unit) for v in values]
+
+            self.assertEqual(units.tolist(), [u for _, u in expected])
+            np.testing.assert_allclose(converted, [v for v, _ in expected], rtol=1e-12, atol=0.011)
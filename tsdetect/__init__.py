@@ -44,25 +44,37 @@ from tsdetect.algorithms.year_round import (
     create_advanced_year_round,
     create_simple_year_round,
 )
+from tsdetect.batch import BacktestResult, BacktestRunner, BatchDetector, BatchResult, DetectFrame, config_grid
 from tsdetect.core.algorithms import (
     BaseAlgorithm,
     BaseAlgorithmCollection,
     ExpressionDetector,
     RangeRatioAlgorithm,
 )
-from tsdetect.core.base import BaseAnomalyPoint, BaseDataPoint, SimpleDataPoint
+from tsdetect.core.base import BaseAnomalyPoint, BaseDataPoint, CompactDataPoint, SimpleDataPoint, render_all
+from tsdetect.core.baseline import RollingBaseline
+from tsdetect.core.block import DataPointBlock, DataPointView
 from tsdetect.core.exceptions import (
     DetectionError,
     InvalidAlgorithmConfigError,
     InvalidDataPointError,
     TsDetectError,
 )
+from tsdetect.core.history import HistoryStore
 from tsdetect.core.interfaces import (
+    IAsyncHistoryFetcher,
     IDataPoint,
+    IDetectionObserver,
     IHistoryFetcher,
     ITemplateEngine,
     IUnitConverter,
 )
+from tsdetect.core.observer import InMemoryObserver, PhaseStats
+from tsdetect.core.planner import DetectionPlan, HistoryPlanner
+from tsdetect.core.ringbuffer import RingBufferHistoryStore
+from tsdetect.core.snapshot import HistorySnapshot, MmapHistoryFetcher, SnapshotWriter, write_snapshot
+from tsdetect.sharded import AlgorithmSpec, ShardedDetector
+from tsdetect.stream import DetectionPipeline, detect_stream
 
 __version__ = "0.1.0"
 __all__ = [
@@ -71,16 +83,34 @@ __all__ = [
     # 基类
     "BaseDataPoint",
     "SimpleDataPoint",
+    "CompactDataPoint",
+    "DataPointBlock",
+    "DataPointView",
     "BaseAnomalyPoint",
+    "render_all",
     "BaseAlgorithm",
     "BaseAlgorithmCollection",
     "ExpressionDetector",
     "RangeRatioAlgorithm",
+    "HistoryStore",
+    "HistoryPlanner",
+    "DetectionPlan",
+    "RingBufferHistoryStore",
+    "HistorySnapshot",
+    "SnapshotWriter",
+    "MmapHistoryFetcher",
+    "write_snapshot",
+    "RollingBaseline",
     # 接口
     "IDataPoint",
     "IHistoryFetcher",
+    "IAsyncHistoryFetcher",
     "ITemplateEngine",
     "IUnitConverter",
+    "IDetectionObserver",
+    # 检测观察者
+    "InMemoryObserver",
+    "PhaseStats",
     # 异常
     "TsDetectError",
     "InvalidAlgorithmConfigError",
@@ -108,4 +138,17 @@ __all__ = [
     # 智能检测算法
     "SimpleIntelligentAlgorithm",
     "create_intelligent_algorithm",
+    # 批量检测
+    "DetectFrame",
+    "BatchDetector",
+    "BatchResult",
+    "BacktestRunner",
+    "BacktestResult",
+    "config_grid",
+    # 流式检测
+    "DetectionPipeline",
+    "detect_stream",
+    # 多进程分片检测
+    "ShardedDetector",
+    "AlgorithmSpec",
 ]
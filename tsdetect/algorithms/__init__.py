@@ -5,12 +5,15 @@ TsDetect 算法模块
 """
 
 from tsdetect.algorithms.amplitude import RingRatioAmplitudeAlgorithm, YearRoundAmplitudeAlgorithm
+from tsdetect.algorithms.cache import AlgorithmCache, get_algorithm_cache
 from tsdetect.algorithms.intelligent import (
     BaseIntelligentAlgorithm,
     MockSDKClient,
+    SDKResult,
     SimpleIntelligentAlgorithm,
 )
 from tsdetect.algorithms.ring_ratio import AdvancedRingRatioAlgorithm, SimpleRingRatioAlgorithm
+from tsdetect.algorithms.scheduler import PredictChunkFailure, PredictScheduler
 from tsdetect.algorithms.threshold import AndThresholdAlgorithm, ThresholdAlgorithm
 from tsdetect.algorithms.year_round import AdvancedYearRoundAlgorithm, SimpleYearRoundAlgorithm
 
@@ -46,6 +49,25 @@ def get_algorithm(name: str):
     return ALGORITHM_REGISTRY[name]
 
 
+def get_cached_algorithm(algorithm, config=None, **kwargs):
+    """
+    从进程级默认缓存获取共享的算法实例
+
+    Args:
+        algorithm: 算法名称或算法类
+        config: 算法配置
+        **kwargs: 其他构造参数
+
+    Returns:
+        算法实例，无状态的算法返回共享实例（调用方不应修改），有状态的算法每次返回新实例
+
+    Raises:
+        KeyError: 算法不存在
+    """
+    algorithm_class = get_algorithm(algorithm) if isinstance(algorithm, str) else algorithm
+    return get_algorithm_cache().get(algorithm_class, config, **kwargs)
+
+
 def register_algorithm(name: str, algorithm_class):
     """
     注册自定义算法
@@ -70,8 +92,15 @@ __all__ = [
     "BaseIntelligentAlgorithm",
     "SimpleIntelligentAlgorithm",
     "MockSDKClient",
+    "SDKResult",
+    "PredictScheduler",
+    "PredictChunkFailure",
     # 注册表
     "ALGORITHM_REGISTRY",
     "get_algorithm",
+    "get_cached_algorithm",
     "register_algorithm",
+    # 算法实例缓存
+    "AlgorithmCache",
+    "get_algorithm_cache",
 ]
@@ -139,6 +139,9 @@ class YearRoundAmplitudeAlgorithm(RangeRatioAlgorithm):
     # 描述模板
     desc_tpl: str = "year-round amplitude exceeds threshold: current amplitude >= history amplitude * {ratio} + {shock}"
 
+    # 影响历史基准值的配置项
+    history_context_params: tuple[str, ...] = ("method",)
+
     # 默认聚合间隔（秒）
     default_agg_interval: int = 60
 
@@ -0,0 +1,164 @@
+"""
+TsDetect 算法实例缓存
+
+策略引擎每个周期都会按策略配置重建算法，每次构造都要重新校验配置、生成子检测器。
+算法实例缓存以（算法类, 规范化配置, 其他构造参数）为键复用已构造的实例。
+只有无状态的算法会被缓存，同比/环比等持有历史存储的算法每次都会构造新实例。
+
+使用示例：
+    cache = AlgorithmCache(maxsize=1024)
+    algo = cache.get(ThresholdAlgorithm, config=[[{"method": "gt", "threshold": 90}]], unit="percent")
+"""
+
+import copy
+import threading
+from collections import OrderedDict
+from typing import Any
+
+from tsdetect.core.algorithms import BaseAlgorithm
+
+
+def _freeze(value: Any) -> Any:
+    """
+    转换为可哈希的规范化键，值附带类型以区分 1 / 1.0 / True
+
+    容器按内容递归转换；其他可哈希对象（单位转换器、模板引擎等）直接作为键的一部分，
+    键持有对象引用，比较时使用对象自身的相等性。
+
+    Raises:
+        TypeError: 值不可哈希，无法作为缓存键
+    """
+    if isinstance(value, dict):
+        # 键同样附带类型，{1: x} 与 {"1": x} 是不同的配置
+        return dict, frozenset((_freeze(k), _freeze(v)) for k, v in value.items())
+    if isinstance(value, list | tuple):
+        return list, tuple(_freeze(v) for v in value)
+    if isinstance(value, set | frozenset):
+        return frozenset, frozenset(_freeze(v) for v in value)
+    hash(value)
+    return type(value), value
+
+
+def algorithm_cache_key(algorithm_class: type[BaseAlgorithm], config: Any = None, **kwargs) -> tuple:
+    """
+    算法实例的缓存键
+
+    Args:
+        algorithm_class: 算法类
+        config: 算法配置
+        **kwargs: 其他构造参数
+
+    Returns:
+        可哈希的缓存键
+
+    Raises:
+        TypeError: 配置或参数中包含不可哈希的值
+    """
+    return algorithm_class, _freeze(config), _freeze(kwargs)
+
+
+def is_cacheable(algorithm_class: type[BaseAlgorithm], **kwargs) -> bool:
+    """
+    判断算法实例是否可以在调用方之间共享
+
+    有状态的算法（历史存储、增量基线、预检测结果等随批次变化）和带检测观察者的实例不共享。
+
+    Args:
+        algorithm_class: 算法类
+        **kwargs: 其他构造参数
+
+    Returns:
+        是否可以缓存
+    """
+    return not algorithm_class.stateful and kwargs.get("observer") is None
+
+
+class AlgorithmCache:
+    """
+    算法实例缓存
+
+    LRU 缓存，返回的实例在所有调用方之间共享：
+        - 构造时使用配置的深拷贝，调用方之后修改原配置不影响缓存的实例
+        - 调用方不应修改实例的属性
+        - 只缓存无状态的算法（见 is_cacheable），有状态的算法或配置中包含不可哈希的值时，
+          每次都构造新实例且不计入命中统计
+    """
+
+    def __init__(self, maxsize: int | None = 1024):
+        """
+        初始化算法实例缓存
+
+        Args:
+            maxsize: 最多缓存的实例数，None 表示不限制
+        """
+        self.maxsize = maxsize
+        self._data: OrderedDict[tuple, BaseAlgorithm] = OrderedDict()
+        self._lock = threading.Lock()
+
+        # 统计信息
+        self.hits = 0
+        self.misses = 0
+        self.uncached = 0
+
+    def get(self, algorithm_class: type[BaseAlgorithm], config: Any = None, **kwargs) -> BaseAlgorithm:
+        """
+        获取算法实例，不存在时构造并缓存
+
+        Args:
+            algorithm_class: 算法类
+            config: 算法配置
+            **kwargs: 其他构造参数（unit、unit_converter 等）
+
+        Returns:
+            算法实例，可缓存时为共享实例
+
+        Raises:
+            InvalidAlgorithmConfigError: 配置无效（不会被缓存）
+        """
+        key = None
+        if is_cacheable(algorithm_class, **kwargs):
+            try:
+                key = algorithm_cache_key(algorithm_class, config, **kwargs)
+            except TypeError:
+                pass
+        if key is None:
+            with self._lock:
+                self.uncached += 1
+            return algorithm_class(config=copy.deepcopy(config), **kwargs)
+
+        with self._lock:
+            algorithm = self._data.get(key)
+            if algorithm is not None:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return algorithm
+
+            self.misses += 1
+            algorithm = self._data[key] = algorithm_class(config=copy.deepcopy(config), **kwargs)
+            if self.maxsize is not None:
+                while len(self._data) > self.maxsize:
+                    self._data.popitem(last=False)
+            return algorithm
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __repr__(self) -> str:
+        return (
+            f"<{self.__class__.__name__} size={len(self)} hits={self.hits} misses={self.misses} "
+            f"uncached={self.uncached}>"
+        )
+
+
+# 进程级默认算法实例缓存
+_default_cache = AlgorithmCache()
+
+
+def get_algorithm_cache() -> AlgorithmCache:
+    """获取进程级默认算法实例缓存"""
+    return _default_cache
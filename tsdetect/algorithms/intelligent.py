@@ -4,24 +4,106 @@ TsDetect 智能检测算法接口
 提供智能检测（SDK 调用）的抽象接口和基础实现。
 """
 
-import copy
 import json
 import logging
+import threading
+import time
 from abc import ABC, abstractmethod
-from collections.abc import Generator
+from collections.abc import Generator, Hashable, Iterator, Mapping
 from typing import Any
 
+from tsdetect.algorithms.scheduler import PredictScheduler
 from tsdetect.core.algorithms import (
+    DetectContext,
     ExpressionDetector,
     RangeRatioAlgorithm,
 )
-from tsdetect.core.base import BaseAnomalyPoint
+from tsdetect.core.base import BaseAnomalyPoint, CompactDataPoint
 from tsdetect.core.exceptions import SDKError
 from tsdetect.core.interfaces import IDataPoint, ISDKClient
+from tsdetect.core.observer import PHASE_PRE_DETECT
 
 logger = logging.getLogger(__name__)
 
 
+class SDKResult(Mapping[str, Any]):
+    """
+    SDK 预测结果
+
+    不可变的映射，在收到 SDK 结果时构造一次：
+        - extra_info 为 JSON 字符串时解析为字典，缺失或解析失败时为空字典
+        - 从 extra_info 中提取 anomaly_score（保留两位小数）和 alert_msg
+
+    检测时直接作为上下文变量读取，不再复制和解析。extra_info 等嵌套值是共享的，不应修改。
+    """
+
+    __slots__ = ("_data",)
+
+    def __init__(self, raw: Mapping[str, Any] | None = None):
+        """
+        初始化 SDK 预测结果
+
+        Args:
+            raw: SDK 返回的原始结果
+        """
+        data = dict(raw or {})
+
+        extra_info = data.get("extra_info", {})
+        if isinstance(extra_info, str):
+            try:
+                extra_info = json.loads(extra_info)
+            except Exception as e:
+                logger.debug(f"Failed to parse extra_info: {e}")
+                extra_info = {}
+        data["extra_info"] = extra_info
+
+        # 提取常用字段
+        if "anomaly_score" in extra_info:
+            data["anomaly_score"] = extra_info["anomaly_score"]
+
+        if isinstance(data.get("anomaly_score"), int | float):
+            data["anomaly_score"] = round(data["anomaly_score"], 2)
+
+        if "alert_msg" in extra_info:
+            data["alert_msg"] = extra_info["alert_msg"]
+
+        object.__setattr__(self, "_data", data)
+
+    @classmethod
+    def from_values(cls, values: Mapping[str, Any] | None) -> "SDKResult":
+        """
+        获取 SDK 预测结果，已经是 SDKResult 时直接返回
+
+        Args:
+            values: 数据点的 values 字段
+
+        Returns:
+            SDK 预测结果
+        """
+        if isinstance(values, cls):
+            return values
+        return cls(values)
+
+    def __getitem__(self, key: str) -> Any:
+        return self._data[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __setattr__(self, name: str, value: Any):
+        raise AttributeError(f"{self.__class__.__name__} is immutable")
+
+    def __reduce__(self):
+        # 已解析的结果再次构造时保持不变
+        return self.__class__, (self._data,)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self._data!r})"
+
+
 class BaseIntelligentAlgorithm(RangeRatioAlgorithm, ABC):
     """
     智能检测算法基类
@@ -40,6 +122,8 @@ class BaseIntelligentAlgorithm(RangeRatioAlgorithm, ABC):
         config: dict[str, Any] | None = None,
         agg_interval: int | None = None,
         sdk_client: ISDKClient | None = None,
+        predict_batch_size: int = 500,
+        predict_concurrency: int = 1,
         **kwargs,
     ):
         """
@@ -49,11 +133,16 @@ class BaseIntelligentAlgorithm(RangeRatioAlgorithm, ABC):
             config: 算法配置
             agg_interval: 聚合间隔（秒）
             sdk_client: SDK 客户端（可选）
+            predict_batch_size: 批量预检测时单次 batch_predict 最多包含的数据点数
+            predict_concurrency: 批量预检测的最大并发调用数（大于 1 时 SDK 客户端需要线程安全）
             **kwargs: 额外参数
         """
         self.agg_interval = agg_interval or self.default_agg_interval
         self.sdk_client = sdk_client
-        self._pre_detect_results: dict[str, dict[str, Any]] = {}
+        self.predict_batch_size = predict_batch_size
+        self.predict_concurrency = predict_concurrency
+        self._predict_scheduler: PredictScheduler | None = None
+        self._pre_detect_results: dict[str, SDKResult] = {}
 
         super().__init__(config=config, **kwargs)
 
@@ -81,33 +170,11 @@ class BaseIntelligentAlgorithm(RangeRatioAlgorithm, ABC):
         if hasattr(data_point, "original"):
             values = getattr(data_point.original, "values", values)
 
-        env = copy.deepcopy(values)
-
-        # 解析 extra_info
-        if "extra_info" in env:
-            try:
-                if isinstance(env["extra_info"], str):
-                    env["extra_info"] = json.loads(env["extra_info"])
-            except Exception as e:
-                logger.debug(f"Failed to parse extra_info: {e}")
-                env["extra_info"] = {}
-        else:
-            env["extra_info"] = {}
-
-        # 提取常用字段
-        if "anomaly_score" in env.get("extra_info", {}):
-            env["anomaly_score"] = env["extra_info"]["anomaly_score"]
-
-        if "anomaly_score" in env:
-            env["anomaly_score"] = round(env.get("anomaly_score", 0), 2)
-
-        if "alert_msg" in env.get("extra_info", {}):
-            env["alert_msg"] = env["extra_info"]["alert_msg"]
+        # SDK 结果在收到时已解析为 SDKResult，这里只读取，不再复制和解析
+        context.update(SDKResult.from_values(values))
 
         # 获取前一时刻数据
-        env["previous_point"] = self.history_point_fetcher(data_point)
-
-        context.update(env)
+        context["previous_point"] = self.history_point_fetcher(data_point)
         return context
 
     def _gen_detectors(self) -> Generator[ExpressionDetector, None, None]:
@@ -122,7 +189,11 @@ class BaseIntelligentAlgorithm(RangeRatioAlgorithm, ABC):
             template_engine=self.template_engine,
         )
 
-    def detect(self, data_point: IDataPoint) -> list[BaseAnomalyPoint]:
+    def plan_context_key(self) -> Hashable | None:
+        """检测结果来自 SDK 或数据点自身，不与其他算法共享上下文"""
+        return None
+
+    def detect(self, data_point: IDataPoint, context: DetectContext | None = None) -> list[BaseAnomalyPoint]:
         """
         执行检测
 
@@ -130,6 +201,7 @@ class BaseIntelligentAlgorithm(RangeRatioAlgorithm, ABC):
 
         Args:
             data_point: 数据点
+            context: 检测上下文，为空时根据数据点构建；使用 SDK 结果检测时上下文基于带结果的数据点重新构建
 
         Returns:
             异常数据点列表
@@ -148,7 +220,7 @@ class BaseIntelligentAlgorithm(RangeRatioAlgorithm, ABC):
             return self._detect_by_sdk(data_point)
 
         # 不使用 SDK，直接检测 data_point 中的结果
-        return super().detect(data_point)
+        return super().detect(data_point, context)
 
     def _detect_by_sdk(self, data_point: IDataPoint) -> list[BaseAnomalyPoint]:
         """
@@ -170,59 +242,102 @@ class BaseIntelligentAlgorithm(RangeRatioAlgorithm, ABC):
             params = self._generate_sdk_params()
 
             # 调用 SDK
-            result = self.sdk_client.predict(data, dimensions, **params)
-
-            return self._detect_by_result(data_point, result[0] if result else {})
+            observer = self.observer
+            if observer is None:
+                result = self.sdk_client.predict(data, dimensions, **params)
+            else:
+                start = time.perf_counter()
+                try:
+                    result = self.sdk_client.predict(data, dimensions, **params)
+                finally:
+                    observer.record(self.observer_label, PHASE_PRE_DETECT, time.perf_counter() - start, "single")
+
+            return self._detect_by_result(data_point, SDKResult(result[0] if result else None))
         except Exception as e:
             logger.warning(f"SDK prediction failed: {e}")
             raise SDKError(str(e), sdk_name="intelligent") from None
 
-    def _detect_by_result(self, data_point: IDataPoint, result: dict[str, Any]) -> list[BaseAnomalyPoint]:
+    def _detect_by_result(self, data_point: IDataPoint, result: Mapping[str, Any]) -> list[BaseAnomalyPoint]:
         """
         基于 SDK 结果进行检测
 
         Args:
             data_point: 原始数据点
-            result: SDK 返回的结果
+            result: SDK 返回的结果（原始字典或 SDKResult）
 
         Returns:
             异常数据点列表
         """
-        # 创建带有 SDK 结果的数据点
-        from tsdetect.core.base import SimpleDataPoint
-
-        result_point = SimpleDataPoint(
+        # 创建带有 SDK 结果的数据点（复用原数据点的字段和 record_id）
+        result_point = CompactDataPoint(
             value=data_point.value,
             timestamp=data_point.timestamp,
             unit=data_point.unit,
             dimensions=data_point.dimensions,
-            values=result,
+            values=SDKResult.from_values(result),
+            record_id=data_point.record_id,
         )
 
         # 使用父类的检测逻辑
         return super().detect(result_point)
 
-    def pre_detect(self, data_points: list[IDataPoint]):
+    def prepare_records(self, data_points: list[IDataPoint]):
+        """预加载历史数据并批量预检测"""
+        super().prepare_records(data_points)
+        self.pre_detect(data_points)
+
+    async def aprepare_records(self, data_points: list[IDataPoint]):
+        """异步批量预检测并预加载历史数据"""
+        await self.apre_detect(data_points)
+        # 失败批次中的数据点通过调度器异步重试一次，仍然失败的在检测时退化为单点调用
+        if self.predict_scheduler is not None and self.predict_scheduler.failures:
+            await self.apre_detect(data_points)
+        await self.aprepare_history(data_points)
+
+    def release_records(self, data_points: list[IDataPoint]):
+        """释放历史数据和预检测结果"""
+        super().release_records(data_points)
+        for dp in data_points:
+            self._pre_detect_results.pop(dp.record_id, None)
+
+    @property
+    def predict_scheduler(self) -> PredictScheduler | None:
+        """批量预测调度器（随 sdk_client 变化重建）"""
+        if self.sdk_client is None:
+            return None
+        scheduler = self._predict_scheduler
+        if scheduler is None or scheduler.sdk_client is not self.sdk_client:
+            scheduler = self._predict_scheduler = PredictScheduler(
+                self.sdk_client, max_batch_size=self.predict_batch_size, concurrency=self.predict_concurrency
+            )
+        return scheduler
+
+    def _pending_predict_groups(self, data_points: list[IDataPoint]) -> list[dict[str, Any]]:
         """
-        批量预检测
+        生成待预测的数据组
 
-        调用 SDK 的批量预测接口，缓存结果供后续检测使用。
+        只保留本批数据点的已有结果，已有结果的数据点不重复预测。
 
         Args:
             data_points: 数据点列表
-        """
-        if not self.sdk_client:
-            return
 
-        use_sdk = self.validated_config.get("use_sdk", False)
-        if not use_sdk:
-            return
+        Returns:
+            按维度分组的预测输入
+        """
+        if not self.sdk_client or not self.validated_config.get("use_sdk", False):
+            return []
 
-        self._pre_detect_results.clear()
+        batch_ids = {dp.record_id for dp in data_points}
+        self._pre_detect_results = {
+            record_id: result for record_id, result in self._pre_detect_results.items() if record_id in batch_ids
+        }
 
         # 按维度分组
         predict_inputs = {}
         for dp in data_points:
+            if dp.record_id in self._pre_detect_results:
+                continue
+
             dimension_key = dp.record_id.split(".")[0]
             if dimension_key not in predict_inputs:
                 predict_inputs[dimension_key] = {
@@ -238,17 +353,54 @@ class BaseIntelligentAlgorithm(RangeRatioAlgorithm, ABC):
                 }
             )
 
-        # 批量预测
-        params = self._generate_sdk_params()
+        return list(predict_inputs.values())
 
-        try:
-            for predict_input in predict_inputs.values():
-                results = self.sdk_client.batch_predict([predict_input], **params)
-                for result in results:
-                    if "__index__" in result:
-                        self._pre_detect_results[result["__index__"]] = result
-        except Exception as e:
-            logger.warning(f"Batch prediction failed: {e}")
+    def pre_detect(self, data_points: list[IDataPoint]):
+        """
+        批量预检测
+
+        多个维度组打包为有大小上限的 batch_predict 调用并发执行，缓存结果供后续检测使用。
+        失败批次中的数据点在检测时退化为单点 SDK 调用。
+
+        Args:
+            data_points: 数据点列表
+        """
+        groups = self._pending_predict_groups(data_points)
+        if not groups:
+            return
+
+        observer = self.observer
+        if observer is None:
+            results = self.predict_scheduler.run(groups, **self._generate_sdk_params())
+        else:
+            start = time.perf_counter()
+            try:
+                results = self.predict_scheduler.run(groups, **self._generate_sdk_params())
+            finally:
+                observer.record(self.observer_label, PHASE_PRE_DETECT, time.perf_counter() - start, "batch")
+        self._pre_detect_results.update((index, SDKResult(result)) for index, result in results.items())
+
+    async def apre_detect(self, data_points: list[IDataPoint]):
+        """
+        异步批量预检测
+
+        Args:
+            data_points: 数据点列表
+        """
+        groups = self._pending_predict_groups(data_points)
+        if not groups:
+            return
+
+        observer = self.observer
+        if observer is None:
+            results = await self.predict_scheduler.arun(groups, **self._generate_sdk_params())
+        else:
+            start = time.perf_counter()
+            try:
+                results = await self.predict_scheduler.arun(groups, **self._generate_sdk_params())
+            finally:
+                observer.record(self.observer_label, PHASE_PRE_DETECT, time.perf_counter() - start, "batch")
+        self._pre_detect_results.update((index, SDKResult(result)) for index, result in results.items())
 
     @abstractmethod
     def _generate_dimensions(self, data_point: IDataPoint) -> dict[str, Any]:
@@ -287,8 +439,7 @@ class SimpleIntelligentAlgorithm(BaseIntelligentAlgorithm):
 
     def _generate_dimensions(self, data_point: IDataPoint) -> dict[str, Any]:
         """生成维度字典"""
-        dimensions = copy.deepcopy(data_point.dimensions)
-        return dimensions
+        return dict(data_point.dimensions)
 
 
 class MockSDKClient(ISDKClient):
@@ -298,19 +449,31 @@ class MockSDKClient(ISDKClient):
     用于测试场景。
     """
 
-    def __init__(self, anomaly_threshold: float = 0.8, always_anomaly: bool = False):
+    def __init__(self, anomaly_threshold: float = 0.8, always_anomaly: bool = False, latency: float = 0.0):
         """
         初始化模拟 SDK
 
         Args:
             anomaly_threshold: 异常阈值（值超过此阈值判定为异常）
             always_anomaly: 是否总是返回异常
+            latency: 每次调用的模拟网络延迟（秒），用于评估批量和并发调度的效果
         """
         self.anomaly_threshold = anomaly_threshold
         self.always_anomaly = always_anomaly
+        self.latency = latency
+
+        # 调用统计
+        self.predict_calls = 0
+        self.batch_predict_calls = 0
+        self._lock = threading.Lock()
 
     def predict(self, data: list[dict[str, Any]], dimensions: dict[str, Any], **params) -> list[dict[str, Any]]:
         """模拟预测"""
+        with self._lock:
+            self.predict_calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+
         results = []
         for item in data:
             value = item.get("value", 0)
@@ -335,6 +498,11 @@ class MockSDKClient(ISDKClient):
 
     def batch_predict(self, data_groups: list[dict[str, Any]], **params) -> list[dict[str, Any]]:
         """模拟批量预测"""
+        with self._lock:
+            self.batch_predict_calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+
         results = []
         for group in data_groups:
             for item in group.get("data", []):
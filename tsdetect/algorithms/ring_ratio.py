@@ -139,6 +139,9 @@ class AdvancedRingRatioAlgorithm(RangeRatioAlgorithm):
     # 上升告警模板
     ceil_desc_tpl: str = "increased by more than {ceil}% compared to {fetch_type} of previous {ceil_interval} periods (history: {ceil_history_value})"
 
+    # 影响历史基准值的配置项
+    history_context_params: tuple[str, ...] = ("fetch_type", "floor_interval", "ceil_interval")
+
     # 默认聚合间隔（秒）
     default_agg_interval: int = 60
 
@@ -213,28 +216,32 @@ class AdvancedRingRatioAlgorithm(RangeRatioAlgorithm):
         floor_interval = self.validated_config.get("floor_interval", 5)
         ceil_interval = self.validated_config.get("ceil_interval", 5)
 
-        # 获取历史数据
-        offsets = self.get_history_offsets()
-        history_values = []
-
-        for offset in offsets:
-            hp = self.fetch_history_point(data_point, offset)
-            if hp:
-                history_values.append(hp.value)
-
-        # 计算历史基准值
-        if history_values:
-            if fetch_type == "avg":
-                # 下降检测使用前 floor_interval 个周期的平均值
-                floor_values = history_values[:floor_interval]
-                ceil_values = history_values[:ceil_interval]
-
-                context["floor_history_value"] = sum(floor_values) / len(floor_values) if floor_values else None
-                context["ceil_history_value"] = sum(ceil_values) / len(ceil_values) if ceil_values else None
-            else:  # last
-                # 使用最近的值
-                context["floor_history_value"] = history_values[0] if history_values else None
-                context["ceil_history_value"] = history_values[0] if history_values else None
+        # 增量基线可以回答时 O(1) 获取基准值，否则逐个偏移量获取历史数据
+        baseline_values = self.baseline_history_values(data_point, fetch_type, floor_interval, ceil_interval)
+        if baseline_values is not None:
+            context["floor_history_value"], context["ceil_history_value"] = baseline_values
+        else:
+            # 获取历史数据
+            history_values = []
+
+            for offset in self.history_offsets:
+                hp = self.fetch_history_point(data_point, offset)
+                if hp:
+                    history_values.append(hp.value)
+
+            # 计算历史基准值
+            if history_values:
+                if fetch_type == "avg":
+                    # 下降检测使用前 floor_interval 个周期的平均值
+                    floor_values = history_values[:floor_interval]
+                    ceil_values = history_values[:ceil_interval]
+
+                    context["floor_history_value"] = sum(floor_values) / len(floor_values) if floor_values else None
+                    context["ceil_history_value"] = sum(ceil_values) / len(ceil_values) if ceil_values else None
+                else:  # last
+                    # 使用最近的值
+                    context["floor_history_value"] = history_values[0] if history_values else None
+                    context["ceil_history_value"] = history_values[0] if history_values else None
 
         context["fetch_type"] = fetch_type
         context["floor_interval"] = floor_interval
@@ -0,0 +1,173 @@
+"""
+TsDetect 智能检测批量调度
+
+把按维度分组的预测输入打包为有大小上限的 batch_predict 调用，
+并在线程池（或 asyncio）中按并发上限执行，单个批次失败不影响其他批次。
+"""
+
+import asyncio
+import logging
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from tsdetect.core.interfaces import ISDKClient
+
+logger = logging.getLogger(__name__)
+
+
+class PredictChunkFailure:
+    """
+    失败的预测批次
+
+    Attributes:
+        groups: 该批次包含的数据组
+        error: 异常对象
+    """
+
+    __slots__ = ("groups", "error")
+
+    def __init__(self, groups: list[dict[str, Any]], error: Exception):
+        self.groups = groups
+        self.error = error
+
+    @property
+    def indexes(self) -> list[str]:
+        """该批次包含的数据点标识（__index__）"""
+        return [item["__index__"] for group in self.groups for item in group.get("data", []) if "__index__" in item]
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} groups={len(self.groups)} error={self.error!r}>"
+
+
+class PredictScheduler:
+    """
+    批量预测调度器
+
+    使用示例：
+        scheduler = PredictScheduler(sdk_client, max_batch_size=500, concurrency=4)
+        results = scheduler.run(predict_inputs, predict_args={...})
+        for failure in scheduler.failures:
+            ...
+
+    SDK 客户端的 batch_predict 在 concurrency > 1 时会被多个线程同时调用，需要是线程安全的。
+    """
+
+    def __init__(self, sdk_client: ISDKClient, max_batch_size: int = 500, concurrency: int = 1):
+        """
+        初始化批量预测调度器
+
+        Args:
+            sdk_client: SDK 客户端
+            max_batch_size: 单次 batch_predict 最多包含的数据点数，
+                单个数据组超过上限时单独成为一个批次（数据组不会被拆分）
+            concurrency: 最大并发调用数
+        """
+        if max_batch_size <= 0:
+            raise ValueError("max_batch_size must be positive")
+        if concurrency <= 0:
+            raise ValueError("concurrency must be positive")
+
+        self.sdk_client = sdk_client
+        self.max_batch_size = max_batch_size
+        self.concurrency = concurrency
+
+        # 最近一次调度中失败的批次
+        self.failures: list[PredictChunkFailure] = []
+
+    def chunk(self, groups: Sequence[dict[str, Any]]) -> list[list[dict[str, Any]]]:
+        """
+        按数据点数把数据组打包为批次
+
+        Args:
+            groups: 数据组列表，每组格式为 {"dimensions": ..., "data": [...]}
+
+        Returns:
+            批次列表
+        """
+        chunks: list[list[dict[str, Any]]] = []
+        current: list[dict[str, Any]] = []
+        size = 0
+
+        for group in groups:
+            group_size = len(group.get("data", []))
+            if current and size + group_size > self.max_batch_size:
+                chunks.append(current)
+                current, size = [], 0
+            current.append(group)
+            size += group_size
+
+        if current:
+            chunks.append(current)
+        return chunks
+
+    def _predict_chunk(self, chunk: list[dict[str, Any]], params: dict[str, Any]) -> list[dict[str, Any]]:
+        """执行单个批次，失败时记录并返回空结果"""
+        try:
+            return self.sdk_client.batch_predict(chunk, **params)
+        except Exception as e:
+            logger.warning(f"Batch prediction failed for {len(chunk)} groups: {e}")
+            self.failures.append(PredictChunkFailure(chunk, e))
+            return []
+
+    @staticmethod
+    def _index_results(chunk_results: list[list[dict[str, Any]]]) -> dict[str, dict[str, Any]]:
+        results = {}
+        for chunk_result in chunk_results:
+            for result in chunk_result:
+                if "__index__" in result:
+                    results[result["__index__"]] = result
+        return results
+
+    def run(self, groups: Sequence[dict[str, Any]], **params) -> dict[str, dict[str, Any]]:
+        """
+        执行批量预测
+
+        Args:
+            groups: 数据组列表
+            **params: 传给 batch_predict 的参数
+
+        Returns:
+            {__index__: 预测结果}，失败批次中的数据点不在结果中
+        """
+        self.failures = []
+        chunks = self.chunk(groups)
+        if not chunks:
+            return {}
+
+        if self.concurrency == 1 or len(chunks) == 1:
+            chunk_results = [self._predict_chunk(chunk, params) for chunk in chunks]
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.concurrency, len(chunks))) as executor:
+                chunk_results = list(executor.map(lambda chunk: self._predict_chunk(chunk, params), chunks))
+
+        return self._index_results(chunk_results)
+
+    async def arun(self, groups: Sequence[dict[str, Any]], **params) -> dict[str, dict[str, Any]]:
+        """
+        异步执行批量预测
+
+        每个批次在线程中调用 batch_predict，并发数由信号量限制。
+
+        Args:
+            groups: 数据组列表
+            **params: 传给 batch_predict 的参数
+
+        Returns:
+            {__index__: 预测结果}，失败批次中的数据点不在结果中
+        """
+        self.failures = []
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def predict(chunk):
+            async with semaphore:
+                return await asyncio.to_thread(self._predict_chunk, chunk, params)
+
+        chunk_results = await asyncio.gather(*(predict(chunk) for chunk in self.chunk(groups)))
+        return self._index_results(chunk_results)
+
+    def __repr__(self) -> str:
+        return (
+            f"<{self.__class__.__name__} max_batch_size={self.max_batch_size} concurrency={self.concurrency} "
+            f"failures={len(self.failures)}>"
+        )
@@ -4,17 +4,25 @@ TsDetect 阈值检测算法
 提供静态阈值检测功能。
 """
 
+import bisect
+import logging
+import math
 import operator
-from collections.abc import Generator
+from abc import ABC, abstractmethod
+from collections.abc import Generator, Hashable
 from typing import Any
 
 from tsdetect.core.algorithms import (
     BaseAlgorithmCollection,
+    DetectContext,
     ExpressionDetector,
 )
+from tsdetect.core.base import BaseAnomalyPoint
 from tsdetect.core.exceptions import InvalidAlgorithmConfigError
 from tsdetect.core.interfaces import IDataPoint
 
+logger = logging.getLogger(__name__)
+
 # 比较方法映射
 THRESHOLD_METHODS = {
     "gt": ">",
@@ -36,7 +44,244 @@ OPERATORS = {
 }
 
 
-class AndThresholdAlgorithm(BaseAlgorithmCollection):
+class ThresholdInterval:
+    """
+    单个 AND 条件组对应的取值区间
+
+    gt/gte/lt/lte/eq 收紧区间上下界，neq 记为排除点。
+    """
+
+    __slots__ = ("low", "low_closed", "high", "high_closed", "excluded")
+
+    def __init__(self):
+        self.low = -math.inf
+        self.low_closed = True
+        self.high = math.inf
+        self.high_closed = True
+        self.excluded: tuple[float, ...] = ()
+
+    @classmethod
+    def from_conditions(cls, conditions: list[tuple[str, float]]) -> "ThresholdInterval | None":
+        """
+        由 (method, 已转换的阈值) 条件列表构建区间
+
+        Args:
+            conditions: 条件列表
+
+        Returns:
+            取值区间，条件矛盾（区间为空）时返回 None
+        """
+        interval = cls()
+        excluded = []
+        for method, threshold in conditions:
+            if math.isnan(threshold):
+                # 与 NaN 比较只有 != 成立
+                if method == "neq":
+                    continue
+                return None
+            if method == "neq":
+                excluded.append(threshold)
+                continue
+            if method in ("gt", "gte", "eq"):
+                interval._raise_low(threshold, method != "gt")
+            if method in ("lt", "lte", "eq"):
+                interval._lower_high(threshold, method != "lt")
+
+        if interval.low > interval.high or (
+            interval.low == interval.high and not (interval.low_closed and interval.high_closed)
+        ):
+            return None
+        interval.excluded = tuple(v for v in excluded if interval.contains_bounds(v))
+        return interval
+
+    def _raise_low(self, value: float, closed: bool):
+        if value > self.low:
+            self.low, self.low_closed = value, closed
+        elif value == self.low:
+            self.low_closed = self.low_closed and closed
+
+    def _lower_high(self, value: float, closed: bool):
+        if value < self.high:
+            self.high, self.high_closed = value, closed
+        elif value == self.high:
+            self.high_closed = self.high_closed and closed
+
+    def contains_bounds(self, value: float) -> bool:
+        """是否在上下界之内（不考虑排除点）"""
+        if value < self.low or (value == self.low and not self.low_closed):
+            return False
+        return not (value > self.high or (value == self.high and not self.high_closed))
+
+    def contains(self, value: float) -> bool:
+        """是否满足该条件组"""
+        return self.contains_bounds(value) and value not in self.excluded
+
+    def __repr__(self) -> str:
+        left = "[" if self.low_closed else "("
+        right = "]" if self.high_closed else ")"
+        excluded = f" excluded={list(self.excluded)}" if self.excluded else ""
+        return f"<{self.__class__.__name__} {left}{self.low}, {self.high}{right}{excluded}>"
+
+
+class ThresholdBounds:
+    """
+    OR-of-AND 阈值条件的区间表示
+
+    每个 AND 条件组是一个区间（可带排除点），数据值满足任一区间即触发。
+    没有排除点时区间合并为有序且不相交的区间列表，条件组较多时用二分查找定位。
+    阈值已经按数据单位转换到最小单位，数据值也需要先转换到最小单位。
+    """
+
+    # 合并后的区间数达到该值时使用二分查找
+    bisect_min_intervals = 8
+
+    def __init__(self, groups: list[list[tuple[str, float]]]):
+        """
+        初始化区间表示
+
+        Args:
+            groups: 条件组列表，每组为 (method, 已转换的阈值) 列表
+        """
+        intervals = [ThresholdInterval.from_conditions(group) for group in groups]
+        self.intervals: list[ThresholdInterval] = [interval for interval in intervals if interval is not None]
+        # NaN 只满足全部由 neq 组成的条件组
+        self.nan_match = any(group and all(method == "neq" for method, _ in group) for group in groups)
+
+        self.merged: list[ThresholdInterval] | None = None
+        self.lows: list[float] = []
+        if all(not interval.excluded for interval in self.intervals):
+            self.merged = self._merge(self.intervals)
+            self.lows = [interval.low for interval in self.merged]
+
+    @staticmethod
+    def _merge(intervals: list[ThresholdInterval]) -> list[ThresholdInterval]:
+        """合并为有序且不相交的区间（端点相接且任一端闭合时合并）"""
+        merged: list[ThresholdInterval] = []
+        for interval in sorted(intervals, key=lambda i: (i.low, not i.low_closed)):
+            last = merged[-1] if merged else None
+            if last is not None and (
+                interval.low < last.high or (interval.low == last.high and (interval.low_closed or last.high_closed))
+            ):
+                if interval.high > last.high:
+                    last.high, last.high_closed = interval.high, interval.high_closed
+                elif interval.high == last.high:
+                    last.high_closed = last.high_closed or interval.high_closed
+                continue
+
+            copied = ThresholdInterval()
+            copied.low, copied.low_closed = interval.low, interval.low_closed
+            copied.high, copied.high_closed = interval.high, interval.high_closed
+            merged.append(copied)
+        return merged
+
+    def contains(self, value: float) -> bool:
+        """
+        数据值（已转换到最小单位）是否满足任一条件组
+
+        Args:
+            value: 数据值
+
+        Returns:
+            是否触发
+        """
+        if value != value:
+            return self.nan_match
+
+        merged = self.merged
+        if merged is not None and len(merged) >= self.bisect_min_intervals:
+            index = bisect.bisect_right(self.lows, value) - 1
+            return index >= 0 and merged[index].contains_bounds(value)
+
+        for interval in self.merged if merged is not None else self.intervals:
+            if interval.contains(value):
+                return True
+        return False
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} intervals={self.intervals}>"
+
+
+class _ThresholdFastPathMixin(ABC):
+    """
+    阈值算法快速路径
+
+    阈值按（数据单位, 算法单位）预先转换为区间，每个数据点只转换一次数据值并做区间判断；
+    未触发时直接返回，只有触发时才构建上下文、执行表达式生成异常点和消息。
+    """
+
+    @abstractmethod
+    def threshold_groups(self) -> list[list[dict[str, Any]]]:
+        """
+        获取阈值条件组
+
+        子类必须实现此方法。
+
+        Returns:
+            AND 条件组列表（组间 OR）
+        """
+        pass
+
+    def threshold_bounds(self, unit: str) -> ThresholdBounds:
+        """
+        获取按数据单位转换后的阈值区间（按单位缓存）
+
+        Args:
+            unit: 数据点单位
+
+        Returns:
+            阈值区间
+        """
+        cache = self.__dict__.setdefault("_threshold_bounds", {})
+        bounds = cache.get(unit)
+        if bounds is None:
+            converter = self.unit_converter
+            groups = [
+                [
+                    (
+                        item["method"],
+                        converter.convert_to_min(item["threshold"], unit, self.unit)
+                        if converter
+                        else item["threshold"],
+                    )
+                    for item in group
+                ]
+                for group in self.threshold_groups()
+            ]
+            bounds = cache[unit] = ThresholdBounds(groups)
+        return bounds
+
+    def quick_check(self, data_point: IDataPoint) -> bool | None:
+        """
+        区间判断
+
+        Returns:
+            是否触发，无法判断（如数据值非数值、单位转换失败）时返回 None
+        """
+        value = data_point.value
+        if not isinstance(value, int | float):
+            return None
+        try:
+            unit = data_point.unit
+            bounds = self.threshold_bounds(unit)
+            if self.unit_converter:
+                value = self.unit_converter.convert_to_min(value, unit)
+        except Exception as e:
+            logger.debug(f"Threshold fast path unavailable: {e}, record_id={data_point.record_id}")
+            return None
+        return bounds.contains(value)
+
+    def plan_context_key(self) -> Hashable | None:
+        """阈值写在表达式中，表达式只引用数据点和单位转换，同单位的阈值算法共享上下文"""
+        return (_ThresholdFastPathMixin, self.unit, self.unit_converter)
+
+    def detect(self, data_point: IDataPoint, context: DetectContext | None = None) -> list[BaseAnomalyPoint]:
+        """检测数据点，未触发的数据点不构建上下文"""
+        if self.quick_check(data_point) is False:
+            return []
+        return super().detect(data_point, context)
+
+
+class AndThresholdAlgorithm(_ThresholdFastPathMixin, BaseAlgorithmCollection):
     """
     AND 阈值检测算法
 
@@ -128,6 +373,10 @@ class AndThresholdAlgorithm(BaseAlgorithmCollection):
                 config=item,
             )
 
+    def threshold_groups(self) -> list[list[dict[str, Any]]]:
+        """AND 条件组列表（组间 OR）"""
+        return [self.validated_config.get("thresholds", [])]
+
     def extra_context(self, data_point: IDataPoint) -> dict[str, Any]:
         """添加阈值到上下文"""
         context = super().extra_context(data_point)
@@ -140,7 +389,7 @@ class AndThresholdAlgorithm(BaseAlgorithmCollection):
         return context
 
 
-class ThresholdAlgorithm(BaseAlgorithmCollection):
+class ThresholdAlgorithm(_ThresholdFastPathMixin, BaseAlgorithmCollection):
     """
     阈值检测算法
 
@@ -231,6 +480,10 @@ class ThresholdAlgorithm(BaseAlgorithmCollection):
 
         return {"thresholds": validated_groups}
 
+    def threshold_groups(self) -> list[list[dict[str, Any]]]:
+        """AND 条件组列表（组间 OR）"""
+        return self.validated_config.get("thresholds", [])
+
     def _gen_detectors(self) -> Generator[ExpressionDetector, None, None]:
         """生成阈值检测器组"""
         threshold_groups = self.validated_config.get("thresholds", [])
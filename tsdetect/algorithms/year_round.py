@@ -132,6 +132,9 @@ class AdvancedYearRoundAlgorithm(RangeRatioAlgorithm):
     # 上升告警模板
     ceil_desc_tpl: str = "increased by more than {ceil}% compared to {fetch_desc} of same time in last {ceil_interval} days (history: {ceil_history_value})"
 
+    # 影响历史基准值的配置项
+    history_context_params: tuple[str, ...] = ("fetch_type", "floor_interval", "ceil_interval")
+
     def _validate_config(self, config: dict[str, Any]) -> dict[str, Any]:
         """验证配置"""
         floor = config.get("floor")
@@ -191,28 +194,32 @@ class AdvancedYearRoundAlgorithm(RangeRatioAlgorithm):
         floor_interval = self.validated_config.get("floor_interval", 7)
         ceil_interval = self.validated_config.get("ceil_interval", 7)
 
-        # 获取历史数据
-        offsets = self.get_history_offsets()
-        history_values = []
-
-        for offset in offsets:
-            hp = self.fetch_history_point(data_point, offset)
-            if hp:
-                history_values.append(hp.value)
-
-        # 计算历史基准值
-        if history_values:
-            if fetch_type == "avg":
-                # 下降检测使用前 floor_interval 天的平均值
-                floor_values = history_values[:floor_interval]
-                ceil_values = history_values[:ceil_interval]
-
-                context["floor_history_value"] = sum(floor_values) / len(floor_values) if floor_values else None
-                context["ceil_history_value"] = sum(ceil_values) / len(ceil_values) if ceil_values else None
-            else:  # last
-                # 使用最近一天的值
-                context["floor_history_value"] = history_values[0] if history_values else None
-                context["ceil_history_value"] = history_values[0] if history_values else None
+        # 增量基线可以回答时 O(1) 获取基准值，否则逐个偏移量获取历史数据
+        baseline_values = self.baseline_history_values(data_point, fetch_type, floor_interval, ceil_interval)
+        if baseline_values is not None:
+            context["floor_history_value"], context["ceil_history_value"] = baseline_values
+        else:
+            # 获取历史数据
+            history_values = []
+
+            for offset in self.history_offsets:
+                hp = self.fetch_history_point(data_point, offset)
+                if hp:
+                    history_values.append(hp.value)
+
+            # 计算历史基准值
+            if history_values:
+                if fetch_type == "avg":
+                    # 下降检测使用前 floor_interval 天的平均值
+                    floor_values = history_values[:floor_interval]
+                    ceil_values = history_values[:ceil_interval]
+
+                    context["floor_history_value"] = sum(floor_values) / len(floor_values) if floor_values else None
+                    context["ceil_history_value"] = sum(ceil_values) / len(ceil_values) if ceil_values else None
+                else:  # last
+                    # 使用最近一天的值
+                    context["floor_history_value"] = history_values[0] if history_values else None
+                    context["ceil_history_value"] = history_values[0] if history_values else None
 
         context["fetch_type"] = fetch_type
         context["floor_interval"] = floor_interval
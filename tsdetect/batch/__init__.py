@@ -0,0 +1,37 @@
+"""
+TsDetect 批量检测模块
+
+基于 NumPy 的列式批量检测引擎（需要安装 tsdetect[full]）。
+"""
+
+from tsdetect.batch.backtest import (
+    BACKTEST_SWEEPS,
+    BacktestResult,
+    BacktestRunner,
+    config_grid,
+    load_frame_history,
+    register_backtest_sweep,
+)
+from tsdetect.batch.engine import (
+    BATCH_EVALUATORS,
+    BatchDetector,
+    BatchResult,
+    HistoryMatrix,
+    register_batch_evaluator,
+)
+from tsdetect.batch.frame import DetectFrame
+
+__all__ = [
+    "DetectFrame",
+    "BatchDetector",
+    "BatchResult",
+    "HistoryMatrix",
+    "BATCH_EVALUATORS",
+    "register_batch_evaluator",
+    "BacktestRunner",
+    "BacktestResult",
+    "BACKTEST_SWEEPS",
+    "register_backtest_sweep",
+    "config_grid",
+    "load_frame_history",
+]
@@ -0,0 +1,369 @@
+"""
+TsDetect 参数回测
+
+在一段历史数据上一次性评估一组算法配置（参数网格），输出每个配置的告警数和告警时间：
+    1. 历史数据直接从数据帧自身按（维度, 时间戳 - 偏移量）查找，所有配置共用一个覆盖全部偏移量的历史矩阵
+    2. 历史基准值（前 N 个周期的平均值、历史振幅等）按影响它的参数分组，每组只计算一次
+    3. 同一基准值下的阈值参数（floor / ceil / ratio / shock）以广播的方式一次比较
+
+使用示例：
+    configs = config_grid(floor=[10, 20, 30], ceil=[20, 50], floor_interval=[3, 7], ceil_interval=7)
+    runner = BacktestRunner(AdvancedYearRoundAlgorithm, configs)
+    for result in runner.run(DetectFrame.from_block(block), start=replay_start):
+        print(result.config, result.alert_count)
+"""
+
+import itertools
+from collections.abc import Callable, Iterable, Sequence
+from typing import Any
+
+from tsdetect.algorithms.amplitude import YearRoundAmplitudeAlgorithm
+from tsdetect.algorithms.ring_ratio import AdvancedRingRatioAlgorithm
+from tsdetect.algorithms.year_round import AdvancedYearRoundAlgorithm
+from tsdetect.batch.engine import BATCH_EVALUATORS, HistoryMatrix, _first_present_stats
+from tsdetect.batch.frame import DetectFrame
+from tsdetect.core.algorithms import BaseAlgorithm, RangeRatioAlgorithm
+from tsdetect.core.block import DataPointBlock
+from tsdetect.core.interfaces import IDataPoint
+from tsdetect.utils.optional import np, require_numpy
+
+# 参数扫描函数：(算法实例列表, 数据帧, 共用历史矩阵) -> 与算法一一对应的布尔掩码列表
+BacktestSweep = Callable[[list[BaseAlgorithm], DetectFrame, HistoryMatrix | None], list[Any]]
+
+# 算法类 -> 参数扫描函数
+BACKTEST_SWEEPS: dict[type, BacktestSweep] = {}
+
+
+def register_backtest_sweep(*algorithm_classes: type):
+    """
+    注册参数扫描函数
+
+    按算法类精确匹配，未注册的算法逐个配置使用批量求值函数（BATCH_EVALUATORS）。
+
+    Args:
+        *algorithm_classes: 算法类
+    """
+
+    def decorator(func: BacktestSweep) -> BacktestSweep:
+        for algorithm_class in algorithm_classes:
+            BACKTEST_SWEEPS[algorithm_class] = func
+        return func
+
+    return decorator
+
+
+def config_grid(**params: Any) -> list[dict[str, Any]]:
+    """
+    生成参数网格
+
+    列表或元组参数取所有组合，其他值作为固定参数。
+
+    Args:
+        **params: 参数名 -> 候选值列表或固定值
+
+    Returns:
+        配置列表
+    """
+    names = list(params)
+    choices = [value if isinstance(value, list | tuple) else [value] for value in params.values()]
+    return [dict(zip(names, combination, strict=True)) for combination in itertools.product(*choices)]
+
+
+class BacktestResult:
+    """
+    单个配置的回测结果
+
+    Attributes:
+        config: 算法配置
+        indices: 告警行号（数据帧中的行）
+        timestamps: 告警时间戳
+    """
+
+    __slots__ = ("config", "indices", "timestamps")
+
+    def __init__(self, config: dict[str, Any], indices, timestamps):
+        self.config = config
+        self.indices = indices
+        self.timestamps = timestamps
+
+    @property
+    def alert_count(self) -> int:
+        """告警数"""
+        return len(self.indices)
+
+    def as_dict(self) -> dict[str, Any]:
+        """转换为字典"""
+        return {"config": self.config, "alert_count": self.alert_count, "timestamps": self.timestamps.tolist()}
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} config={self.config} alerts={self.alert_count}>"
+
+
+def load_frame_history(frame: DetectFrame, offsets: Sequence[int]) -> HistoryMatrix:
+    """
+    从数据帧自身加载历史矩阵
+
+    行 i 在偏移量 o 处的历史值为同一维度、时间戳为 timestamps[i] - o 的行的值，
+    不存在时为 NaN。同一维度同一时间戳有多行时取第一行。
+
+    Args:
+        frame: 数据帧
+        offsets: 偏移量列表
+
+    Returns:
+        历史数据矩阵
+    """
+    offsets = list(offsets)
+    values = np.full((len(offsets), len(frame)), np.nan, dtype=np.float64)
+    if not offsets or not len(frame):
+        return HistoryMatrix(offsets, values)
+
+    timestamps = frame.timestamps
+    base = int(timestamps.min())
+    span = int(timestamps.max()) - base + 1
+    # （维度, 时间戳）编码为一个整数键，排序后二分查找
+    keys = frame.dimension_ids * span + (timestamps - base)
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+
+    for row, offset in enumerate(offsets):
+        relative = timestamps - base - offset
+        wanted = frame.dimension_ids * span + relative
+        positions = np.minimum(np.searchsorted(sorted_keys, wanted), len(sorted_keys) - 1)
+        found = (relative >= 0) & (sorted_keys[positions] == wanted)
+        values[row, found] = frame.values[order[positions[found]]]
+
+    return HistoryMatrix(offsets, values)
+
+
+class BacktestRunner:
+    """
+    参数回测器
+
+    每个配置构造一个算法实例（同时完成配置校验），对整个数据帧求出告警掩码。
+    已注册参数扫描函数的算法（高级环比、高级同比、同比振幅）共享基准值并广播阈值参数，
+    其余注册了批量求值函数的算法逐个配置求值，但仍共用历史矩阵。
+
+    数据帧需要包含回测区间之前足够长的数据作为历史数据（如同比 7 天），
+    通过 run 的 start 参数只统计回测区间内的告警。
+    """
+
+    def __init__(self, algorithm_class: type[BaseAlgorithm], configs: Iterable[dict[str, Any]], **algorithm_kwargs):
+        """
+        初始化参数回测器
+
+        Args:
+            algorithm_class: 算法类
+            configs: 配置列表（如 config_grid 的返回值）
+            **algorithm_kwargs: 其他构造参数（如 agg_interval），所有配置共用
+
+        Raises:
+            ImportError: 未安装 numpy
+            ValueError: 算法不支持数组求值
+            InvalidAlgorithmConfigError: 配置无效
+        """
+        require_numpy()
+        self.algorithm_class = algorithm_class
+        self.sweep = BACKTEST_SWEEPS.get(algorithm_class)
+        if self.sweep is None and algorithm_class not in BATCH_EVALUATORS:
+            raise ValueError(f"{algorithm_class.__name__} does not support vectorized backtesting")
+
+        self.configs = list(configs)
+        self.algorithms = [algorithm_class(config=config, **algorithm_kwargs) for config in self.configs]
+
+        # 所有配置共用的历史偏移量
+        offsets: set[int] = set()
+        for algorithm in self.algorithms:
+            if isinstance(algorithm, RangeRatioAlgorithm):
+                offsets.update(algorithm.history_offsets)
+        self.offsets = sorted(offsets)
+
+    def evaluate(self, frame: DetectFrame) -> list[Any]:
+        """
+        求出每个配置的告警掩码
+
+        Args:
+            frame: 数据帧
+
+        Returns:
+            与配置一一对应的布尔掩码列表
+        """
+        history = load_frame_history(frame, self.offsets) if self.offsets else None
+        if self.sweep is not None:
+            return self.sweep(self.algorithms, frame, history)
+
+        evaluator = BATCH_EVALUATORS[self.algorithm_class]
+        return [
+            evaluator(
+                algorithm,
+                frame,
+                history.select(algorithm.history_offsets) if isinstance(algorithm, RangeRatioAlgorithm) else None,
+            )
+            for algorithm in self.algorithms
+        ]
+
+    def run(
+        self,
+        data: DetectFrame | DataPointBlock | Iterable[IDataPoint],
+        start: int | None = None,
+        end: int | None = None,
+    ) -> list[BacktestResult]:
+        """
+        执行回测
+
+        Args:
+            data: 历史数据（数据帧、数据点块或数据点列表）
+            start: 统计告警的起始时间戳（含），之前的数据只作为历史数据
+            end: 统计告警的结束时间戳（不含）
+
+        Returns:
+            与配置一一对应的回测结果
+        """
+        if isinstance(data, DataPointBlock):
+            frame = DetectFrame.from_block(data)
+        elif isinstance(data, DetectFrame):
+            frame = data
+        else:
+            frame = DetectFrame.from_points(data)
+
+        window = np.ones(len(frame), dtype=bool)
+        if start is not None:
+            window &= frame.timestamps >= start
+        if end is not None:
+            window &= frame.timestamps < end
+
+        results = []
+        for config, mask in zip(self.configs, self.evaluate(frame), strict=True):
+            indices = np.flatnonzero(np.asarray(mask, dtype=bool) & window)
+            results.append(BacktestResult(config, indices, frame.timestamps[indices]))
+        return results
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} algorithm={self.algorithm_class.__name__} configs={len(self.configs)}>"
+
+
+def _threshold_masks(requests: dict[tuple, set[float]], compare: Callable[[Any, Any], Any]) -> dict[tuple, Any]:
+    """
+    按基准值分组广播比较
+
+    Args:
+        requests: 基准值键 -> 需要比较的阈值参数集合
+        compare: (基准值键, 阈值参数列向量) -> (参数个数, 行数) 的布尔矩阵
+
+    Returns:
+        (基准值键, 阈值参数) -> 布尔掩码
+    """
+    masks = {}
+    for key, params in requests.items():
+        ordered = sorted(params)
+        matrix = compare(key, np.asarray(ordered, dtype=np.float64)[:, None])
+        for param, mask in zip(ordered, matrix, strict=True):
+            masks[key, param] = mask
+    return masks
+
+
+@register_backtest_sweep(AdvancedRingRatioAlgorithm, AdvancedYearRoundAlgorithm)
+def _sweep_advanced_ratio(algorithms: list[BaseAlgorithm], frame: DetectFrame, history: HistoryMatrix) -> list[Any]:
+    values = frame.values
+    baselines: dict[tuple, Any] = {}
+
+    def baseline(key: tuple):
+        # 前 limit 个存在的历史值只在算法自身的回看范围内查找
+        if key not in baselines:
+            limit, fetch_type, offsets = key
+            baselines[key] = _first_present_stats(history.select(offsets).values, limit, fetch_type)
+        return baselines[key]
+
+    plans = []
+    floor_requests: dict[tuple, set[float]] = {}
+    ceil_requests: dict[tuple, set[float]] = {}
+    for algorithm in algorithms:
+        config = algorithm.validated_config
+        fetch_type = config.get("fetch_type", "avg")
+        default_interval = 5 if isinstance(algorithm, AdvancedRingRatioAlgorithm) else 7
+        offsets = algorithm.history_offsets
+        floor_key = (config.get("floor_interval", default_interval), fetch_type, offsets)
+        ceil_key = (config.get("ceil_interval", default_interval), fetch_type, offsets)
+        floor = config.get("floor")
+        ceil = config.get("ceil")
+        if floor is not None:
+            floor_requests.setdefault(floor_key, set()).add(floor)
+        if ceil is not None:
+            ceil_requests.setdefault(ceil_key, set()).add(ceil)
+        plans.append((floor_key, floor, ceil_key, ceil))
+
+    with np.errstate(invalid="ignore"):
+        floor_masks = _threshold_masks(
+            floor_requests,
+            lambda key, floors: ~np.isnan(baseline(key)) & (values <= baseline(key) * (100 - floors) * 0.01),
+        )
+        ceil_masks = _threshold_masks(
+            ceil_requests,
+            lambda key, ceils: ~np.isnan(baseline(key)) & (values >= baseline(key) * (100 + ceils) * 0.01),
+        )
+
+    masks = []
+    for floor_key, floor, ceil_key, ceil in plans:
+        mask = np.zeros(len(frame), dtype=bool)
+        if floor is not None:
+            mask |= floor_masks[floor_key, floor]
+        if ceil is not None:
+            mask |= ceil_masks[ceil_key, ceil]
+        masks.append(mask)
+    return masks
+
+
+@register_backtest_sweep(YearRoundAmplitudeAlgorithm)
+def _sweep_year_round_amplitude(
+    algorithms: list[YearRoundAmplitudeAlgorithm], frame: DetectFrame, history: HistoryMatrix
+) -> list[Any]:
+    day_amplitudes: dict[tuple[int, int], Any] = {}
+    current_amplitudes: dict[int, Any] = {}
+    history_amplitudes: dict[tuple, Any] = {}
+
+    def history_amplitude(key: tuple):
+        if key not in history_amplitudes:
+            agg_interval, one_day, days, method = key
+            for day in range(1, days + 1):
+                if (agg_interval, day) not in day_amplitudes:
+                    day_amplitudes[agg_interval, day] = np.abs(
+                        history.row(one_day * day) - history.row(one_day * day + agg_interval)
+                    )
+            if days > 0:
+                amplitudes = np.stack([day_amplitudes[agg_interval, day] for day in range(1, days + 1)])
+            else:
+                amplitudes = np.empty((0, len(frame)), dtype=np.float64)
+
+            present = ~np.isnan(amplitudes)
+            count = present.sum(axis=0)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                if method == "avg":
+                    result = np.where(present, amplitudes, 0.0).sum(axis=0) / np.maximum(count, 1)
+                else:
+                    result = np.where(present, amplitudes, -np.inf).max(axis=0, initial=-np.inf)
+            history_amplitudes[key] = np.where(count > 0, result, np.nan)
+        return history_amplitudes[key]
+
+    def current_amplitude(agg_interval: int):
+        if agg_interval not in current_amplitudes:
+            current_amplitudes[agg_interval] = np.abs(frame.values - history.row(agg_interval))
+        return current_amplitudes[agg_interval]
+
+    # 同一历史振幅下按 (ratio, shock) 分组广播
+    groups: dict[tuple, list[tuple[int, float, float]]] = {}
+    for index, algorithm in enumerate(algorithms):
+        config = algorithm.validated_config
+        key = (algorithm.agg_interval, algorithm.CONST_ONE_DAY, config.get("days", 7), config.get("method", "avg"))
+        groups.setdefault(key, []).append((index, config["ratio"], config["shock"]))
+
+    masks: list[Any] = [None] * len(algorithms)
+    for key, members in groups.items():
+        current = current_amplitude(key[0])
+        baseline = history_amplitude(key)
+        ratios = np.asarray([ratio for _, ratio, _ in members], dtype=np.float64)[:, None]
+        shocks = np.asarray([shock for _, _, shock in members], dtype=np.float64)[:, None]
+        with np.errstate(invalid="ignore"):
+            matrix = ~np.isnan(current) & ~np.isnan(baseline) & (current >= baseline * ratios + shocks)
+        for (index, _, _), mask in zip(members, matrix, strict=True):
+            masks[index] = mask
+    return masks
@@ -0,0 +1,466 @@
+"""
+TsDetect 批量检测引擎
+
+将检测表达式改写为数组运算，对整个数据帧一次性求值，
+只为触发异常的行构造异常点对象。
+"""
+
+import operator
+from collections.abc import Callable, Iterable
+from typing import Any
+
+from tsdetect.algorithms.amplitude import RingRatioAmplitudeAlgorithm, YearRoundAmplitudeAlgorithm
+from tsdetect.algorithms.ring_ratio import AdvancedRingRatioAlgorithm, SimpleRingRatioAlgorithm
+from tsdetect.algorithms.threshold import (
+    AndThresholdAlgorithm,
+    ThresholdAlgorithm,
+    ThresholdBounds,
+    ThresholdInterval,
+)
+from tsdetect.algorithms.year_round import AdvancedYearRoundAlgorithm, SimpleYearRoundAlgorithm
+from tsdetect.batch.frame import DetectFrame
+from tsdetect.core.algorithms import BaseAlgorithm, RangeRatioAlgorithm
+from tsdetect.core.base import BaseAnomalyPoint
+from tsdetect.core.interfaces import IDataPoint
+from tsdetect.utils.optional import np, require_numpy
+
+# 比较方法映射（数组版本，与 THRESHOLD_METHODS 一致）
+ARRAY_OPERATORS = {
+    "gt": operator.gt,
+    "gte": operator.ge,
+    "lt": operator.lt,
+    "lte": operator.le,
+    "eq": operator.eq,
+    "neq": operator.ne,
+}
+
+# 批量求值函数：(algorithm, frame, history) -> 布尔掩码
+BatchEvaluator = Callable[[BaseAlgorithm, DetectFrame, Any], Any]
+
+# 算法类 -> 批量求值函数
+BATCH_EVALUATORS: dict[type, BatchEvaluator] = {}
+
+
+def register_batch_evaluator(*algorithm_classes: type):
+    """
+    注册批量求值函数
+
+    按算法类精确匹配，子类如果改写了检测逻辑需要单独注册，
+    未注册的算法会回退到逐点检测。
+
+    Args:
+        *algorithm_classes: 算法类
+    """
+
+    def decorator(func: BatchEvaluator) -> BatchEvaluator:
+        for algorithm_class in algorithm_classes:
+            BATCH_EVALUATORS[algorithm_class] = func
+        return func
+
+    return decorator
+
+
+class HistoryMatrix:
+    """
+    历史数据矩阵
+
+    形状为 (len(offsets), rows)，缺失的历史点为 NaN。
+    """
+
+    def __init__(self, offsets: list[int], values):
+        self.offsets = offsets
+        self.values = values
+        # 与 list.index 语义一致：重复偏移取第一个
+        self._index: dict[int, int] = {}
+        for idx, offset in enumerate(offsets):
+            self._index.setdefault(offset, idx)
+
+    def row(self, offset: int):
+        """获取指定偏移的历史值"""
+        return self.values[self._index[offset]]
+
+    def select(self, offsets: Iterable[int]) -> "HistoryMatrix":
+        """
+        按偏移量选出子矩阵
+
+        多个算法共用一个覆盖全部偏移量的矩阵时，为每个算法选出其偏移量顺序的行。
+
+        Args:
+            offsets: 偏移量列表
+
+        Returns:
+            历史数据矩阵
+        """
+        offsets = list(offsets)
+        if offsets == self.offsets:
+            return self
+        return HistoryMatrix(offsets, self.values[[self._index[offset] for offset in offsets]])
+
+    @classmethod
+    def load(cls, algorithm: RangeRatioAlgorithm, frame: DetectFrame) -> "HistoryMatrix":
+        """
+        通过算法自身的历史数据接口加载历史矩阵
+
+        Args:
+            algorithm: 同比/环比算法
+            frame: 数据帧
+
+        Returns:
+            历史数据矩阵
+        """
+        offsets = list(algorithm.history_offsets)
+        values = np.full((len(offsets), len(frame)), np.nan, dtype=np.float64)
+        if not offsets or not len(frame):
+            return cls(offsets, values)
+
+        points = frame.points()
+        algorithm.query_history_points(points)
+
+        for col, dp in enumerate(points):
+            for row, offset in enumerate(offsets):
+                hp = algorithm.fetch_history_point(dp, offset)
+                if hp is not None:
+                    values[row, col] = hp.value
+
+        return cls(offsets, values)
+
+
+class BatchResult:
+    """
+    批量检测结果
+
+    包含异常掩码和异常行号，异常点对象在首次访问时才构造。
+    """
+
+    def __init__(self, algorithm: BaseAlgorithm, frame: DetectFrame, mask, level: int = 1):
+        self.algorithm = algorithm
+        self.frame = frame
+        self.mask = mask
+        self.indices = np.flatnonzero(mask)
+        self.level = level
+        self._anomalies: dict[int, list[BaseAnomalyPoint]] = {}
+
+    @property
+    def anomaly_count(self) -> int:
+        """异常行数"""
+        return len(self.indices)
+
+    def anomalies(self) -> list[BaseAnomalyPoint]:
+        """
+        生成异常点
+
+        只对触发的行调用算法的逐点检测，保证异常点内容与 detect_records 一致。
+
+        Returns:
+            异常数据点列表
+        """
+        results = []
+        for idx in self.indices.tolist():
+            anomalies = self._anomalies.get(idx)
+            if anomalies is None:
+                anomalies = self.algorithm.detect(self.frame.point(idx))
+                for anomaly in anomalies:
+                    anomaly.level = self.level
+                self._anomalies[idx] = anomalies
+            results.extend(anomalies)
+        return results
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} rows={len(self.frame)} anomalies={self.anomaly_count}>"
+
+
+class BatchDetector:
+    """
+    批量检测器
+
+    对已注册的算法使用数组运算求值，其余算法回退到逐点检测。
+
+    使用示例：
+        frame = DetectFrame.from_points(data_points)
+        result = BatchDetector(algorithm).detect(frame)
+        result.indices  # 异常行号
+        result.anomalies()  # 只为异常行构造异常点
+    """
+
+    def __init__(self, algorithm: BaseAlgorithm, level: int = 1):
+        """
+        初始化批量检测器
+
+        Args:
+            algorithm: 检测算法
+            level: 告警级别
+        """
+        require_numpy()
+        self.algorithm = algorithm
+        self.level = level
+        self.evaluator = BATCH_EVALUATORS.get(type(algorithm))
+
+    @property
+    def vectorized(self) -> bool:
+        """是否使用数组求值"""
+        return self.evaluator is not None
+
+    def detect(self, frame: DetectFrame) -> BatchResult:
+        """
+        检测数据帧
+
+        Args:
+            frame: 数据帧
+
+        Returns:
+            批量检测结果
+        """
+        if self.evaluator is None:
+            return self._detect_by_points(frame)
+
+        history = None
+        if isinstance(self.algorithm, RangeRatioAlgorithm):
+            history = HistoryMatrix.load(self.algorithm, frame)
+
+        mask = np.asarray(self.evaluator(self.algorithm, frame, history), dtype=bool)
+        return BatchResult(self.algorithm, frame, mask, level=self.level)
+
+    def detect_points(self, data_points: Iterable[IDataPoint]) -> BatchResult:
+        """
+        检测数据点列表
+
+        Args:
+            data_points: 数据点列表
+
+        Returns:
+            批量检测结果
+        """
+        return self.detect(DetectFrame.from_points(data_points))
+
+    def _detect_by_points(self, frame: DetectFrame) -> BatchResult:
+        """逐点检测（未注册批量求值的算法）"""
+        points = frame.points()
+        self.algorithm.prepare_records(points)
+
+        mask = np.zeros(len(frame), dtype=bool)
+        cached: dict[int, list[BaseAnomalyPoint]] = {}
+        for idx, dp in enumerate(points):
+            anomalies = self.algorithm.detect(dp)
+            if anomalies:
+                mask[idx] = True
+                for anomaly in anomalies:
+                    anomaly.level = self.level
+                cached[idx] = anomalies
+
+        result = BatchResult(self.algorithm, frame, mask, level=self.level)
+        result._anomalies.update(cached)
+        return result
+
+
+def _convert_to_min(algorithm: BaseAlgorithm, values, unit: str, target_unit: str | None = None):
+    """
+    数组版 unit_convert_min
+
+    乘数型转换器可以直接作用于数组，其余转换器逐元素回退。
+    """
+    converter = algorithm.unit_converter
+    if converter is None:
+        return values
+
+    try:
+        converted = np.asarray(converter.convert_to_min(values, unit, target_unit), dtype=np.float64)
+        if converted.shape == np.shape(values):
+            return converted
+    except Exception:
+        # 转换器不支持数组时逐元素回退
+        pass
+
+    return np.fromiter(
+        (converter.convert_to_min(float(v), unit, target_unit) for v in values), dtype=np.float64, count=len(values)
+    )
+
+
+def _convert_scalar(algorithm: BaseAlgorithm, value: float, unit: str, target_unit: str | None = None) -> float:
+    """标量版 unit_convert_min"""
+    if algorithm.unit_converter is None:
+        return value
+    return algorithm.unit_converter.convert_to_min(value, unit, target_unit)
+
+
+def _interval_mask(values, interval: ThresholdInterval):
+    """数组版 ThresholdInterval.contains"""
+    low_op = operator.ge if interval.low_closed else operator.gt
+    high_op = operator.le if interval.high_closed else operator.lt
+    mask = low_op(values, interval.low) & high_op(values, interval.high)
+    for excluded in interval.excluded:
+        mask &= values != excluded
+    return mask
+
+
+def _bounds_mask(bounds: ThresholdBounds, values):
+    """
+    数组版 ThresholdBounds.contains
+
+    区间较多时对合并后的有序区间做 searchsorted，每个值只与一个区间比较。
+    """
+    merged = bounds.merged
+    if merged is not None and len(merged) >= bounds.bisect_min_intervals:
+        index = np.searchsorted(np.asarray(bounds.lows, dtype=np.float64), values, side="right") - 1
+        valid = index >= 0
+        index = np.maximum(index, 0)
+        low = np.array([i.low for i in merged], dtype=np.float64)[index]
+        low_closed = np.array([i.low_closed for i in merged], dtype=bool)[index]
+        high = np.array([i.high for i in merged], dtype=np.float64)[index]
+        high_closed = np.array([i.high_closed for i in merged], dtype=bool)[index]
+        mask = valid & ((values > low) | (low_closed & (values == low)))
+        mask &= (values < high) | (high_closed & (values == high))
+    else:
+        mask = np.zeros(len(values), dtype=bool)
+        for interval in merged if merged is not None else bounds.intervals:
+            mask |= _interval_mask(values, interval)
+
+    if bounds.nan_match:
+        mask |= np.isnan(values)
+    return mask
+
+
+def _threshold_mask(algorithm: ThresholdAlgorithm | AndThresholdAlgorithm, frame: DetectFrame):
+    """阈值条件组求值：阈值按单位预先转换为区间"""
+    mask = np.zeros(len(frame), dtype=bool)
+
+    for unit, rows in frame.unit_groups():
+        values = frame.values if rows is None else frame.values[rows]
+        converted = np.asarray(_convert_to_min(algorithm, values, unit), dtype=np.float64)
+        unit_mask = _bounds_mask(algorithm.threshold_bounds(unit), converted)
+
+        if rows is None:
+            mask = unit_mask
+        else:
+            mask[rows] = unit_mask
+
+    return mask
+
+
+def _ratio_mask(algorithm: BaseAlgorithm, values, floor_history, ceil_history):
+    """同比/环比涨跌幅求值：下降或上升任一触发"""
+    config = algorithm.validated_config
+    floor = config.get("floor")
+    ceil = config.get("ceil")
+    mask = np.zeros(len(values), dtype=bool)
+
+    with np.errstate(invalid="ignore"):
+        if floor is not None:
+            mask |= ~np.isnan(floor_history) & (values <= floor_history * (100 - floor) * 0.01)
+        if ceil is not None:
+            mask |= ~np.isnan(ceil_history) & (values >= ceil_history * (100 + ceil) * 0.01)
+
+    return mask
+
+
+def _first_present_stats(history, limit: int, fetch_type: str):
+    """
+    计算前 limit 个存在的历史值的基准值
+
+    与逐点实现一致：跳过缺失的偏移，取前 limit 个存在的值求平均，
+    或取第一个存在的值。
+    """
+    present = ~np.isnan(history)
+
+    if fetch_type == "last":
+        has_any = present.any(axis=0)
+        first = present.argmax(axis=0)
+        baseline = history[first, np.arange(history.shape[1])]
+        return np.where(has_any, baseline, np.nan)
+
+    selected = present & (np.cumsum(present, axis=0) <= limit)
+    total = np.where(selected, history, 0.0).sum(axis=0)
+    count = selected.sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(count > 0, total / np.maximum(count, 1), np.nan)
+
+
+@register_batch_evaluator(ThresholdAlgorithm, AndThresholdAlgorithm)
+def _evaluate_threshold(
+    algorithm: ThresholdAlgorithm | AndThresholdAlgorithm, frame: DetectFrame, history: HistoryMatrix | None
+):
+    return _threshold_mask(algorithm, frame)
+
+
+@register_batch_evaluator(SimpleRingRatioAlgorithm, SimpleYearRoundAlgorithm)
+def _evaluate_simple_ratio(algorithm: RangeRatioAlgorithm, frame: DetectFrame, history: HistoryMatrix):
+    baseline = history.values[0]
+    return _ratio_mask(algorithm, frame.values, baseline, baseline)
+
+
+@register_batch_evaluator(AdvancedRingRatioAlgorithm, AdvancedYearRoundAlgorithm)
+def _evaluate_advanced_ratio(algorithm: RangeRatioAlgorithm, frame: DetectFrame, history: HistoryMatrix):
+    config = algorithm.validated_config
+    fetch_type = config.get("fetch_type", "avg")
+    default_interval = 5 if isinstance(algorithm, AdvancedRingRatioAlgorithm) else 7
+
+    floor_history = _first_present_stats(history.values, config.get("floor_interval", default_interval), fetch_type)
+    ceil_history = _first_present_stats(history.values, config.get("ceil_interval", default_interval), fetch_type)
+    return _ratio_mask(algorithm, frame.values, floor_history, ceil_history)
+
+
+@register_batch_evaluator(RingRatioAmplitudeAlgorithm)
+def _evaluate_ring_ratio_amplitude(algorithm: RingRatioAmplitudeAlgorithm, frame: DetectFrame, history: HistoryMatrix):
+    config = algorithm.validated_config
+    history_values = history.values[0]
+    mask = np.zeros(len(frame), dtype=bool)
+
+    for unit, rows in frame.unit_groups():
+        values = frame.values if rows is None else frame.values[rows]
+        hist = history_values if rows is None else history_values[rows]
+        present = ~np.isnan(hist)
+
+        threshold = _convert_scalar(algorithm, config["threshold"], unit, algorithm.unit)
+        shock = _convert_scalar(algorithm, config["shock"], unit, algorithm.unit)
+        converted_hist = _convert_to_min(algorithm, hist, unit)
+
+        with np.errstate(invalid="ignore"):
+            above = (_convert_to_min(algorithm, values, unit) >= threshold) & (converted_hist >= threshold)
+            amplitude = (
+                _convert_to_min(algorithm, np.abs(hist - values), unit) >= converted_hist * config["ratio"] + shock
+            )
+        unit_mask = present & above & amplitude
+
+        if rows is None:
+            mask = unit_mask
+        else:
+            mask[rows] = unit_mask
+
+    return mask
+
+
+@register_batch_evaluator(YearRoundAmplitudeAlgorithm)
+def _evaluate_year_round_amplitude(algorithm: YearRoundAmplitudeAlgorithm, frame: DetectFrame, history: HistoryMatrix):
+    config = algorithm.validated_config
+    days = config.get("days", 7)
+    agg_interval = algorithm.agg_interval
+
+    current_amplitude = np.abs(frame.values - history.row(agg_interval))
+
+    if days > 0:
+        amplitudes = np.stack(
+            [
+                np.abs(
+                    history.row(algorithm.CONST_ONE_DAY * day)
+                    - history.row(algorithm.CONST_ONE_DAY * day + agg_interval)
+                )
+                for day in range(1, days + 1)
+            ]
+        )
+    else:
+        amplitudes = np.empty((0, len(frame)), dtype=np.float64)
+
+    present = ~np.isnan(amplitudes)
+    count = present.sum(axis=0)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        if config.get("method", "avg") == "avg":
+            history_amplitude = np.where(present, amplitudes, 0.0).sum(axis=0) / np.maximum(count, 1)
+        else:
+            history_amplitude = np.where(present, amplitudes, -np.inf).max(axis=0, initial=-np.inf)
+        history_amplitude = np.where(count > 0, history_amplitude, np.nan)
+
+        return (
+            ~np.isnan(current_amplitude)
+            & ~np.isnan(history_amplitude)
+            & (current_amplitude >= history_amplitude * config["ratio"] + config["shock"])
+        )
@@ -0,0 +1,239 @@
+"""
+TsDetect 列式数据帧
+
+以 NumPy 数组保存一批数据点（值、时间戳、维度编码、单位编码），
+作为批量检测引擎的输入。
+"""
+
+from collections.abc import Iterable, Sequence
+from typing import Any
+
+from tsdetect.core.base import CompactDataPoint
+from tsdetect.core.block import DataPointBlock
+from tsdetect.core.dimensions import canonical_dimension_key
+from tsdetect.core.exceptions import InvalidDataPointError
+from tsdetect.core.interfaces import IDataPoint
+from tsdetect.utils.optional import np, require_numpy
+
+
+class DetectFrame:
+    """
+    列式检测数据帧
+
+    每一行对应一个数据点，列以并行数组保存：
+        - values: float64 数值
+        - timestamps: int64 时间戳（秒）
+        - dimension_ids: int64 维度编码，指向 dimensions 列表
+        - unit_ids: int64 单位编码，指向 unit_names 列表
+
+    行对象（IDataPoint）只在需要时（历史数据获取、生成异常点）才会被构造。
+    """
+
+    def __init__(
+        self,
+        values: Sequence[float],
+        timestamps: Sequence[int],
+        dimension_ids: Sequence[int] | None = None,
+        dimensions: list[dict[str, Any]] | None = None,
+        unit: str | Sequence[str] = "",
+        data_points: list[IDataPoint] | None = None,
+    ):
+        """
+        初始化数据帧
+
+        Args:
+            values: 数值列
+            timestamps: 时间戳列
+            dimension_ids: 维度编码列，为空时所有行共用 dimensions[0]
+            dimensions: 维度字典列表，由 dimension_ids 索引
+            unit: 单位，字符串表示所有行同一单位，序列表示逐行单位
+            data_points: 与行一一对应的原始数据点（可选）
+        """
+        require_numpy()
+
+        self.values = np.asarray(values, dtype=np.float64)
+        self.timestamps = np.asarray(timestamps, dtype=np.int64)
+        size = len(self.values)
+
+        if len(self.timestamps) != size:
+            raise InvalidDataPointError("values and timestamps must have the same length", field="timestamps")
+
+        if dimension_ids is None:
+            self.dimension_ids = np.zeros(size, dtype=np.int64)
+            self.dimensions = dimensions or [{}]
+        else:
+            self.dimension_ids = np.asarray(dimension_ids, dtype=np.int64)
+            self.dimensions = dimensions or []
+            if len(self.dimension_ids) != size:
+                raise InvalidDataPointError("dimension_ids must have the same length as values", field="dimension_ids")
+            if size and (self.dimension_ids.min() < 0 or self.dimension_ids.max() >= len(self.dimensions)):
+                raise InvalidDataPointError("dimension_ids out of range", field="dimension_ids")
+
+        if isinstance(unit, str):
+            self.unit_names = [unit]
+            self.unit_ids = np.zeros(size, dtype=np.int64)
+        else:
+            if len(unit) != size:
+                raise InvalidDataPointError("units must have the same length as values", field="unit")
+            unit_index: dict[str, int] = {}
+            self.unit_ids = np.fromiter(
+                (unit_index.setdefault(u or "", len(unit_index)) for u in unit), dtype=np.int64, count=size
+            )
+            self.unit_names = list(unit_index) or [""]
+
+        if data_points is not None and len(data_points) != size:
+            raise InvalidDataPointError("data_points must have the same length as values", field="data_points")
+        self._data_points: list[IDataPoint | None] = list(data_points) if data_points is not None else [None] * size
+
+    @classmethod
+    def from_points(cls, data_points: Iterable[IDataPoint]) -> "DetectFrame":
+        """
+        从数据点对象构建数据帧
+
+        Args:
+            data_points: 数据点列表
+
+        Returns:
+            数据帧，保留原始数据点对象
+        """
+        points = list(data_points)
+        dimension_index: dict[tuple, int] = {}
+        dimensions: list[dict[str, Any]] = []
+        dimension_ids = []
+
+        for dp in points:
+            dims = dp.dimensions
+            key = canonical_dimension_key(dims)
+            dim_id = dimension_index.get(key)
+            if dim_id is None:
+                dim_id = dimension_index[key] = len(dimensions)
+                dimensions.append(dims)
+            dimension_ids.append(dim_id)
+
+        return cls(
+            values=[dp.value for dp in points],
+            timestamps=[dp.timestamp for dp in points],
+            dimension_ids=dimension_ids,
+            dimensions=dimensions or [{}],
+            unit=[dp.unit for dp in points],
+            data_points=points,
+        )
+
+    @classmethod
+    def from_block(cls, block: DataPointBlock) -> "DetectFrame":
+        """
+        从数据点块构建数据帧
+
+        数值、时间戳和编码列直接复用块的缓冲区（零拷贝）。
+
+        Args:
+            block: 数据点块
+
+        Returns:
+            数据帧
+        """
+        require_numpy()
+        return cls(
+            values=np.frombuffer(block.values, dtype=np.float64),
+            timestamps=np.frombuffer(block.timestamps, dtype=np.int64),
+            dimension_ids=np.frombuffer(block.dimension_ids, dtype=np.int64),
+            dimensions=block.dimensions or [{}],
+            unit=block.unit_names[0] if len(block.unit_names) == 1 else [block.unit_names[i] for i in block.unit_ids],
+            data_points=list(block),
+        )
+
+    @classmethod
+    def from_records(cls, records: Iterable[dict[str, Any]]) -> "DetectFrame":
+        """
+        从原始字典构建数据帧
+
+        不会为每条记录构造数据点对象，字段含义与 BaseDataPoint 一致。
+
+        Args:
+            records: 原始数据字典列表
+
+        Returns:
+            数据帧
+        """
+        values = []
+        timestamps = []
+        units = []
+        dimension_ids = []
+        dimension_index: dict[tuple, int] = {}
+        dimensions: list[dict[str, Any]] = []
+
+        for record in records:
+            value = record.get("value")
+            ts = record.get("timestamp") or record.get("time")
+            if value is None:
+                raise InvalidDataPointError("DataPoint missing required field: value", field="value")
+            if ts is None:
+                raise InvalidDataPointError("DataPoint missing required field: timestamp", field="timestamp")
+
+            dims = record.get("dimensions") or {}
+            key = canonical_dimension_key(dims)
+            dim_id = dimension_index.get(key)
+            if dim_id is None:
+                dim_id = dimension_index[key] = len(dimensions)
+                dimensions.append(dims)
+
+            values.append(float(value))
+            timestamps.append(int(ts))
+            units.append(record.get("unit", ""))
+            dimension_ids.append(dim_id)
+
+        return cls(
+            values=values,
+            timestamps=timestamps,
+            dimension_ids=dimension_ids,
+            dimensions=dimensions or [{}],
+            unit=units,
+        )
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def unit_at(self, index: int) -> str:
+        """获取指定行的单位"""
+        return self.unit_names[self.unit_ids[index]]
+
+    def point(self, index: int) -> IDataPoint:
+        """
+        获取指定行的数据点对象
+
+        原始数据点存在时直接返回，否则按需构造 CompactDataPoint 并缓存。
+
+        Args:
+            index: 行号
+
+        Returns:
+            数据点
+        """
+        dp = self._data_points[index]
+        if dp is None:
+            dp = CompactDataPoint(
+                value=float(self.values[index]),
+                timestamp=int(self.timestamps[index]),
+                unit=self.unit_at(index),
+                dimensions=self.dimensions[self.dimension_ids[index]],
+            )
+            self._data_points[index] = dp
+        return dp
+
+    def points(self) -> list[IDataPoint]:
+        """获取所有行的数据点对象"""
+        return [self.point(i) for i in range(len(self))]
+
+    def unit_groups(self) -> list[tuple[str, Any]]:
+        """
+        按单位分组
+
+        Returns:
+            [(单位, 行掩码或 None)]，只有一种单位时掩码为 None 表示全部行
+        """
+        if len(self.unit_names) == 1:
+            return [(self.unit_names[0], None)]
+        return [(unit, self.unit_ids == unit_id) for unit_id, unit in enumerate(self.unit_names)]
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} rows={len(self)} dimensions={len(self.dimensions)}>"
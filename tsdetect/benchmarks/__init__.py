@@ -0,0 +1,6 @@
+"""
+TsDetect 性能基准
+
+每个模块都可以单独运行，例如：
+    python -m tsdetect.benchmarks.intelligent_context
+"""
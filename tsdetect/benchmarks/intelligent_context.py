@@ -0,0 +1,111 @@
+"""
+智能检测上下文构建基准
+
+对比每个数据点构建检测上下文的开销：
+    - legacy：每次构建上下文时 deepcopy SDK 结果并重新解析 extra_info（旧实现）
+    - sdk_result：收到结果时构造一次 SDKResult，检测时直接读取
+
+运行：
+    python -m tsdetect.benchmarks.intelligent_context [--points 2000] [--repeat 5]
+"""
+
+import argparse
+import copy
+import json
+import timeit
+from typing import Any
+
+from tsdetect.algorithms.intelligent import MockSDKClient, SDKResult
+from tsdetect.core.base import CompactDataPoint, SimpleDataPoint
+
+
+def _legacy_context(values: dict[str, Any]) -> dict[str, Any]:
+    """旧实现：复制并解析 SDK 结果"""
+    env = copy.deepcopy(values)
+    if "extra_info" in env:
+        try:
+            if isinstance(env["extra_info"], str):
+                env["extra_info"] = json.loads(env["extra_info"])
+        except Exception:
+            env["extra_info"] = {}
+    else:
+        env["extra_info"] = {}
+    if "anomaly_score" in env["extra_info"]:
+        env["anomaly_score"] = env["extra_info"]["anomaly_score"]
+    if "anomaly_score" in env:
+        env["anomaly_score"] = round(env.get("anomaly_score", 0), 2)
+    if "alert_msg" in env["extra_info"]:
+        env["alert_msg"] = env["extra_info"]["alert_msg"]
+    return env
+
+
+def build_inputs(points: int) -> tuple[list[SimpleDataPoint], list[dict[str, Any]]]:
+    """生成数据点和对应的 SDK 原始结果"""
+    data_points = [
+        SimpleDataPoint(value=float(i % 100), timestamp=60 * i, dimensions={"ip": f"10.0.0.{i % 50}", "module": "db"})
+        for i in range(points)
+    ]
+    client = MockSDKClient()
+    raw_results = [
+        client.predict([{"value": dp.value, "timestamp": dp.timestamp}], dict(dp.dimensions))[0] for dp in data_points
+    ]
+    return data_points, raw_results
+
+
+def run(points: int = 2000, repeat: int = 5) -> dict[str, float]:
+    """
+    执行基准
+
+    Args:
+        points: 数据点数
+        repeat: 重复次数，取最小值
+
+    Returns:
+        {场景: 每个数据点耗时（微秒）}
+    """
+    data_points, raw_results = build_inputs(points)
+
+    def legacy():
+        for dp, raw in zip(data_points, raw_results, strict=True):
+            result_point = SimpleDataPoint(
+                value=dp.value, timestamp=dp.timestamp, unit=dp.unit, dimensions=dp.dimensions, values=raw
+            )
+            context = {"value": result_point.value}
+            context.update(_legacy_context(result_point.values))
+
+    parsed = [SDKResult(raw) for raw in raw_results]
+
+    def sdk_result():
+        for dp, result in zip(data_points, parsed, strict=True):
+            result_point = CompactDataPoint(
+                value=dp.value,
+                timestamp=dp.timestamp,
+                unit=dp.unit,
+                dimensions=dp.dimensions,
+                values=result,
+                record_id=dp.record_id,
+            )
+            context = {"value": result_point.value}
+            context.update(SDKResult.from_values(result_point.values))
+
+    timings = {}
+    for name, func in (("legacy", legacy), ("sdk_result", sdk_result)):
+        best = min(timeit.repeat(func, number=1, repeat=repeat))
+        timings[name] = best / points * 1e6
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--points", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    timings = run(args.points, args.repeat)
+    for name, us in timings.items():
+        print(f"{name:<12}{us:>10.2f} us/point")
+    print(f"{'speedup':<12}{timings['legacy'] / timings['sdk_result']:>10.2f} x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+"""
+检测吞吐基准
+
+在合成负载上通过 detect_records 逐批运行 ALGORITHM_REGISTRY 中的每个算法，报告：
+    - points_per_sec：每秒检测的数据点数
+    - p99_batch_ms：每批检测耗时的 p99（毫秒）
+    - peak_bytes_per_point：单批检测期间 tracemalloc 峰值内存 / 批大小（单独一轮测量，不计入耗时）
+
+结果可以保存为基线 JSON，之后与基线比较，吞吐下降或延迟上升超过容差时以非零状态码退出。
+
+运行：
+    python -m tsdetect.benchmarks.suite --points 100000 --series 1000 --save baseline.json
+    python -m tsdetect.benchmarks.suite --points 100000 --series 1000 --compare baseline.json
+"""
+
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+import warnings
+from collections.abc import Callable, Sequence
+from typing import Any
+
+from tsdetect.algorithms import (
+    ALGORITHM_REGISTRY,
+    AdvancedRingRatioAlgorithm,
+    AdvancedYearRoundAlgorithm,
+    AndThresholdAlgorithm,
+    MockSDKClient,
+    RingRatioAmplitudeAlgorithm,
+    SimpleIntelligentAlgorithm,
+    SimpleRingRatioAlgorithm,
+    SimpleYearRoundAlgorithm,
+    ThresholdAlgorithm,
+    YearRoundAmplitudeAlgorithm,
+)
+from tsdetect.benchmarks.workloads import SyntheticWorkload
+from tsdetect.core.algorithms import BaseAlgorithm
+from tsdetect.core.interfaces import IHistoryFetcher
+
+# 算法注册名称 -> 基准使用的算法工厂（参数为历史数据获取器）
+BENCHMARK_CASES: dict[str, Callable[[IHistoryFetcher], BaseAlgorithm]] = {
+    "Threshold": lambda fetcher: ThresholdAlgorithm(
+        config=[[{"method": "gte", "threshold": 250}], [{"method": "lt", "threshold": 20}]]
+    ),
+    "AndThreshold": lambda fetcher: AndThresholdAlgorithm(
+        config={"thresholds": [{"method": "gte", "threshold": 200}, {"method": "lt", "threshold": 1000}]}
+    ),
+    "SimpleRingRatio": lambda fetcher: SimpleRingRatioAlgorithm(
+        config={"floor": 50, "ceil": 100}, history_fetcher=fetcher
+    ),
+    "AdvancedRingRatio": lambda fetcher: AdvancedRingRatioAlgorithm(
+        config={"floor": 50, "ceil": 100, "floor_interval": 5, "ceil_interval": 5, "fetch_type": "avg"},
+        history_fetcher=fetcher,
+    ),
+    "SimpleYearRound": lambda fetcher: SimpleYearRoundAlgorithm(
+        config={"floor": 50, "ceil": 100}, history_fetcher=fetcher
+    ),
+    "AdvancedYearRound": lambda fetcher: AdvancedYearRoundAlgorithm(
+        config={"floor": 50, "ceil": 100, "floor_interval": 7, "ceil_interval": 7, "fetch_type": "avg"},
+        history_fetcher=fetcher,
+    ),
+    "RingRatioAmplitude": lambda fetcher: RingRatioAmplitudeAlgorithm(
+        config={"threshold": 50, "ratio": 1.5, "shock": 10}, history_fetcher=fetcher
+    ),
+    "YearRoundAmplitude": lambda fetcher: YearRoundAmplitudeAlgorithm(
+        config={"ratio": 1.5, "shock": 10, "days": 7, "method": "avg"}, history_fetcher=fetcher
+    ),
+    "IntelligentDetect": lambda fetcher: SimpleIntelligentAlgorithm(
+        config={"use_sdk": True, "args": {}}, history_fetcher=fetcher, sdk_client=MockSDKClient(anomaly_threshold=2.5)
+    ),
+}
+
+
+def _percentile(values: Sequence[float], q: float) -> float:
+    """最近秩法分位数"""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    rank = max(0, min(len(ordered) - 1, int(-(-q * len(ordered) // 1)) - 1))
+    return ordered[rank]
+
+
+def run_case(
+    name: str, workload: SyntheticWorkload, batch_size: int = 1000, measure_memory: bool = True
+) -> dict[str, Any]:
+    """
+    运行单个算法的基准
+
+    Args:
+        name: 算法注册名称（见 BENCHMARK_CASES）
+        workload: 合成负载
+        batch_size: 每批数据点数
+        measure_memory: 是否单独测量内存
+
+    Returns:
+        基准结果
+    """
+    algorithm = BENCHMARK_CASES[name](workload.history_fetcher())
+    batches = list(workload.batches(batch_size))
+
+    latencies = []
+    anomalies = 0
+    for batch in batches:
+        start = time.perf_counter()
+        anomalies += len(algorithm.detect_records(batch))
+        algorithm.release_records(batch)
+        latencies.append(time.perf_counter() - start)
+
+    elapsed = sum(latencies)
+    result = {
+        "points": len(workload),
+        "anomalies": anomalies,
+        "points_per_sec": len(workload) / elapsed if elapsed else 0.0,
+        "p99_batch_ms": _percentile(latencies, 0.99) * 1000,
+    }
+
+    if measure_memory:
+        # 使用新的算法实例，避免第一轮留下的缓存影响测量
+        algorithm = BENCHMARK_CASES[name](workload.history_fetcher())
+        batch = batches[0]
+        tracemalloc.start()
+        try:
+            algorithm.detect_records(batch)
+            algorithm.release_records(batch)
+            _current, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        result["peak_bytes_per_point"] = peak / len(batch)
+
+    return result
+
+
+def run_suite(
+    workload: SyntheticWorkload,
+    names: Sequence[str] | None = None,
+    batch_size: int = 1000,
+    measure_memory: bool = True,
+) -> dict[str, Any]:
+    """
+    运行基准套件
+
+    Args:
+        workload: 合成负载
+        names: 算法注册名称列表，默认为 ALGORITHM_REGISTRY 中有基准用例的全部算法
+        batch_size: 每批数据点数
+        measure_memory: 是否单独测量内存
+
+    Returns:
+        {"workload": 负载参数, "results": {算法名称: 基准结果}}
+    """
+    if names is None:
+        missing = [name for name in ALGORITHM_REGISTRY if name not in BENCHMARK_CASES]
+        if missing:
+            warnings.warn(f"no benchmark case for algorithms: {', '.join(missing)}", stacklevel=2)
+        names = [name for name in ALGORITHM_REGISTRY if name in BENCHMARK_CASES]
+
+    return {
+        "workload": {"points": workload.points, "series": workload.series, "batch_size": batch_size},
+        "results": {name: run_case(name, workload, batch_size, measure_memory) for name in names},
+    }
+
+
+def compare(baseline: dict[str, Any], current: dict[str, Any], tolerance: float = 0.2) -> list[str]:
+    """
+    与基线比较
+
+    Args:
+        baseline: 基线结果（run_suite 的返回值）
+        current: 本次结果
+        tolerance: 容差比例，吞吐下降或 p99 延迟上升超过该比例视为退化
+
+    Returns:
+        退化描述列表，为空表示没有退化
+    """
+    regressions = []
+    if baseline.get("workload") != current.get("workload"):
+        regressions.append(f"workload mismatch: baseline={baseline.get('workload')} current={current.get('workload')}")
+        return regressions
+
+    for name, result in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            continue
+        if result["points_per_sec"] < base["points_per_sec"] * (1 - tolerance):
+            regressions.append(
+                f"{name}: points_per_sec {result['points_per_sec']:.0f} < baseline {base['points_per_sec']:.0f}"
+            )
+        if result["p99_batch_ms"] > base["p99_batch_ms"] * (1 + tolerance):
+            regressions.append(
+                f"{name}: p99_batch_ms {result['p99_batch_ms']:.2f} > baseline {base['p99_batch_ms']:.2f}"
+            )
+    return regressions
+
+
+def format_report(report: dict[str, Any]) -> str:
+    """格式化基准结果"""
+    lines = [
+        f"points={report['workload']['points']} series={report['workload']['series']} "
+        f"batch_size={report['workload']['batch_size']}",
+        f"{'algorithm':<20}{'points/s':>12}{'p99 ms':>10}{'bytes/pt':>10}{'anomalies':>11}",
+    ]
+    for name, result in report["results"].items():
+        peak = result.get("peak_bytes_per_point")
+        lines.append(
+            f"{name:<20}{result['points_per_sec']:>12.0f}{result['p99_batch_ms']:>10.2f}"
+            f"{(f'{peak:.0f}' if peak is not None else '-'):>10}{result['anomalies']:>11}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--points", type=int, default=100000)
+    parser.add_argument("--series", type=int, default=1000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--algorithms", help="comma separated registry names, defaults to all")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    parser.add_argument("--save", help="write results to a baseline JSON file")
+    parser.add_argument("--compare", help="compare results with a baseline JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    names = args.algorithms.split(",") if args.algorithms else None
+    workload = SyntheticWorkload(points=args.points, series=args.series)
+    report = run_suite(workload, names, args.batch_size, measure_memory=not args.no_memory)
+    print(format_report(report))
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(json.load(f), report, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,165 @@
+"""
+合成检测负载
+
+按配置的基数生成多条带日周期的时间序列，以及可以回答任意历史偏移的内存历史数据获取器。
+同一 (序列, 时间戳) 的值是确定的，历史数据与检测数据来自同一生成函数。
+"""
+
+import math
+from collections.abc import Iterator, Sequence
+from typing import Any
+
+from tsdetect.core.base import CompactDataPoint
+from tsdetect.core.interfaces import IDataPoint, IHistoryFetcher
+
+ONE_DAY = 86400
+
+
+class SyntheticWorkload:
+    """
+    合成负载
+
+    每条序列：基线 + 日周期振幅 * sin(2π t / 1 天) + 确定性噪声，按 spike_rate 的比例插入突增。
+    数据点按时间戳递增、同一时间戳内按序列排列（与采集周期内批量到达的顺序一致）。
+
+    使用示例：
+        workload = SyntheticWorkload(points=100000, series=1000)
+        fetcher = workload.history_fetcher()
+        for batch in workload.batches(1000):
+            algorithm.detect_records(batch)
+    """
+
+    def __init__(
+        self,
+        points: int = 100000,
+        series: int = 1000,
+        interval: int = 60,
+        start: int = 8 * ONE_DAY,
+        seasonal_amplitude: float = 0.3,
+        noise: float = 0.05,
+        spike_rate: float = 0.01,
+    ):
+        """
+        初始化合成负载
+
+        Args:
+            points: 数据点总数
+            series: 序列数（维度组合数）
+            interval: 采集间隔（秒）
+            start: 第一个数据点的时间戳，默认留出 8 天历史供同比算法使用
+            seasonal_amplitude: 日周期振幅（相对基线）
+            noise: 噪声幅度（相对基线）
+            spike_rate: 突增比例
+        """
+        if points <= 0 or series <= 0:
+            raise ValueError("points and series must be positive")
+
+        self.points = points
+        self.series = min(series, points)
+        self.interval = interval
+        self.start = start - start % interval
+        self.seasonal_amplitude = seasonal_amplitude
+        self.noise = noise
+        self.spike_rate = spike_rate
+
+        self.dimensions: list[dict[str, Any]] = [
+            {"ip": f"10.{i // 65536 % 256}.{i // 256 % 256}.{i % 256}", "service": f"svc-{i % 50}"}
+            for i in range(self.series)
+        ]
+        self._series_index = {(dims["ip"], dims["service"]): i for i, dims in enumerate(self.dimensions)}
+
+    def value(self, series: int, timestamp: int) -> float:
+        """
+        序列在某个时间戳的值
+
+        Args:
+            series: 序列编号
+            timestamp: 时间戳
+
+        Returns:
+            数据值
+        """
+        base = 100.0 + series % 900
+        # 整数哈希作为确定性噪声，避免为每个点创建随机数生成器
+        h = (series * 1000003 + timestamp // self.interval) * 2654435761 % 4294967296 / 4294967296
+        value = base * (1 + self.seasonal_amplitude * math.sin(2 * math.pi * timestamp / ONE_DAY))
+        value += base * self.noise * (2 * h - 1)
+        if h < self.spike_rate:
+            value *= 3
+        return value
+
+    def series_of(self, dimensions: dict[str, Any]) -> int | None:
+        """根据维度查找序列编号"""
+        return self._series_index.get((dimensions.get("ip"), dimensions.get("service")))
+
+    def __iter__(self) -> Iterator[CompactDataPoint]:
+        for index in range(self.points):
+            step, series = divmod(index, self.series)
+            timestamp = self.start + step * self.interval
+            yield CompactDataPoint(
+                value=self.value(series, timestamp), timestamp=timestamp, dimensions=self.dimensions[series]
+            )
+
+    def __len__(self) -> int:
+        return self.points
+
+    def batches(self, batch_size: int) -> Iterator[list[CompactDataPoint]]:
+        """
+        按批产出数据点
+
+        Args:
+            batch_size: 每批数据点数
+
+        Returns:
+            数据点列表的迭代器
+        """
+        batch = []
+        for dp in self:
+            batch.append(dp)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def history_fetcher(self) -> "SyntheticHistoryFetcher":
+        """创建该负载的历史数据获取器"""
+        return SyntheticHistoryFetcher(self)
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} points={self.points} series={self.series} interval={self.interval}>"
+
+
+class SyntheticHistoryFetcher(IHistoryFetcher):
+    """
+    合成负载的内存历史数据获取器
+
+    历史值由负载的生成函数直接计算，不涉及 I/O，基准结果只反映检测本身的开销。
+    """
+
+    def __init__(self, workload: SyntheticWorkload):
+        self.workload = workload
+        # 统计信息
+        self.fetch_count = 0
+        self.batch_fetch_count = 0
+
+    def _history_point(self, data_point: IDataPoint, offset: int) -> IDataPoint | None:
+        series = self.workload.series_of(data_point.dimensions)
+        if series is None:
+            return None
+        timestamp = data_point.timestamp - offset
+        return CompactDataPoint(
+            value=self.workload.value(series, timestamp), timestamp=timestamp, dimensions=data_point.dimensions
+        )
+
+    def fetch(self, data_point: IDataPoint, offsets: Sequence[int]) -> list[IDataPoint | None]:
+        """获取单个数据点的历史数据"""
+        self.fetch_count += 1
+        return [self._history_point(data_point, offset) for offset in offsets]
+
+    def batch_fetch(
+        self, data_points: Sequence[IDataPoint], offsets: Sequence[int]
+    ) -> dict[str, list[IDataPoint | None]]:
+        """批量获取历史数据"""
+        self.batch_fetch_count += 1
+        return {dp.record_id: [self._history_point(dp, offset) for offset in offsets] for dp in data_points}
@@ -10,34 +10,75 @@ from tsdetect.core.algorithms import (
     ExpressionDetector,
     RangeRatioAlgorithm,
 )
-from tsdetect.core.base import BaseAnomalyPoint, BaseDataPoint, SimpleDataPoint
+from tsdetect.core.base import BaseAnomalyPoint, BaseDataPoint, CompactDataPoint, SimpleDataPoint, render_all
+from tsdetect.core.baseline import RollingBaseline
+from tsdetect.core.block import DataPointBlock, DataPointView
+from tsdetect.core.dimensions import (
+    DimensionKeyTable,
+    configure_dimension_table,
+    dimensions_digest,
+    get_dimension_table,
+)
 from tsdetect.core.exceptions import (
     DetectionError,
     InvalidAlgorithmConfigError,
     InvalidDataPointError,
     TsDetectError,
 )
+from tsdetect.core.history import MISSING, AsyncHistoryLoader, HistoryStore
 from tsdetect.core.interfaces import (
+    IAsyncHistoryFetcher,
     IDataPoint,
+    IDetectionObserver,
     IHistoryFetcher,
     ITemplateEngine,
     IUnitConverter,
 )
+from tsdetect.core.observer import InMemoryObserver, PhaseStats
+from tsdetect.core.planner import DetectionPlan, HistoryPlanner
+from tsdetect.core.ringbuffer import RingBufferHistoryStore
+from tsdetect.core.snapshot import HistorySnapshot, MmapHistoryFetcher, SnapshotWriter, write_snapshot
 
 __all__ = [
     # 基类
     "BaseDataPoint",
     "SimpleDataPoint",
+    "CompactDataPoint",
+    "DataPointBlock",
+    "DataPointView",
     "BaseAnomalyPoint",
+    "render_all",
     "BaseAlgorithm",
     "BaseAlgorithmCollection",
     "ExpressionDetector",
     "RangeRatioAlgorithm",
+    # 历史数据
+    "HistoryStore",
+    "MISSING",
+    "HistoryPlanner",
+    "DetectionPlan",
+    "RingBufferHistoryStore",
+    "HistorySnapshot",
+    "SnapshotWriter",
+    "MmapHistoryFetcher",
+    "write_snapshot",
+    "RollingBaseline",
+    "AsyncHistoryLoader",
+    # 维度摘要
+    "DimensionKeyTable",
+    "dimensions_digest",
+    "get_dimension_table",
+    "configure_dimension_table",
     # 接口
     "IDataPoint",
     "IHistoryFetcher",
+    "IAsyncHistoryFetcher",
     "ITemplateEngine",
     "IUnitConverter",
+    "IDetectionObserver",
+    # 检测观察者
+    "InMemoryObserver",
+    "PhaseStats",
     # 异常
     "TsDetectError",
     "InvalidAlgorithmConfigError",
@@ -6,30 +6,158 @@ TsDetect 算法基类
 
 import logging
 from abc import ABC, abstractmethod
-from collections.abc import Generator
+from collections.abc import Callable, Generator, Hashable, Iterator, Mapping, MutableMapping
+from functools import partial
+from time import perf_counter
 from typing import Any
 
-from tsdetect.core.base import BaseAnomalyPoint
-from tsdetect.core.exceptions import (
-    ExpressionError,
-)
+from tsdetect.core.base import BaseAnomalyPoint, CompactDataPoint
+from tsdetect.core.baseline import RollingBaseline
+from tsdetect.core.exceptions import InvalidAlgorithmConfigError
+from tsdetect.core.history import MISSING, AsyncHistoryLoader, HistoryStore
 from tsdetect.core.interfaces import (
+    IAsyncHistoryFetcher,
     IDataPoint,
+    IDetectionObserver,
     IHistoryFetcher,
     ITemplateEngine,
     IUnitConverter,
 )
+from tsdetect.core.observer import (
+    PHASE_EVALUATE,
+    PHASE_EXTRA_CONTEXT,
+    PHASE_FETCH_HISTORY,
+    PHASE_FORMAT_MESSAGE,
+    PHASE_GET_CONTEXT,
+)
+from tsdetect.utils.expression import CompiledExpression, compile_expression
+from tsdetect.utils.template import compile_format_template, get_template_cache
 
 logger = logging.getLogger(__name__)
 
 
-class DetectContext(dict):
+def _noop_convert_min(v, *args, **kwargs):
+    """默认的无操作单位转换"""
+    return v
+
+
+def _noop_auto_convert(v, u, d=2):
+    """默认的无操作自动单位转换"""
+    return v, u
+
+
+class DetectContext(MutableMapping):
     """
     检测上下文
 
-    支持属性访问的字典，用于表达式执行环境。
+    惰性映射，用于表达式执行环境，支持属性访问。
+
+    变量有三种来源，按优先级：
+        1. 直接设置的值
+        2. 单变量解析函数（register），首次访问时计算并缓存
+        3. 变量组加载函数（register_group），访问到前两类之外的变量时才执行，
+           返回的变量不会覆盖前两类中的同名变量
+
+    一个上下文对应一个数据点的一次检测，所有计算结果在其生命周期内只计算一次。
     """
 
+    __slots__ = ("_values", "_resolvers", "_loaders")
+
+    def __init__(self, values: Mapping[str, Any] | None = None, resolvers: dict[str, Callable[[], Any]] | None = None):
+        """
+        初始化检测上下文
+
+        Args:
+            values: 已知变量
+            resolvers: 变量名 -> 无参解析函数
+        """
+        object.__setattr__(self, "_values", dict(values or {}))
+        object.__setattr__(self, "_resolvers", dict(resolvers or {}))
+        object.__setattr__(self, "_loaders", [])
+
+    def register(self, key: str, resolver: Callable[[], Any]):
+        """
+        注册单变量解析函数
+
+        Args:
+            key: 变量名
+            resolver: 无参解析函数
+        """
+        self._values.pop(key, None)
+        self._resolvers[key] = resolver
+
+    def register_group(self, loader: Callable[[], Mapping[str, Any]]):
+        """
+        注册变量组加载函数
+
+        Args:
+            loader: 无参加载函数，返回变量字典
+        """
+        self._loaders.append(loader)
+
+    def _load_groups(self) -> bool:
+        """执行所有待加载的变量组，返回是否有加载动作"""
+        if not self._loaders:
+            return False
+
+        loaders = list(self._loaders)
+        self._loaders.clear()
+        for loader in loaders:
+            for key, value in loader().items():
+                if key not in self._values and key not in self._resolvers:
+                    self._values[key] = value
+        return True
+
+    def materialize(self) -> dict[str, Any]:
+        """
+        计算所有变量
+
+        Returns:
+            包含全部变量的普通字典
+        """
+        self._load_groups()
+        for key in list(self._resolvers):
+            self[key]
+        return dict(self._values)
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return self._values[key]
+        except KeyError:
+            pass
+
+        resolver = self._resolvers.pop(key, None)
+        if resolver is not None:
+            value = self._values[key] = resolver()
+            return value
+
+        if self._load_groups():
+            return self[key]
+
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: Any):
+        self._resolvers.pop(key, None)
+        self._values[key] = value
+
+    def __delitem__(self, key: str):
+        if self._resolvers.pop(key, None) is None:
+            self._load_groups()
+            del self._values[key]
+        else:
+            self._values.pop(key, None)
+
+    def __contains__(self, key: object) -> bool:
+        if key in self._values or key in self._resolvers:
+            return True
+        return self._load_groups() and key in self._values
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.materialize())
+
+    def __len__(self) -> int:
+        return len(self.materialize())
+
     def __getattr__(self, name: str) -> Any:
         try:
             return self[name]
@@ -39,6 +167,9 @@ class DetectContext(dict):
     def __setattr__(self, name: str, value: Any):
         self[name] = value
 
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} resolved={list(self._values)} pending={list(self._resolvers)}>"
+
 
 class BaseAlgorithm(ABC):
     """
@@ -53,12 +184,16 @@ class BaseAlgorithm(ABC):
     # 检测表达式
     expr: str = "None"
 
+    # 实例是否持有随批次变化的可变状态（历史存储、基线缓冲区等），有状态的实例不能在调用方之间共享
+    stateful: bool = False
+
     def __init__(
         self,
         config: dict[str, Any] | None = None,
         unit: str = "",
         unit_converter: IUnitConverter | None = None,
         template_engine: ITemplateEngine | None = None,
+        observer: IDetectionObserver | None = None,
         **kwargs,
     ):
         """
@@ -69,8 +204,10 @@ class BaseAlgorithm(ABC):
             unit: 单位前缀
             unit_converter: 单位转换器
             template_engine: 模板引擎
+            observer: 检测观察者，接收热路径各阶段的耗时，为空时不计时
             **kwargs: 额外参数
         """
+        self.set_observer(observer)
         self.config = config or {}
         self.unit = unit
         self.unit_converter = unit_converter
@@ -80,15 +217,23 @@ class BaseAlgorithm(ABC):
         # 验证配置
         self.validated_config = self._validate_config(self.config)
 
-        # 生成并编译表达式
+        # 生成并编译表达式（相同表达式在进程内只编译一次）
         self.expr = self.gen_expr()
         if self.expr and self.expr != "None":
-            try:
-                self._byte_code = compile(self.expr, "<string>", "eval")
-            except SyntaxError as e:
-                raise ExpressionError(f"Failed to compile expression: {e}", expression=self.expr) from None
+            self._compiled: CompiledExpression | None = compile_expression(self.expr)
         else:
-            self._byte_code = None
+            self._compiled = None
+
+    def set_observer(self, observer: IDetectionObserver | None, label: str | None = None):
+        """
+        设置检测观察者
+
+        Args:
+            observer: 检测观察者，None 表示关闭计时
+            label: 上报的算法名称，默认为算法类名
+        """
+        self.observer = observer
+        self.observer_label = label or self.__class__.__name__
 
     def _validate_config(self, config: dict[str, Any]) -> dict[str, Any]:
         """
@@ -123,20 +268,33 @@ class BaseAlgorithm(ABC):
         """
         构建检测上下文
 
+        上下文是惰性的：基础变量在首次访问时读取，extra_context 只在访问到
+        基础变量之外的变量时才执行，且同一个上下文内只执行一次。
+
         Args:
             data_point: 数据点
 
         Returns:
             检测上下文
         """
-        context = DetectContext()
-
-        # 基础属性
-        context["data_point"] = data_point
-        context["value"] = data_point.value
-        context["timestamp"] = data_point.timestamp
-        context["unit"] = data_point.unit
-        context["dimensions"] = data_point.dimensions
+        observer = self.observer
+        if observer is not None:
+            start = perf_counter()
+
+        context = DetectContext(
+            {
+                "data_point": data_point,
+                # 算法单位
+                "algorithm_unit": self.unit,
+            },
+            # 数据点属性按需读取
+            resolvers={
+                "value": partial(getattr, data_point, "value"),
+                "timestamp": partial(getattr, data_point, "timestamp"),
+                "unit": partial(getattr, data_point, "unit"),
+                "dimensions": partial(getattr, data_point, "dimensions"),
+            },
+        )
 
         # 单位转换函数
         if self.unit_converter:
@@ -144,18 +302,26 @@ class BaseAlgorithm(ABC):
             context["unit_auto_convert"] = self.unit_converter.auto_convert
         else:
             # 默认的无操作转换
-            context["unit_convert_min"] = lambda v, *args, **kwargs: v
-            context["unit_auto_convert"] = lambda v, u, d=2: (v, u)
-
-        # 算法单位
-        context["algorithm_unit"] = self.unit
+            context["unit_convert_min"] = _noop_convert_min
+            context["unit_auto_convert"] = _noop_auto_convert
 
-        # 添加额外上下文
-        extra = self.extra_context(data_point)
-        context.update(extra)
+        # 额外上下文（如历史数据）只在表达式引用到时才计算
+        if observer is None:
+            context.register_group(partial(self.extra_context, data_point))
+        else:
+            context.register_group(partial(self._observed_extra_context, data_point))
+            observer.record(self.observer_label, PHASE_GET_CONTEXT, perf_counter() - start)
 
         return context
 
+    def _observed_extra_context(self, data_point: IDataPoint) -> dict[str, Any]:
+        """计时的 extra_context"""
+        start = perf_counter()
+        try:
+            return self.extra_context(data_point)
+        finally:
+            self.observer.record(self.observer_label, PHASE_EXTRA_CONTEXT, perf_counter() - start)
+
     def extra_context(self, data_point: IDataPoint) -> dict[str, Any]:
         """
         额外上下文
@@ -170,43 +336,74 @@ class BaseAlgorithm(ABC):
         """
         return {}
 
-    def _detect(self, data_point: IDataPoint) -> bool:
+    def plan_context_key(self) -> Hashable | None:
+        """
+        共享检测上下文的键
+
+        DetectionPlan 中键相同的算法共用一个检测上下文求值检测表达式，
+        键需要保证表达式引用的变量（包括历史基准值）对同一数据点取值相同；
+        阈值等直接写入表达式的参数不需要包含在键中。
+
+        Returns:
+            可哈希的键，None 表示不与其他算法共享上下文
+        """
+        return None
+
+    def _detect(self, data_point: IDataPoint, context: DetectContext | None = None) -> bool:
         """
         执行检测
 
         Args:
             data_point: 数据点
+            context: 检测上下文，为空时根据数据点构建
 
         Returns:
             是否异常
         """
-        if self._byte_code is None:
+        if self._compiled is None:
             return False
 
-        context = self.get_context(data_point)
+        if context is None:
+            context = self.get_context(data_point)
 
+        observer = self.observer
         try:
-            result = eval(self._byte_code, {"__builtins__": {}}, context)
-            return bool(result)
+            if observer is None:
+                return bool(self._compiled.evaluate(context))
+
+            # 求值耗时包含表达式引用的惰性变量（如 extra_context）
+            start = perf_counter()
+            try:
+                return bool(self._compiled.evaluate(context))
+            finally:
+                observer.record(self.observer_label, PHASE_EVALUATE, perf_counter() - start)
         except Exception as e:
             logger.warning(f"Expression evaluation failed: {e}, expr={self.expr}, record_id={data_point.record_id}")
             return False
 
-    def detect(self, data_point: IDataPoint) -> list[BaseAnomalyPoint]:
+    def detect(self, data_point: IDataPoint, context: DetectContext | None = None) -> list[BaseAnomalyPoint]:
         """
         检测数据点
 
         Args:
             data_point: 数据点
+            context: 检测上下文，为空时根据数据点构建
 
         Returns:
             异常数据点列表（空列表表示正常）
         """
-        if not self._detect(data_point):
+        if self._compiled is None:
+            return []
+
+        # 检测、生成异常点和格式化消息共用同一个上下文
+        if context is None:
+            context = self.get_context(data_point)
+
+        if not self._detect(data_point, context):
             return []
 
         # 生成异常点
-        anomaly = self._create_anomaly_point(data_point)
+        anomaly = self._create_anomaly_point(data_point, context)
         return [anomaly]
 
     def detect_records(self, data_points: list[IDataPoint], level: int = 1) -> list[BaseAnomalyPoint]:
@@ -220,6 +417,8 @@ class BaseAlgorithm(ABC):
         Returns:
             异常数据点列表
         """
+        self.prepare_records(data_points)
+
         anomalies = []
         for dp in data_points:
             result = self.detect(dp)
@@ -228,51 +427,116 @@ class BaseAlgorithm(ABC):
                 anomalies.append(anomaly)
         return anomalies
 
-    def _create_anomaly_point(self, data_point: IDataPoint) -> BaseAnomalyPoint:
+    async def adetect_records(self, data_points: list[IDataPoint], level: int = 1) -> list[BaseAnomalyPoint]:
+        """
+        异步批量检测
+
+        预加载阶段（如历史数据查询）异步并发执行，检测阶段与 detect_records 一致。
+
+        Args:
+            data_points: 数据点列表
+            level: 告警级别
+
+        Returns:
+            异常数据点列表
+        """
+        await self.aprepare_records(data_points)
+        return self.detect_records(data_points, level=level)
+
+    async def aprepare_records(self, data_points: list[IDataPoint]):
+        """
+        异步预加载
+
+        默认直接调用 prepare_records，支持异步 I/O 的子类可以重写此方法。
+
+        Args:
+            data_points: 即将检测的数据点列表
+        """
+        self.prepare_records(data_points)
+
+    def prepare_records(self, data_points: list[IDataPoint]):
+        """
+        批量检测前的预加载
+
+        子类可以重写此方法批量准备检测所需的数据（如历史数据、SDK 结果）。
+
+        Args:
+            data_points: 即将检测的数据点列表
+        """
+        return None
+
+    def release_records(self, data_points: list[IDataPoint]):
+        """
+        释放批量检测的预加载数据
+
+        流式检测在每个窗口结束后调用，保证内存占用不随输入增长。
+
+        Args:
+            data_points: 已检测完成的数据点列表
+        """
+        return None
+
+    def _create_anomaly_point(self, data_point: IDataPoint, context: DetectContext | None = None) -> BaseAnomalyPoint:
         """
         创建异常数据点
 
         Args:
             data_point: 数据点
+            context: 检测时使用的上下文，为空时重新构建
 
         Returns:
             异常数据点
         """
-        message = self._format_message(data_point)
-        context = self.get_context(data_point)
+        if context is None:
+            context = self.get_context(data_point)
 
+        # 消息和上下文快照在首次访问时才生成
         return BaseAnomalyPoint(
             data_point=data_point,
             detector=self,
-            anomaly_message=message,
-            context=dict(context),
+            anomaly_message=None,
+            context=context,
         )
 
-    def _format_message(self, data_point: IDataPoint) -> str:
+    def _format_message(self, data_point: IDataPoint, context: DetectContext | None = None) -> str:
         """
         格式化异常消息
 
         Args:
             data_point: 数据点
+            context: 检测时使用的上下文，为空时重新构建
 
         Returns:
             异常消息字符串
         """
+        observer = self.observer
+        if observer is None:
+            return self._render_message(data_point, context)
+
+        start = perf_counter()
+        try:
+            return self._render_message(data_point, context)
+        finally:
+            observer.record(self.observer_label, PHASE_FORMAT_MESSAGE, perf_counter() - start)
+
+    def _render_message(self, data_point: IDataPoint, context: DetectContext | None = None) -> str:
+        """渲染异常消息"""
         if not self.desc_tpl:
             return f"Anomaly detected: value={data_point.value}"
 
-        context = self.get_context(data_point)
+        if context is None:
+            context = self.get_context(data_point)
 
-        # 使用模板引擎渲染
+        # 使用模板引擎渲染（模板按引擎编译一次）
         if self.template_engine:
             try:
-                return self.template_engine.render(self.desc_tpl, dict(context))
+                return get_template_cache().render(self.template_engine, self.desc_tpl, context)
             except Exception as e:
                 logger.warning(f"Template render failed: {e}")
 
-        # 回退到简单的字符串格式化
+        # 回退到 str.format，只读取模板引用的变量
         try:
-            return self.desc_tpl.format(**context)
+            return compile_format_template(self.desc_tpl).render(context)
         except Exception:
             return self.desc_tpl
 
@@ -328,6 +592,14 @@ class BaseAlgorithmCollection(BaseAlgorithm):
 
         # 生成检测器列表
         self.detectors = list(self._gen_detectors())
+        if self.observer is not None:
+            self.set_observer(self.observer, self.observer_label)
+
+    def set_observer(self, observer: IDetectionObserver | None, label: str | None = None):
+        """设置检测观察者，子检测器以集合的名称上报"""
+        super().set_observer(observer, label)
+        for detector in self.detectors:
+            detector.set_observer(observer, self.observer_label)
 
     def gen_expr(self) -> str:
         """生成组合表达式"""
@@ -352,14 +624,17 @@ class BaseAlgorithmCollection(BaseAlgorithm):
             template_engine=self.template_engine,
         )
 
-    def detect(self, data_point: IDataPoint) -> list[BaseAnomalyPoint]:
+    def detect(self, data_point: IDataPoint, context: DetectContext | None = None) -> list[BaseAnomalyPoint]:
         """
         检测数据点
 
-        根据 expr_op 组合多个检测器的结果。
+        根据 expr_op 组合多个检测器的结果。集合的检测上下文在一个数据点的检测过程中
+        只构建一次，子检测器求值、异常点创建、消息格式化和结果合并都共用它，
+        上下文中的变量（包括历史数据）对每个数据点只计算一次。
 
         Args:
             data_point: 数据点
+            context: 检测上下文，为空时根据数据点构建
 
         Returns:
             异常数据点列表
@@ -367,29 +642,39 @@ class BaseAlgorithmCollection(BaseAlgorithm):
         if not self.detectors:
             return []
 
+        if context is None:
+            context = self.get_context(data_point)
+
         all_anomalies = []
         triggered_detectors = []
 
         for detector in self.detectors:
-            anomalies = detector.detect(data_point)
+            anomalies = detector.detect(data_point, context)
             if anomalies:
                 all_anomalies.extend(anomalies)
                 triggered_detectors.append(detector)
+            elif self.expr_op == "and":
+                # 任一检测器未触发即可结束，后续检测器无需求值
+                return []
 
         # 根据 expr_op 判断是否返回异常
         if self.expr_op == "and":
             # 所有检测器都必须触发
             if len(triggered_detectors) == len(self.detectors):
-                return self._merge_anomalies(data_point, all_anomalies, triggered_detectors)
+                return self._merge_anomalies(data_point, all_anomalies, triggered_detectors, context)
         else:  # "or"
             # 任一检测器触发即可
             if triggered_detectors:
-                return self._merge_anomalies(data_point, all_anomalies, triggered_detectors)
+                return self._merge_anomalies(data_point, all_anomalies, triggered_detectors, context)
 
         return []
 
     def _merge_anomalies(
-        self, data_point: IDataPoint, anomalies: list[BaseAnomalyPoint], detectors: list[ExpressionDetector]
+        self,
+        data_point: IDataPoint,
+        anomalies: list[BaseAnomalyPoint],
+        detectors: list[ExpressionDetector],
+        context: DetectContext | None = None,
     ) -> list[BaseAnomalyPoint]:
         """
         合并异常结果
@@ -398,6 +683,7 @@ class BaseAlgorithmCollection(BaseAlgorithm):
             data_point: 数据点
             anomalies: 所有异常点
             detectors: 触发的检测器
+            context: 检测时使用的上下文，为空时重新构建
 
         Returns:
             合并后的异常点列表
@@ -406,16 +692,14 @@ class BaseAlgorithmCollection(BaseAlgorithm):
             return []
 
         # 创建主异常点
-        main_anomaly = self._create_anomaly_point(data_point)
+        main_anomaly = self._create_anomaly_point(data_point, context)
 
         # 添加子检测器
         for detector in detectors:
             main_anomaly.add_child_detector(detector)
 
-        # 合并消息
-        messages = [a.anomaly_message for a in anomalies if a.anomaly_message]
-        if messages:
-            main_anomaly.anomaly_message = "; ".join(messages)
+        # 合并消息（首次访问时拼接子异常点的消息）
+        main_anomaly.merged = anomalies
 
         return [main_anomaly]
 
@@ -436,11 +720,21 @@ class RangeRatioAlgorithm(BaseAlgorithmCollection):
     # 使用 or 逻辑（下降或上升任一触发）
     expr_op: str = "or"
 
+    # 影响历史基准值的配置项（不包括历史偏移量），用于共享检测上下文
+    history_context_params: tuple[str, ...] = ()
+
+    # 历史存储和增量基线按批次加载和释放
+    stateful: bool = True
+
     def __init__(
         self,
         config: dict[str, Any] | None = None,
         unit: str = "",
         history_fetcher: IHistoryFetcher | None = None,
+        history_store: HistoryStore | None = None,
+        async_history_fetcher: IAsyncHistoryFetcher | None = None,
+        fetch_concurrency: int = 8,
+        incremental_baseline: bool = False,
         **kwargs,
     ):
         """
@@ -450,13 +744,26 @@ class RangeRatioAlgorithm(BaseAlgorithmCollection):
             config: 算法配置
             unit: 单位前缀
             history_fetcher: 历史数据获取器
+            history_store: 历史数据存储，为空时创建独立存储（容量随批量大小扩大，保证能容纳一批的历史数据）
+            async_history_fetcher: 异步历史数据获取器，供 adetect_records 使用
+            fetch_concurrency: 异步查询的最大并发请求数
+            incremental_baseline: 是否使用增量基线（RollingBaseline）代替逐点获取历史数据
             **kwargs: 额外参数
         """
         self.history_fetcher = history_fetcher
-        self._history_cache: dict[str, list[IDataPoint | None]] = {}
+        self.history_store = history_store if history_store is not None else HistoryStore()
+        # 独立存储按批量大小扩容，调用方传入的存储保持其容量设置
+        self.reserve_history_store = history_store is None
+        self.async_history_loader = (
+            AsyncHistoryLoader(async_history_fetcher, concurrency=fetch_concurrency) if async_history_fetcher else None
+        )
 
         super().__init__(config=config, unit=unit, **kwargs)
 
+        # 历史偏移量只依赖配置，构造时计算一次
+        self.history_offsets: tuple[int, ...] = tuple(self.get_history_offsets())
+        self.rolling_baseline: RollingBaseline | None = self.create_rolling_baseline() if incremental_baseline else None
+
     @abstractmethod
     def get_history_offsets(self, **kwargs) -> list[int]:
         """
@@ -469,21 +776,158 @@ class RangeRatioAlgorithm(BaseAlgorithmCollection):
         """
         pass
 
+    def create_rolling_baseline(self) -> RollingBaseline:
+        """
+        创建增量基线
+
+        要求历史偏移量为 interval * 1 .. interval * N 的形式。
+
+        Returns:
+            增量基线引擎
+
+        Raises:
+            InvalidAlgorithmConfigError: 历史偏移量不是等间隔的周期
+        """
+        offsets = self.history_offsets
+        interval = offsets[0] if offsets else 0
+        if interval <= 0 or offsets != tuple(interval * i for i in range(1, len(offsets) + 1)):
+            raise InvalidAlgorithmConfigError(
+                f"{self.__class__.__name__} does not support incremental baseline",
+                errors={"incremental_baseline": "History offsets must be consecutive periods"},
+            )
+
+        lookback = len(offsets)
+        config = self.validated_config or {}
+        window_sizes = {lookback, config.get("floor_interval", lookback), config.get("ceil_interval", lookback)}
+        return RollingBaseline(interval=interval, lookback=lookback, window_sizes=window_sizes)
+
+    def baseline_history_values(
+        self, data_point: IDataPoint, fetch_type: str, floor_interval: int, ceil_interval: int
+    ) -> tuple[float | None, float | None] | None:
+        """
+        从增量基线获取下降/上升对比的历史基准值
+
+        只读取基线，当前数据点在检测完成后（detect）或预加载时（warm_start_baseline）记录。
+
+        与逐个偏移量获取历史数据的结果一致：avg 为前 N 个存在的历史值的平均值，last 为最近的历史值。
+
+        Args:
+            data_point: 当前数据点
+            fetch_type: 取值方式（"avg" 或 "last"）
+            floor_interval: 下降对比周期数
+            ceil_interval: 上升对比周期数
+
+        Returns:
+            (下降基准值, 上升基准值)，未启用增量基线或基线无法覆盖该数据点时返回 None
+        """
+        baseline = self.rolling_baseline
+        if baseline is None or not baseline.covers(data_point):
+            return None
+
+        if fetch_type == "avg":
+            values = baseline.mean(data_point, floor_interval), baseline.mean(data_point, ceil_interval)
+        else:
+            last = baseline.last(data_point)
+            values = last, last
+        return values
+
+    def detect(self, data_point: IDataPoint, context: DetectContext | None = None) -> list[BaseAnomalyPoint]:
+        """
+        检测数据点
+
+        启用增量基线时，检测完成后把数据点记录为后续数据点的历史数据（基线已覆盖该序列时）。
+
+        Args:
+            data_point: 数据点
+            context: 检测上下文，为空时根据数据点构建
+
+        Returns:
+            异常数据点列表
+        """
+        anomalies = super().detect(data_point, context)
+        baseline = self.rolling_baseline
+        if baseline is not None and baseline.covers(data_point):
+            baseline.observe(data_point)
+        return anomalies
+
+    def warm_start_baseline(self, data_points: list[IDataPoint]):
+        """
+        预热增量基线并记录本批数据点
+
+        基线尚未覆盖的序列只对其最早的数据点批量获取一次历史数据。
+
+        Args:
+            data_points: 数据点列表
+        """
+        baseline = self.rolling_baseline
+        points = self._baseline_pending_points(data_points)
+        if points:
+            self.query_history_points(points)
+            for dp in points:
+                history = [self.fetch_history_point(dp, offset) for offset in self.history_offsets]
+                baseline.warm_start(dp, [hp.value if hp is not None else None for hp in history])
+
+        # 本批数据点互为历史数据，提前记录后检测顺序不影响结果
+        for dp in data_points:
+            baseline.observe(dp)
+
+    def _baseline_pending_points(self, data_points: list[IDataPoint]) -> list[IDataPoint]:
+        """增量基线尚未覆盖的序列中，每条序列最早的数据点"""
+        baseline = self.rolling_baseline
+        earliest: dict[tuple[str, int], IDataPoint] = {}
+        for dp in data_points:
+            if baseline.covers(dp):
+                continue
+            key = baseline.series_key(dp)
+            current = earliest.get(key)
+            if current is None or dp.timestamp < current.timestamp:
+                earliest[key] = dp
+        return list(earliest.values())
+
     def query_history_points(self, data_points: list[IDataPoint]):
         """
         批量查询历史数据
 
+        历史存储中已有全部偏移的数据点（如已由 HistoryPlanner 预取）不会重复查询。
+
         Args:
             data_points: 数据点列表
         """
-        if not self.history_fetcher:
+        if self.history_fetcher is None or not self.history_offsets:
             return
 
-        offsets = self.get_history_offsets()
+        offsets = list(self.history_offsets)
+        store = self.history_store
+        self._reserve_history(data_points)
+        pending = [dp for dp in data_points if any(store.get(dp.record_id, o) is MISSING for o in offsets)]
+        if not pending:
+            return
 
         # 使用批量接口获取历史数据
-        history_data = self.history_fetcher.batch_fetch(data_points, offsets)
-        self._history_cache.update(history_data)
+        history_data = self.history_fetcher.batch_fetch(pending, offsets)
+        store.update(history_data, offsets)
+
+    def _reserve_history(self, data_points: list[IDataPoint]):
+        """扩大独立历史存储的容量，保证能容纳本批数据点的全部历史数据"""
+        if self.reserve_history_store:
+            self.history_store.reserve(len(data_points) * len(self.history_offsets))
+
+    async def aquery_history_points(self, data_points: list[IDataPoint]):
+        """
+        异步批量查询历史数据
+
+        各偏移量的查询并发执行，进行中的相同查询不会重复发起。
+        未设置异步获取器时退化为同步查询。
+
+        Args:
+            data_points: 数据点列表
+        """
+        if self.async_history_loader is None:
+            self.query_history_points(data_points)
+            return
+
+        self._reserve_history(data_points)
+        await self.async_history_loader.load(self.history_store, data_points, self.history_offsets)
 
     def fetch_history_point(self, data_point: IDataPoint, offset: int) -> IDataPoint | None:
         """
@@ -496,23 +940,42 @@ class RangeRatioAlgorithm(BaseAlgorithmCollection):
         Returns:
             历史数据点，不存在返回 None
         """
+        observer = self.observer
+        if observer is not None:
+            start = perf_counter()
         record_id = data_point.record_id
-
-        # 先从缓存获取
-        if record_id in self._history_cache:
-            offsets = self.get_history_offsets()
-            if offset in offsets:
-                idx = offsets.index(offset)
-                cached = self._history_cache[record_id]
-                if idx < len(cached):
-                    return cached[idx]
-
-        # 缓存未命中，单独获取
-        if self.history_fetcher:
-            results = self.history_fetcher.fetch(data_point, [offset])
-            return results[0] if results else None
-
-        return None
+        point = MISSING
+
+        # 增量基线可以回答时直接使用
+        baseline = self.rolling_baseline
+        if baseline is not None and offset % baseline.interval == 0:
+            value = baseline.value_at(data_point, offset // baseline.interval)
+            if value is not MISSING:
+                point = None
+                if value is not None:
+                    point = CompactDataPoint(
+                        value=value,
+                        timestamp=data_point.timestamp - offset,
+                        unit=data_point.unit,
+                        dimensions=data_point.dimensions,
+                    )
+
+        # 再从缓存获取
+        if point is MISSING:
+            point = self.history_store.get(record_id, offset)
+
+        hit = point is not MISSING
+        if not hit:
+            point = None
+            # 缓存未命中，单独获取并写入缓存
+            if self.history_fetcher is not None:
+                results = self.history_fetcher.fetch(data_point, [offset])
+                point = results[0] if results else None
+                self.history_store.put(record_id, offset, point)
+
+        if observer is not None:
+            observer.record(self.observer_label, PHASE_FETCH_HISTORY, perf_counter() - start, "hit" if hit else "miss")
+        return point
 
     def history_point_fetcher(self, data_point: IDataPoint, **kwargs) -> IDataPoint | None:
         """
@@ -527,7 +990,7 @@ class RangeRatioAlgorithm(BaseAlgorithmCollection):
         Returns:
             历史数据点
         """
-        offsets = self.get_history_offsets(**kwargs)
+        offsets = self.get_history_offsets(**kwargs) if kwargs else self.history_offsets
         if offsets:
             return self.fetch_history_point(data_point, offsets[0])
         return None
@@ -556,19 +1019,63 @@ class RangeRatioAlgorithm(BaseAlgorithmCollection):
 
         return context
 
-    def detect_records(self, data_points: list[IDataPoint], level: int = 1) -> list[BaseAnomalyPoint]:
+    def plan_context_key(self) -> Hashable | None:
+        """
+        共享检测上下文的键
+
+        历史数据来源、历史偏移量和 history_context_params 相同的同类算法，历史基准值相同；
+        增量基线在计算基准值时会记录数据点，不参与共享。
         """
-        批量检测（带历史数据预加载）
+        if self.rolling_baseline is not None:
+            return None
+        config = self.validated_config or {}
+        return (
+            self.__class__,
+            self.unit,
+            self.unit_converter,
+            self.history_fetcher,
+            self.history_store,
+            self.history_offsets,
+            tuple(config.get(param) for param in self.history_context_params),
+        )
+
+    def prepare_history(self, data_points: list[IDataPoint]):
+        """
+        预加载历史数据（或预热增量基线）
 
         Args:
-            data_points: 数据点列表
-            level: 告警级别
+            data_points: 即将检测的数据点列表
+        """
+        if self.rolling_baseline is not None:
+            self.warm_start_baseline(data_points)
+        else:
+            self.query_history_points(data_points)
 
-        Returns:
-            异常数据点列表
+    async def aprepare_history(self, data_points: list[IDataPoint]):
         """
-        # 预加载历史数据
-        self.query_history_points(data_points)
+        异步预加载历史数据
 
-        # 执行检测
-        return super().detect_records(data_points, level)
+        Args:
+            data_points: 即将检测的数据点列表
+        """
+        if self.rolling_baseline is not None:
+            await self.aquery_history_points(self._baseline_pending_points(data_points))
+        else:
+            await self.aquery_history_points(data_points)
+        # 历史数据已在存储中，不会再次查询
+        self.prepare_history(data_points)
+
+    def prepare_records(self, data_points: list[IDataPoint]):
+        """预加载历史数据"""
+        super().prepare_records(data_points)
+        self.prepare_history(data_points)
+
+    async def aprepare_records(self, data_points: list[IDataPoint]):
+        """异步预加载历史数据"""
+        await self.aprepare_history(data_points)
+
+    def release_records(self, data_points: list[IDataPoint]):
+        """释放预加载的历史数据"""
+        super().release_records(data_points)
+        for dp in data_points:
+            self.history_store.discard(dp.record_id, self.history_offsets)
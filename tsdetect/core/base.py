@@ -4,11 +4,12 @@ TsDetect 数据点基类
 定义了数据点和异常数据点的基类实现。
 """
 
-import hashlib
-import json
-from datetime import datetime
+import time
+from collections.abc import Iterable, Mapping
+from datetime import datetime, timezone
 from typing import TYPE_CHECKING, Any
 
+from tsdetect.core.dimensions import dimensions_digest
 from tsdetect.core.exceptions import InvalidDataPointError
 from tsdetect.core.interfaces import IDataPoint
 
@@ -50,6 +51,9 @@ class BaseDataPoint(IDataPoint):
         # 验证必需字段
         self._validate()
 
+        # record_id 在构造时计算一次，维度/时间戳变更时失效
+        self._record_id = self._make_record_id()
+
     def _validate(self):
         """验证数据点必需字段"""
         for field in self.context_fields:
@@ -81,6 +85,7 @@ class BaseDataPoint(IDataPoint):
     @timestamp.setter
     def timestamp(self, val):
         self._timestamp = val
+        self._record_id = None
 
     @property
     def time(self) -> int:
@@ -90,6 +95,7 @@ class BaseDataPoint(IDataPoint):
     @time.setter
     def time(self, val):
         self._timestamp = val
+        self._record_id = None
 
     @property
     def unit(self) -> str:
@@ -102,12 +108,21 @@ class BaseDataPoint(IDataPoint):
 
     @property
     def dimensions(self) -> dict[str, Any]:
-        """获取维度信息"""
-        return getattr(self, "_dimensions", {}) or self._raw_data.get("dimensions", {})
+        """
+        获取维度信息
+
+        赋值时会复制传入的字典，调用方之后修改原字典不会影响数据点。
+        不支持原地修改返回的字典（record_id 不会随之更新），需要变更维度时请整体重新赋值。
+        """
+        dimensions = getattr(self, "_dimensions", None)
+        if dimensions is None:
+            return self._raw_data.get("dimensions", {})
+        return dimensions
 
     @dimensions.setter
     def dimensions(self, val):
-        self._dimensions = val
+        self._dimensions = dict(val) if val is not None else None
+        self._record_id = None
 
     @property
     def values(self) -> dict[str, Any]:
@@ -118,22 +133,28 @@ class BaseDataPoint(IDataPoint):
     def values(self, val):
         self._values = val
 
+    def _make_record_id(self) -> str:
+        """生成记录唯一标识（优先使用预设的 record_id）"""
+        preset_id = self._raw_data.get("record_id")
+        if preset_id:
+            return preset_id
+        return f"{dimensions_digest(self.dimensions)}.{self.timestamp}"
+
     @property
     def record_id(self) -> str:
         """
         获取记录唯一标识
 
-        格式：{dimensions_md5}.{timestamp}
+        格式：{dimensions_digest}.{timestamp}，构造时计算并缓存
         """
-        # 优先使用预设的 record_id
-        preset_id = self._raw_data.get("record_id")
-        if preset_id:
-            return preset_id
+        record_id = getattr(self, "_record_id", None)
+        if record_id is None:
+            record_id = self._record_id = self._make_record_id()
+        return record_id
 
-        # 生成 record_id
-        dims_str = json.dumps(self.dimensions, sort_keys=True)
-        dims_hash = hashlib.md5(dims_str.encode()).hexdigest()
-        return f"{dims_hash}.{self.timestamp}"
+    @record_id.setter
+    def record_id(self, val):
+        self._record_id = val
 
     def as_dict(self) -> dict[str, Any]:
         """转换为字典"""
@@ -197,20 +218,139 @@ class SimpleDataPoint(BaseDataPoint):
         super().__init__(data, **kwargs)
 
 
+class CompactDataPoint(IDataPoint):
+    """
+    紧凑数据点
+
+    使用 __slots__ 保存检测所需的字段，没有实例字典，
+    value/timestamp/unit/dimensions 为直接的槽位访问。
+    适用于大批量数据点的场景，构造后不应再修改。
+    """
+
+    __slots__ = ("value", "timestamp", "unit", "dimensions", "_values", "_record_id")
+
+    def __init__(
+        self,
+        value: float,
+        timestamp: int,
+        unit: str = "",
+        dimensions: dict[str, Any] | None = None,
+        values: dict[str, Any] | None = None,
+        record_id: str | None = None,
+    ):
+        """
+        初始化紧凑数据点
+
+        Args:
+            value: 数据值
+            timestamp: 时间戳（秒）
+            unit: 单位
+            dimensions: 维度信息
+            values: 其他指标值（如智能检测结果）
+            record_id: 预设的记录唯一标识
+        """
+        self.value = float(value)
+        self.timestamp = int(timestamp)
+        self.unit = unit or ""
+        self.dimensions = dimensions if dimensions is not None else {}
+        self._values = values
+        self._record_id = record_id or f"{dimensions_digest(self.dimensions)}.{self.timestamp}"
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "CompactDataPoint":
+        """
+        从原始字典创建数据点
+
+        字段含义与 BaseDataPoint 一致。
+
+        Args:
+            data: 数据字典，必须包含 value 和 timestamp（或 time）
+
+        Returns:
+            紧凑数据点
+
+        Raises:
+            InvalidDataPointError: 缺少必需字段
+        """
+        value = data.get("value")
+        if value is None:
+            raise InvalidDataPointError("DataPoint missing required field: value", field="value")
+
+        ts = data.get("timestamp")
+        if ts is None:
+            ts = data.get("time")
+        if ts is None:
+            raise InvalidDataPointError("DataPoint missing required field: timestamp", field="timestamp")
+
+        return cls(
+            value=value,
+            timestamp=ts,
+            unit=data.get("unit", ""),
+            dimensions=data.get("dimensions"),
+            values=data.get("values"),
+            record_id=data.get("record_id"),
+        )
+
+    @property
+    def time(self) -> int:
+        """时间戳别名"""
+        return self.timestamp
+
+    @property
+    def values(self) -> dict[str, Any]:
+        """获取所有指标值"""
+        return self._values if self._values is not None else {}
+
+    @property
+    def record_id(self) -> str:
+        """
+        获取记录唯一标识
+
+        格式：{dimensions_digest}.{timestamp}，构造时计算
+        """
+        return self._record_id
+
+    def as_dict(self) -> dict[str, Any]:
+        """转换为字典"""
+        data = {
+            "value": self.value,
+            "timestamp": self.timestamp,
+            "unit": self.unit,
+            "dimensions": self.dimensions,
+        }
+        if self._values is not None:
+            data["values"] = self._values
+        return data
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """获取属性值"""
+        return getattr(self, key, default)
+
+    def __str__(self) -> str:
+        return f"{self.record_id}:{self.value}"
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} record_id={self.record_id} value={self.value}>"
+
+
 class BaseAnomalyPoint:
     """
     异常数据点基类
 
     包含检测到的异常信息。
+
+    异常消息、异常时间字符串和上下文快照都在首次访问（或 as_dict）时才生成，
+    大部分在下游被抑制的异常点不会产生渲染和复制的开销。
     """
 
     def __init__(
         self,
         data_point: IDataPoint,
         detector: "BaseAlgorithm",
-        anomaly_message: str = "",
+        anomaly_message: str | None = "",
         anomaly_id: str = "",
-        context: dict[str, Any] | None = None,
+        context: Mapping[str, Any] | None = None,
+        merged: list["BaseAnomalyPoint"] | None = None,
     ):
         """
         初始化异常数据点
@@ -218,19 +358,69 @@ class BaseAnomalyPoint:
         Args:
             data_point: 原始数据点
             detector: 检测到异常的算法对象
-            anomaly_message: 异常描述信息
+            anomaly_message: 异常描述信息，None 表示首次访问时由 detector 渲染
             anomaly_id: 异常唯一标识
-            context: 检测上下文
+            context: 检测上下文（惰性上下文在首次访问 context 时才复制为快照）
+            merged: 被合并的子异常点，异常消息为子异常点消息的拼接
         """
         self.data_point = data_point
         self.detector = detector
-        self.anomaly_message = anomaly_message
+        self._anomaly_message = anomaly_message
         self.anomaly_id = anomaly_id or self._generate_anomaly_id()
-        self.anomaly_time = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
-        self.context = context or {}
+        self._created_at = time.time()
+        self._anomaly_time: str | None = None
+        self._detect_context = context
+        self._context: dict[str, Any] | None = None
+        self.merged = merged
         self.child_detectors: list[BaseAlgorithm] = []
         self.strategy_snapshot_key = ""
 
+    @property
+    def anomaly_message(self) -> str:
+        """异常描述信息（首次访问时渲染）"""
+        if self._anomaly_message is None:
+            self._anomaly_message = self._render_message()
+        return self._anomaly_message
+
+    @anomaly_message.setter
+    def anomaly_message(self, message: str):
+        self._anomaly_message = message
+
+    def _render_message(self) -> str:
+        if self.merged:
+            messages = [a.anomaly_message for a in self.merged if a.anomaly_message]
+            if messages:
+                return "; ".join(messages)
+        return self.detector._format_message(self.data_point, self._detect_context)
+
+    @property
+    def message_rendered(self) -> bool:
+        """异常消息是否已经生成"""
+        return self._anomaly_message is not None
+
+    @property
+    def anomaly_time(self) -> str:
+        """异常产生时间（UTC，首次访问时格式化）"""
+        if self._anomaly_time is None:
+            created = datetime.fromtimestamp(self._created_at, tz=timezone.utc)
+            self._anomaly_time = created.strftime("%Y-%m-%d %H:%M:%S")
+        return self._anomaly_time
+
+    @anomaly_time.setter
+    def anomaly_time(self, value: str):
+        self._anomaly_time = value
+
+    @property
+    def context(self) -> dict[str, Any]:
+        """检测上下文快照（首次访问时复制）"""
+        if self._context is None:
+            self._context = dict(self._detect_context) if self._detect_context is not None else {}
+        return self._context
+
+    @context.setter
+    def context(self, value: dict[str, Any] | None):
+        self._context = value if value is not None else {}
+
     def _generate_anomaly_id(self) -> str:
         """
         生成异常唯一标识
@@ -282,3 +472,19 @@ class BaseAnomalyPoint:
 
     def __repr__(self) -> str:
         return f"<{self.__class__.__name__} id={self.anomaly_id}>"
+
+
+def render_all(anomalies: Iterable[BaseAnomalyPoint]) -> list[str]:
+    """
+    批量渲染异常消息
+
+    模板通过进程级模板缓存渲染，每个模板在每个模板引擎上只编译一次；
+    合并的异常点在其子异常点渲染完成后拼接。
+
+    Args:
+        anomalies: 异常点列表
+
+    Returns:
+        与输入顺序对应的异常消息列表
+    """
+    return [anomaly.anomaly_message for anomaly in anomalies]
@@ -0,0 +1,343 @@
+"""
+TsDetect 增量基线
+
+为高级环比/同比算法维护每条序列最近 N 个周期的值，
+基线（前 k 个周期的平均值、最近值）随新数据点增量更新，无需每次重新获取历史数据。
+"""
+
+from collections import OrderedDict, deque
+from collections.abc import Sequence
+
+from tsdetect.core.dimensions import dimensions_digest
+from tsdetect.core.history import MISSING
+from tsdetect.core.interfaces import IDataPoint
+
+
+class RollingStats:
+    """
+    滑动窗口统计
+
+    维护窗口内值的和、个数和最大值（单调队列），值必须按时间槽递增的顺序进入窗口。
+    """
+
+    __slots__ = ("size", "sum", "count", "_max")
+
+    def __init__(self, size: int):
+        """
+        初始化滑动窗口统计
+
+        Args:
+            size: 窗口长度（时间槽数）
+        """
+        self.size = size
+        self.sum = 0.0
+        self.count = 0
+        self._max: deque[tuple[int, float]] = deque()
+
+    def push(self, slot: int, value: float):
+        """时间槽进入窗口"""
+        self.sum += value
+        self.count += 1
+        while self._max and self._max[-1][1] <= value:
+            self._max.pop()
+        self._max.append((slot, value))
+
+    def pop(self, slot: int, value: float):
+        """时间槽离开窗口"""
+        self.sum -= value
+        self.count -= 1
+        while self._max and self._max[0][0] <= slot:
+            self._max.popleft()
+
+    def reset(self):
+        """清空窗口"""
+        self.sum = 0.0
+        self.count = 0
+        self._max.clear()
+
+    @property
+    def mean(self) -> float | None:
+        """窗口内平均值"""
+        return self.sum / self.count if self.count else None
+
+    @property
+    def max(self) -> float | None:
+        """窗口内最大值"""
+        return self._max[0][1] if self._max else None
+
+
+class SeriesBuffer:
+    """
+    单条序列的环形缓冲区
+
+    按时间槽（timestamp // interval）保存值，并维护以 end 为右边界（不含）的滑动窗口统计。
+    start 之前的时间槽视为未知（既没有预热也没有观测到）。
+    """
+
+    __slots__ = ("capacity", "values", "slots", "start", "max_slot", "end", "windows", "_dirty", "_steps")
+
+    # 连续增量更新的次数上限，超过后重新计算窗口，避免浮点累计误差
+    max_incremental_steps = 1024
+
+    def __init__(self, capacity: int, start: int, window_sizes: Sequence[int]):
+        self.capacity = capacity
+        self.values: list[float] = [0.0] * capacity
+        self.slots: list[int | None] = [None] * capacity
+        self.start = start
+        self.max_slot = start - 1
+        self.end: int | None = None
+        self.windows = {size: RollingStats(size) for size in window_sizes}
+        self._dirty = False
+        self._steps = 0
+
+    def get(self, slot: int) -> float | None:
+        """获取时间槽的值，不存在返回 None"""
+        index = slot % self.capacity
+        return self.values[index] if self.slots[index] == slot else None
+
+    def put(self, slot: int, value: float):
+        """写入时间槽的值"""
+        index = slot % self.capacity
+        if self.slots[index] == slot and self.values[index] == value:
+            return
+
+        self.values[index] = value
+        self.slots[index] = slot
+        self.max_slot = max(self.max_slot, slot)
+        # 写入已在窗口中的时间槽（迟到数据、预热），下次查询时重算窗口
+        if self.end is not None and slot < self.end:
+            self._dirty = True
+
+    def advance(self, end: int):
+        """
+        将滑动窗口右边界移动到 end
+
+        顺序到达（end 比上次大 1）时增量更新，其余情况重新计算。
+        """
+        if end == self.end and not self._dirty:
+            return
+
+        incremental = self.end is not None and end == self.end + 1 and not self._dirty
+        if incremental and self._steps < self.max_incremental_steps:
+            self._steps += 1
+            entering = end - 1
+            entering_value = self.get(entering)
+            for size, stats in self.windows.items():
+                leaving = entering - size
+                leaving_value = self.get(leaving)
+                if leaving_value is not None:
+                    stats.pop(leaving, leaving_value)
+                if entering_value is not None:
+                    stats.push(entering, entering_value)
+        else:
+            self._steps = 0
+            for size, stats in self.windows.items():
+                stats.reset()
+                for slot in range(end - size, end):
+                    value = self.get(slot)
+                    if value is not None:
+                        stats.push(slot, value)
+
+        self.end = end
+        self._dirty = False
+
+
+class RollingBaseline:
+    """
+    增量基线引擎
+
+    每条序列（维度 + 时间相位 timestamp % interval）一个环形缓冲区，保存最近的周期值。
+    查询时间槽 s 的基线使用 s-1 ... s-lookback 的值，与偏移量 interval * i（i = 1..lookback）
+    的历史数据一一对应：
+        - mean(dp, k)：前 k 个存在的历史值的平均值，O(k)，按偏移量顺序累加缓冲区中的值
+        - last(dp)：最近一个存在的历史值
+        - window_max(dp, k)：前 k 个时间槽内的最大值，O(1)
+
+    只有当 s-lookback 之后的时间槽都已知（预热或观测过）时才能回答，否则返回 MISSING，
+    调用方应退回到历史数据获取器。数据点时间戳需要与 interval 对齐。
+
+    使用示例：
+        baseline = RollingBaseline(interval=60, lookback=5, window_sizes=(5,))
+        baseline.warm_start(dp, history_values)  # 与偏移量 60, 120, ... 300 对应
+        baseline.mean(dp, 5)
+        baseline.observe(dp)
+    """
+
+    def __init__(self, interval: int, lookback: int, window_sizes: Sequence[int] = (), max_series: int | None = 100000):
+        """
+        初始化增量基线引擎
+
+        Args:
+            interval: 周期长度（秒），环比为聚合间隔，同比为一天
+            lookback: 最多回看的周期数
+            window_sizes: 需要维护滑动窗口统计的窗口长度
+            max_series: 最多保存的序列数，超过时淘汰最久未使用的序列
+        """
+        if interval <= 0 or lookback <= 0:
+            raise ValueError("interval and lookback must be positive")
+
+        self.interval = interval
+        self.lookback = lookback
+        self.window_sizes = tuple(sorted({size for size in window_sizes if 0 < size <= lookback}))
+        self.max_series = max_series
+        # 容量留出 lookback 个时间槽的余量，允许一定程度的乱序
+        self.capacity = 2 * lookback + 2
+        self._series: OrderedDict[tuple[str, int], SeriesBuffer] = OrderedDict()
+
+    def series_key(self, data_point: IDataPoint) -> tuple[str, int]:
+        """序列键：维度摘要 + 时间相位"""
+        return dimensions_digest(data_point.dimensions), data_point.timestamp % self.interval
+
+    def _slot(self, data_point: IDataPoint) -> int:
+        return data_point.timestamp // self.interval
+
+    def _get_series(self, key: tuple[str, int], start: int) -> SeriesBuffer:
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = SeriesBuffer(self.capacity, start, self.window_sizes)
+            if self.max_series is not None and len(self._series) > self.max_series:
+                self._series.popitem(last=False)
+        else:
+            self._series.move_to_end(key)
+        return series
+
+    def _window(self, data_point: IDataPoint) -> tuple[SeriesBuffer, int] | None:
+        """获取可以回答该数据点的序列缓冲区，不能回答时返回 None"""
+        series = self._series.get(self.series_key(data_point))
+        if series is None:
+            return None
+
+        slot = self._slot(data_point)
+        first = slot - self.lookback
+        # 窗口增量移动时离开窗口的时间槽（first - 1）也必须仍在缓冲区中
+        if first < series.start or first - 1 <= series.max_slot - self.capacity:
+            return None
+
+        series.advance(slot)
+        return series, slot
+
+    def covers(self, data_point: IDataPoint) -> bool:
+        """是否可以回答该数据点的基线"""
+        return self._window(data_point) is not None
+
+    def warm_start(self, data_point: IDataPoint, history_values: Sequence[float | None]):
+        """
+        使用一次批量获取的历史数据预热序列
+
+        Args:
+            data_point: 序列中最早需要检测的数据点
+            history_values: 偏移量 interval * 1 .. interval * lookback 对应的历史值，不存在为 None
+        """
+        slot = self._slot(data_point)
+        start = slot - self.lookback
+        key = self.series_key(data_point)
+        series = self._series.get(key)
+        if series is None:
+            series = self._get_series(key, start)
+        elif slot < series.start or start <= series.max_slot - self.capacity:
+            # 与已知范围不连续，或者超出缓冲区保留范围，不能扩展已知范围
+            return
+        else:
+            self._series.move_to_end(key)
+            series.start = min(series.start, start)
+
+        for i, value in enumerate(history_values[: self.lookback], start=1):
+            if value is not None:
+                series.put(slot - i, float(value))
+
+    def observe(self, data_point: IDataPoint):
+        """
+        记录数据点的值，作为后续数据点的历史数据
+
+        Args:
+            data_point: 数据点
+        """
+        slot = self._slot(data_point)
+        series = self._get_series(self.series_key(data_point), slot)
+        if slot > series.max_slot - self.capacity:
+            series.put(slot, float(data_point.value))
+
+    def value_at(self, data_point: IDataPoint, periods: int):
+        """
+        获取 periods 个周期之前的值
+
+        Returns:
+            历史值，不存在返回 None，无法回答返回 MISSING
+        """
+        window = self._window(data_point)
+        if window is None or not 0 < periods <= self.lookback:
+            return MISSING
+        series, slot = window
+        return series.get(slot - periods)
+
+    def last(self, data_point: IDataPoint):
+        """
+        获取最近一个存在的历史值
+
+        Returns:
+            历史值，回看范围内都不存在返回 None，无法回答返回 MISSING
+        """
+        window = self._window(data_point)
+        if window is None:
+            return MISSING
+        series, slot = window
+        for i in range(1, self.lookback + 1):
+            value = series.get(slot - i)
+            if value is not None:
+                return value
+        return None
+
+    def mean(self, data_point: IDataPoint, k: int):
+        """
+        获取前 k 个存在的历史值的平均值
+
+        与逐个偏移量获取历史数据、取前 k 个存在的值求平均的结果一致：求和顺序相同，
+        不使用滑动窗口的累计和（累计和与逐个求和在末位上会有误差）。
+
+        Returns:
+            平均值，回看范围内都不存在返回 None，无法回答返回 MISSING
+        """
+        window = self._window(data_point)
+        if window is None:
+            return MISSING
+        if k <= 0:
+            return None
+        series, slot = window
+
+        # 窗口内有缺失时，前 k 个存在的值会延伸到更早的周期
+        values = []
+        for i in range(1, self.lookback + 1):
+            value = series.get(slot - i)
+            if value is not None:
+                values.append(value)
+                if len(values) == k:
+                    break
+        return sum(values) / len(values) if values else None
+
+    def window_max(self, data_point: IDataPoint, k: int):
+        """
+        获取前 k 个周期内的最大值
+
+        Returns:
+            最大值，都不存在返回 None，无法回答返回 MISSING
+        """
+        window = self._window(data_point)
+        if window is None:
+            return MISSING
+        series, slot = window
+
+        stats = series.windows.get(k)
+        if stats is not None:
+            return stats.max
+        values = [v for v in (series.get(slot - i) for i in range(1, k + 1)) if v is not None]
+        return max(values) if values else None
+
+    def clear(self):
+        """清空所有序列"""
+        self._series.clear()
+
+    def __len__(self) -> int:
+        return len(self._series)
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} interval={self.interval} lookback={self.lookback} series={len(self)}>"
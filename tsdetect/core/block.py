@@ -0,0 +1,431 @@
+"""
+TsDetect 数据点块
+
+以并行的定长类型数组保存一批数据点，行通过轻量视图访问。
+"""
+
+from array import array
+from collections.abc import Iterable, Iterator, Sequence
+from typing import Any, overload
+
+from tsdetect.core.base import CompactDataPoint
+from tsdetect.core.dimensions import canonical_dimension_key, dimensions_digest
+from tsdetect.core.exceptions import InvalidDataPointError
+from tsdetect.core.interfaces import IDataPoint
+
+
+class DataPointBlock(Sequence[IDataPoint]):
+    """
+    数据点块
+
+    N 个数据点以并行数组保存：
+        - values: array("d")，float64 数值
+        - timestamps: array("q")，int64 时间戳
+        - dimension_ids: array("q")，维度编码，指向 dimensions 维度表
+        - unit_ids: array("q")，单位编码，指向 unit_names 单位表
+        - point_values: 其他指标值（如智能检测结果）列表，没有数据点携带时为 None
+        - record_ids: 预设的记录唯一标识列表（与维度摘要和时间戳生成的标识不同时才保存），
+          没有预设标识时为 None
+
+    相同的维度字典和单位在块内只保存一份，维度摘要按维度编码缓存。
+    数组支持缓冲区协议，可以零拷贝转换为 NumPy 数组。
+
+    使用示例：
+        block = DataPointBlock.from_records(records)
+        for dp in block:  # DataPointView，满足 IDataPoint
+            algorithm.detect(dp)
+    """
+
+    def __init__(self):
+        """初始化空数据点块"""
+        self.values = array("d")
+        self.timestamps = array("q")
+        self.dimension_ids = array("q")
+        self.unit_ids = array("q")
+        self.point_values: list[dict[str, Any] | None] | None = None
+        self.record_ids: list[str | None] | None = None
+        self.dimensions: list[dict[str, Any]] = []
+        self.unit_names: list[str] = []
+        self._dimension_index: dict[tuple, int] = {}
+        self._unit_index: dict[str, int] = {}
+        self._digests: list[str | None] = []
+
+    @classmethod
+    def from_records(cls, records: Iterable[dict[str, Any]]) -> "DataPointBlock":
+        """
+        从原始字典创建数据点块
+
+        Args:
+            records: 原始数据字典，字段含义与 BaseDataPoint 一致
+
+        Returns:
+            数据点块
+        """
+        block = cls()
+        block.extend_records(records)
+        return block
+
+    @classmethod
+    def from_points(cls, data_points: Iterable[IDataPoint]) -> "DataPointBlock":
+        """
+        从数据点对象创建数据点块
+
+        Args:
+            data_points: 数据点列表
+
+        Returns:
+            数据点块
+        """
+        block = cls()
+        for dp in data_points:
+            block.append(
+                dp.value, dp.timestamp, dp.unit, dp.dimensions, getattr(dp, "values", None), record_id=dp.record_id
+            )
+        return block
+
+    def intern_dimensions(self, dimensions: dict[str, Any] | None) -> int:
+        """
+        获取维度编码，不存在时加入维度表
+
+        Args:
+            dimensions: 维度字典
+
+        Returns:
+            维度编码
+        """
+        dimensions = dimensions or {}
+        key = canonical_dimension_key(dimensions)
+        dim_id = self._dimension_index.get(key)
+        if dim_id is None:
+            dim_id = self._dimension_index[key] = len(self.dimensions)
+            self.dimensions.append(dimensions)
+            self._digests.append(None)
+        return dim_id
+
+    def intern_unit(self, unit: str | None) -> int:
+        """
+        获取单位编码，不存在时加入单位表
+
+        Args:
+            unit: 单位
+
+        Returns:
+            单位编码
+        """
+        unit = unit or ""
+        unit_id = self._unit_index.get(unit)
+        if unit_id is None:
+            unit_id = self._unit_index[unit] = len(self.unit_names)
+            self.unit_names.append(unit)
+        return unit_id
+
+    def append(
+        self,
+        value: float,
+        timestamp: int,
+        unit: str = "",
+        dimensions: dict[str, Any] | None = None,
+        values: dict[str, Any] | None = None,
+        record_id: str | None = None,
+    ):
+        """
+        追加一个数据点
+
+        Args:
+            value: 数据值
+            timestamp: 时间戳（秒）
+            unit: 单位
+            dimensions: 维度信息
+            values: 其他指标值（如智能检测结果）
+            record_id: 预设的记录唯一标识，与维度摘要和时间戳生成的标识相同时不保存
+        """
+        row = len(self.values)
+        timestamp = int(timestamp)
+        dim_id = self.intern_dimensions(dimensions)
+        self.values.append(float(value))
+        self.timestamps.append(timestamp)
+        self.unit_ids.append(self.intern_unit(unit))
+        self.dimension_ids.append(dim_id)
+
+        self._append_optional("point_values", row, values or None)
+        if record_id is not None and record_id == f"{self.dimension_digest(dim_id)}.{timestamp}":
+            record_id = None
+        self._append_optional("record_ids", row, record_id)
+
+    def _append_optional(self, column: str, row: int, item: Any):
+        """追加可选列，第一次出现非空值时才创建该列"""
+        data = getattr(self, column)
+        if data is None:
+            if item is None:
+                return
+            data = [None] * row
+            setattr(self, column, data)
+        data.append(item)
+
+    def append_record(self, record: dict[str, Any]):
+        """
+        追加一条原始记录
+
+        Args:
+            record: 原始数据字典
+
+        Raises:
+            InvalidDataPointError: 缺少必需字段
+        """
+        value = record.get("value")
+        if value is None:
+            raise InvalidDataPointError("DataPoint missing required field: value", field="value")
+
+        ts = record.get("timestamp")
+        if ts is None:
+            ts = record.get("time")
+        if ts is None:
+            raise InvalidDataPointError("DataPoint missing required field: timestamp", field="timestamp")
+
+        self.append(
+            value, ts, record.get("unit", ""), record.get("dimensions"), record.get("values"), record.get("record_id")
+        )
+
+    def extend_records(self, records: Iterable[dict[str, Any]]):
+        """
+        追加多条原始记录
+
+        Args:
+            records: 原始数据字典列表
+        """
+        for record in records:
+            self.append_record(record)
+
+    def dimension_digest(self, dim_id: int) -> str:
+        """
+        获取维度摘要（按维度编码缓存）
+
+        Args:
+            dim_id: 维度编码
+
+        Returns:
+            维度摘要
+        """
+        digest = self._digests[dim_id]
+        if digest is None:
+            digest = self._digests[dim_id] = dimensions_digest(self.dimensions[dim_id])
+        return digest
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    @overload
+    def __getitem__(self, index: int) -> "DataPointView": ...
+
+    @overload
+    def __getitem__(self, index: slice) -> "DataPointBlock": ...
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.take(range(*index.indices(len(self))))
+
+        size = len(self)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("DataPointBlock index out of range")
+        return DataPointView(self, index)
+
+    def __iter__(self) -> Iterator["DataPointView"]:
+        for index in range(len(self)):
+            yield DataPointView(self, index)
+
+    def take(self, indices: Iterable[int], compact: bool = False) -> "DataPointBlock":
+        """
+        按行号取出子块
+
+        Args:
+            indices: 行号列表
+            compact: 是否只保留子块用到的维度和单位（用于跨进程传输），
+                默认复制原块的维度表和单位表（维度字典本身共享），编码保持不变
+
+        Returns:
+            新的数据点块
+        """
+        indices = list(indices)
+        if compact:
+            return self._take_compact(indices)
+
+        # 复制编码表，向子块追加数据点不会修改原块
+        block = DataPointBlock()
+        block.dimensions = list(self.dimensions)
+        block.unit_names = list(self.unit_names)
+        block._dimension_index = dict(self._dimension_index)
+        block._unit_index = dict(self._unit_index)
+        block._digests = list(self._digests)
+
+        for index in indices:
+            block.values.append(self.values[index])
+            block.timestamps.append(self.timestamps[index])
+            block.dimension_ids.append(self.dimension_ids[index])
+            block.unit_ids.append(self.unit_ids[index])
+        block._take_optional(self, indices)
+        return block
+
+    def _take_optional(self, source: "DataPointBlock", indices: Sequence[int]):
+        """按行号复制原块的可选列"""
+        for column in ("point_values", "record_ids"):
+            data = getattr(source, column)
+            if data is not None:
+                setattr(self, column, [data[index] for index in indices])
+
+    def _take_compact(self, indices: Sequence[int]) -> "DataPointBlock":
+        block = DataPointBlock()
+        dimension_map: dict[int, int] = {}
+
+        for index in indices:
+            dim_id = self.dimension_ids[index]
+            new_dim_id = dimension_map.get(dim_id)
+            if new_dim_id is None:
+                new_dim_id = dimension_map[dim_id] = block.intern_dimensions(self.dimensions[dim_id])
+                block._digests[new_dim_id] = self._digests[dim_id]
+
+            block.values.append(self.values[index])
+            block.timestamps.append(self.timestamps[index])
+            block.dimension_ids.append(new_dim_id)
+            block.unit_ids.append(block.intern_unit(self.unit_names[self.unit_ids[index]]))
+        block._take_optional(self, indices)
+        return block
+
+    def __getstate__(self) -> dict[str, Any]:
+        # 编码索引可以由维度表和单位表重建，序列化时不传输
+        state = self.__dict__.copy()
+        del state["_dimension_index"], state["_unit_index"]
+        return state
+
+    def __setstate__(self, state: dict[str, Any]):
+        self.__dict__.update(state)
+        self._dimension_index = {canonical_dimension_key(dims): i for i, dims in enumerate(self.dimensions)}
+        self._unit_index = {unit: i for i, unit in enumerate(self.unit_names)}
+
+    def to_points(self) -> list[CompactDataPoint]:
+        """
+        转换为独立的紧凑数据点列表
+
+        Returns:
+            紧凑数据点列表
+        """
+        return [
+            CompactDataPoint(
+                value=self.values[i],
+                timestamp=self.timestamps[i],
+                unit=self.unit_names[self.unit_ids[i]],
+                dimensions=self.dimensions[self.dimension_ids[i]],
+                values=self.point_values[i] if self.point_values is not None else None,
+                record_id=self.record_id(i),
+            )
+            for i in range(len(self))
+        ]
+
+    def record_id(self, index: int) -> str:
+        """
+        获取行的记录唯一标识（优先使用预设的标识）
+
+        Args:
+            index: 行号
+
+        Returns:
+            记录唯一标识
+        """
+        if self.record_ids is not None:
+            record_id = self.record_ids[index]
+            if record_id is not None:
+                return record_id
+        return f"{self.dimension_digest(self.dimension_ids[index])}.{self.timestamps[index]}"
+
+    @property
+    def nbytes(self) -> int:
+        """并行数组占用的字节数（不含维度表）"""
+        return sum(arr.itemsize * len(arr) for arr in (self.values, self.timestamps, self.dimension_ids, self.unit_ids))
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} rows={len(self)} dimensions={len(self.dimensions)}>"
+
+
+class DataPointView(IDataPoint):
+    """
+    数据点块的行视图
+
+    只保存块引用和行号，字段按需从并行数组中读取。
+    """
+
+    __slots__ = ("block", "index")
+
+    def __init__(self, block: DataPointBlock, index: int):
+        self.block = block
+        self.index = index
+
+    @property
+    def value(self) -> float:
+        """获取数据点值"""
+        return self.block.values[self.index]
+
+    @property
+    def timestamp(self) -> int:
+        """获取时间戳"""
+        return self.block.timestamps[self.index]
+
+    @property
+    def time(self) -> int:
+        """时间戳别名"""
+        return self.block.timestamps[self.index]
+
+    @property
+    def unit(self) -> str:
+        """获取单位"""
+        block = self.block
+        return block.unit_names[block.unit_ids[self.index]]
+
+    @property
+    def dimensions(self) -> dict[str, Any]:
+        """获取维度信息"""
+        block = self.block
+        return block.dimensions[block.dimension_ids[self.index]]
+
+    @property
+    def values(self) -> dict[str, Any]:
+        """获取所有指标值"""
+        point_values = self.block.point_values
+        values = point_values[self.index] if point_values is not None else None
+        return values if values is not None else {}
+
+    @property
+    def record_id(self) -> str:
+        """获取记录唯一标识"""
+        return self.block.record_id(self.index)
+
+    def as_dict(self) -> dict[str, Any]:
+        """转换为字典"""
+        data = {
+            "value": self.value,
+            "timestamp": self.timestamp,
+            "unit": self.unit,
+            "dimensions": self.dimensions,
+        }
+        values = self.values
+        if values:
+            data["values"] = values
+        return data
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """获取属性值"""
+        return getattr(self, key, default)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, DataPointView):
+            return self.block is other.block and self.index == other.index
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash((id(self.block), self.index))
+
+    def __str__(self) -> str:
+        return f"{self.record_id}:{self.value}"
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} record_id={self.record_id} value={self.value}>"
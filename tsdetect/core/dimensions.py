@@ -0,0 +1,154 @@
+"""
+TsDetect 维度摘要
+
+维度字典 -> 摘要（record_id 的维度部分）的进程级缓存表。
+同一条时间序列的维度在进程内只序列化和哈希一次。
+"""
+
+import functools
+import hashlib
+import json
+from collections.abc import Callable
+from typing import Any
+
+# 摘要算法：名称 -> (序列化后的维度字节 -> 十六进制摘要)
+DIGEST_ALGORITHMS: dict[str, Callable[[bytes], str]] = {
+    # 默认算法，与历史 record_id 保持一致
+    "md5": lambda data: hashlib.md5(data).hexdigest(),
+    # 非密码学用途的快速摘要，8 字节（16 位十六进制）
+    "blake2b": lambda data: hashlib.blake2b(data, digest_size=8).hexdigest(),
+}
+
+# 可以直接作为规范化键的维度值类型
+_SCALAR_TYPES = (str, int, float, bool, type(None))
+
+
+def canonical_dimension_key(dimensions: dict[str, Any]) -> tuple:
+    """
+    维度字典的规范化键
+
+    按维度名排序，值附带类型以区分 1 / 1.0 / True；
+    包含不可哈希值（如嵌套字典、列表）时退化为 JSON 字符串。
+
+    Args:
+        dimensions: 维度字典
+
+    Returns:
+        可哈希的规范化键
+    """
+    try:
+        items = sorted(dimensions.items())
+    except TypeError:
+        return ("json", json.dumps(dimensions, sort_keys=True))
+
+    for _key, value in items:
+        if type(value) not in _SCALAR_TYPES:
+            return ("json", json.dumps(dimensions, sort_keys=True))
+    return tuple((key, type(value), value) for key, value in items)
+
+
+class DimensionKeyTable:
+    """
+    维度摘要表
+
+    规范化维度键 -> 摘要的 LRU 缓存，线程安全。
+    """
+
+    def __init__(self, maxsize: int = 65536, algorithm: str = "md5"):
+        """
+        初始化维度摘要表
+
+        Args:
+            maxsize: 最多缓存的维度组合数
+            algorithm: 摘要算法，见 DIGEST_ALGORITHMS
+        """
+        if algorithm not in DIGEST_ALGORITHMS:
+            raise ValueError(f"Unknown digest algorithm: {algorithm}. Available: {list(DIGEST_ALGORITHMS)}")
+
+        self.maxsize = maxsize
+        self.algorithm = algorithm
+        self._hash = DIGEST_ALGORITHMS[algorithm]
+        self._lookup = functools.lru_cache(maxsize=maxsize)(self._compute)
+
+    def _compute(self, key: tuple) -> str:
+        """根据规范化键计算摘要（序列化结果与 json.dumps(sort_keys=True) 一致）"""
+        if key and key[0] == "json":
+            dims_str = key[1]
+        else:
+            dims_str = json.dumps({name: value for name, _type, value in key})
+        return self._hash(dims_str.encode())
+
+    def digest(self, dimensions: dict[str, Any]) -> str:
+        """
+        获取维度摘要
+
+        Args:
+            dimensions: 维度字典
+
+        Returns:
+            十六进制摘要
+        """
+        return self._lookup(canonical_dimension_key(dimensions))
+
+    def clear(self):
+        """清空缓存"""
+        self._lookup.cache_clear()
+
+    @property
+    def hits(self) -> int:
+        """缓存命中次数"""
+        return self._lookup.cache_info().hits
+
+    @property
+    def misses(self) -> int:
+        """缓存未命中次数（即实际计算摘要的次数）"""
+        return self._lookup.cache_info().misses
+
+    def __len__(self) -> int:
+        return self._lookup.cache_info().currsize
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} algorithm={self.algorithm} size={len(self)} hits={self.hits} misses={self.misses}>"
+
+
+# 进程级默认摘要表
+_default_table = DimensionKeyTable()
+
+
+def get_dimension_table() -> DimensionKeyTable:
+    """获取进程级默认维度摘要表"""
+    return _default_table
+
+
+def configure_dimension_table(maxsize: int = 65536, algorithm: str = "md5") -> DimensionKeyTable:
+    """
+    重新配置进程级默认维度摘要表
+
+    切换摘要算法会改变 record_id，需要在创建数据点之前调用。
+
+    Args:
+        maxsize: 最多缓存的维度组合数
+        algorithm: 摘要算法，见 DIGEST_ALGORITHMS
+
+    Returns:
+        新的默认维度摘要表
+    """
+    global _default_table
+    _default_table = DimensionKeyTable(maxsize=maxsize, algorithm=algorithm)
+    return _default_table
+
+
+def dimensions_digest(dimensions: dict[str, Any]) -> str:
+    """
+    计算维度摘要
+
+    record_id 的维度部分，相同维度的数据点属于同一条时间序列。
+    结果缓存在进程级默认维度摘要表中。
+
+    Args:
+        dimensions: 维度字典
+
+    Returns:
+        维度摘要字符串
+    """
+    return _default_table.digest(dimensions)
@@ -0,0 +1,243 @@
+"""
+TsDetect 历史数据存储
+
+同比/环比算法使用的历史数据点缓存，按 (record_id, offset) 索引，
+支持容量上限和过期时间，避免长期运行的检测器无限增长；
+以及基于 asyncio 的并发历史数据加载器。
+"""
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Iterable, Sequence
+
+from tsdetect.core.interfaces import IAsyncHistoryFetcher, IDataPoint
+
+# 缓存未命中标记（与“已查询但历史点不存在”的 None 区分）
+MISSING = object()
+
+
+class HistoryStore:
+    """
+    历史数据存储
+
+    以 (record_id, offset) 为键的 LRU 缓存，值为历史数据点或 None（历史点不存在）。
+    超过 max_size 时淘汰最久未使用的条目，设置 ttl 时条目在写入 ttl 秒后过期。
+
+    使用示例：
+        store = HistoryStore(max_size=100000, ttl=3600)
+        store.update(fetcher.batch_fetch(points, offsets), offsets)
+        hp = store.get(dp.record_id, 60)
+        if hp is MISSING:
+            ...
+    """
+
+    def __init__(self, max_size: int | None = 100000, ttl: float | None = None):
+        """
+        初始化历史数据存储
+
+        Args:
+            max_size: 最多缓存的条目数，None 表示不限制
+            ttl: 条目过期时间（秒），None 表示不过期
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data: OrderedDict[tuple[str, int], tuple[IDataPoint | None, float | None]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, record_id: str, offset: int, default=MISSING):
+        """
+        获取历史数据点
+
+        Args:
+            record_id: 当前数据点的记录标识
+            offset: 时间偏移（秒）
+            default: 未命中时的返回值
+
+        Returns:
+            历史数据点或 None（已缓存但不存在），未命中返回 default
+        """
+        key = (record_id, offset)
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+
+            point, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+
+            self._data.move_to_end(key)
+            return point
+
+    def put(self, record_id: str, offset: int, point: IDataPoint | None):
+        """
+        写入单个历史数据点
+
+        Args:
+            record_id: 当前数据点的记录标识
+            offset: 时间偏移（秒）
+            point: 历史数据点，None 表示历史点不存在
+        """
+        with self._lock:
+            self._set((record_id, offset), point, self._expires_at())
+            self._evict()
+
+    def update(self, history_data: dict[str, Sequence[IDataPoint | None]], offsets: Sequence[int]):
+        """
+        写入批量查询结果
+
+        Args:
+            history_data: IHistoryFetcher.batch_fetch 的返回值，{record_id: 与 offsets 对应的历史点列表}
+            offsets: 查询时使用的偏移量列表
+        """
+        expires_at = self._expires_at()
+        with self._lock:
+            for record_id, points in history_data.items():
+                for offset, point in zip(offsets, points, strict=False):
+                    self._set((record_id, offset), point, expires_at)
+            self._evict()
+
+    def reserve(self, size: int):
+        """
+        扩大容量上限，保证至少可以同时容纳 size 个条目
+
+        批量预取的历史数据在检测完成前不能被淘汰，否则每个数据点都会退化为单点查询。
+
+        Args:
+            size: 需要同时容纳的条目数
+        """
+        with self._lock:
+            if self.max_size is not None and self.max_size < size:
+                self.max_size = size
+
+    def discard(self, record_id: str, offsets: Iterable[int]):
+        """
+        删除某个数据点的历史缓存
+
+        Args:
+            record_id: 当前数据点的记录标识
+            offsets: 需要删除的偏移量
+        """
+        with self._lock:
+            for offset in offsets:
+                self._data.pop((record_id, offset), None)
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._data.clear()
+
+    def _expires_at(self) -> float | None:
+        return time.monotonic() + self.ttl if self.ttl is not None else None
+
+    def _set(self, key: tuple[str, int], point: IDataPoint | None, expires_at: float | None):
+        self._data[key] = (point, expires_at)
+        self._data.move_to_end(key)
+
+    def _evict(self):
+        if self.max_size is not None:
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def __contains__(self, key: tuple[str, int]) -> bool:
+        return self.get(*key) is not MISSING
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} size={len(self)} max_size={self.max_size} ttl={self.ttl}>"
+
+
+class AsyncHistoryLoader:
+    """
+    异步历史数据加载器
+
+    按偏移量并发调用 IAsyncHistoryFetcher.batch_fetch，并发数由信号量限制；
+    同一 (record_id, offset) 已在查询中时不会重复发起请求，而是等待进行中的请求。
+    """
+
+    def __init__(self, history_fetcher: IAsyncHistoryFetcher, concurrency: int = 8):
+        """
+        初始化异步历史数据加载器
+
+        Args:
+            history_fetcher: 异步历史数据获取器
+            concurrency: 最大并发请求数
+        """
+        if concurrency <= 0:
+            raise ValueError("concurrency must be positive")
+
+        self.history_fetcher = history_fetcher
+        self.concurrency = concurrency
+        # 信号量和进行中的请求绑定事件循环，在 load 时按当前循环创建
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._semaphore: asyncio.Semaphore | None = None
+        self._inflight: dict[tuple[str, int], asyncio.Future] = {}
+
+        # 统计信息
+        self.fetch_count = 0
+
+    async def load(self, store: HistoryStore, data_points: Sequence[IDataPoint], offsets: Sequence[int]):
+        """
+        加载历史数据到存储
+
+        已缓存的数据点跳过，进行中的请求复用，其余数据点每个偏移量一次批量请求。
+
+        Args:
+            store: 历史数据存储
+            data_points: 数据点列表
+            offsets: 偏移量列表
+        """
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+            self._inflight = {}
+
+        requests = []
+        waiting = []
+
+        for offset in offsets:
+            pending = []
+            for dp in data_points:
+                key = (dp.record_id, offset)
+                if store.get(*key) is not MISSING:
+                    continue
+                future = self._inflight.get(key)
+                if future is not None:
+                    waiting.append(future)
+                    continue
+                self._inflight[key] = loop.create_future()
+                pending.append(dp)
+            if pending:
+                requests.append(self._fetch(store, pending, offset))
+
+        try:
+            await asyncio.gather(*requests)
+        finally:
+            if waiting:
+                await asyncio.gather(*waiting)
+
+    async def _fetch(self, store: HistoryStore, pending: list[IDataPoint], offset: int):
+        """查询单个偏移量，完成后唤醒等待同一数据的请求"""
+        try:
+            async with self._semaphore:
+                result = await self.history_fetcher.batch_fetch(pending, [offset])
+            self.fetch_count += 1
+
+            # 获取器未返回的数据点记为“历史点不存在”
+            history_data: dict[str, Sequence[IDataPoint | None]] = {dp.record_id: [None] for dp in pending}
+            history_data.update(result)
+            store.update(history_data, [offset])
+        finally:
+            for dp in pending:
+                future = self._inflight.pop((dp.record_id, offset), None)
+                if future is not None and not future.done():
+                    future.set_result(None)
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} concurrency={self.concurrency} inflight={len(self._inflight)}>"
@@ -16,6 +16,9 @@ class IDataPoint(ABC):
     任何实现此接口的类都可以被检测算法处理。
     """
 
+    # 允许子类使用 __slots__ 定义紧凑的数据点
+    __slots__ = ()
+
     @property
     @abstractmethod
     def value(self) -> float:
@@ -118,6 +121,44 @@ class IHistoryFetcher(ABC):
         pass
 
 
+class IAsyncHistoryFetcher(ABC):
+    """
+    异步历史数据获取器抽象接口
+
+    与 IHistoryFetcher 语义一致，适用于基于 asyncio 的时序数据库客户端。
+    """
+
+    @abstractmethod
+    async def fetch(self, data_point: IDataPoint, offsets: list[int]) -> list[IDataPoint | None]:
+        """
+        获取历史数据点
+
+        Args:
+            data_point: 当前数据点
+            offsets: 时间偏移量列表（秒），正数表示过去的时间点
+
+        Returns:
+            历史数据点列表，与 offsets 一一对应，不存在的点为 None
+        """
+        pass
+
+    @abstractmethod
+    async def batch_fetch(
+        self, data_points: list[IDataPoint], offsets: list[int]
+    ) -> dict[str, list[IDataPoint | None]]:
+        """
+        批量获取历史数据点
+
+        Args:
+            data_points: 当前数据点列表
+            offsets: 时间偏移量列表
+
+        Returns:
+            字典，key 为 record_id，value 为历史数据点列表
+        """
+        pass
+
+
 class IUnitConverter(ABC):
     """
     单位转换器抽象接口
@@ -178,6 +219,9 @@ class ITemplateEngine(ABC):
     定义了消息模板渲染的接口，支持多种模板后端。
     """
 
+    # render / render_compiled 是否接受惰性映射（只读取模板引用的变量），否则传入字典副本
+    lazy_context: bool = False
+
     @abstractmethod
     def render(self, template: str, context: dict[str, Any]) -> str:
         """
@@ -205,6 +249,54 @@ class ITemplateEngine(ABC):
         """
         pass
 
+    def render_compiled(self, compiled: Any, context: dict[str, Any]) -> str:
+        """
+        使用编译后的模板渲染
+
+        批量渲染时每个模板只编译一次。默认调用编译结果的 render 方法
+        （如 jinja2.Template），其他模板后端可以重写此方法。
+
+        Args:
+            compiled: compile 的返回值
+            context: 上下文变量字典
+
+        Returns:
+            渲染后的字符串
+        """
+        return compiled.render(context)
+
+
+class IDetectionObserver(ABC):
+    """
+    检测观察者抽象接口
+
+    接收检测热路径各阶段的耗时，用于定位时间花在上下文构建、历史数据获取、表达式求值还是消息渲染上。
+    算法未设置观察者时不计时。
+
+    阶段名称：
+        - get_context：构建检测上下文
+        - extra_context：计算额外上下文（包含其中的历史数据获取）
+        - fetch_history_point：获取单个历史数据点，outcome 为 "hit" / "miss"
+        - evaluate：检测表达式求值
+        - format_message：格式化异常消息
+        - pre_detect：SDK 预测调用，outcome 为 "batch" / "single"
+    """
+
+    @abstractmethod
+    def record(self, algorithm: str, phase: str, duration: float, outcome: str | None = None):
+        """
+        记录一个阶段的耗时
+
+        可能在多个线程中调用，实现需要线程安全。
+
+        Args:
+            algorithm: 算法名称（算法类名，子检测器使用所属集合的类名）
+            phase: 阶段名称
+            duration: 耗时（秒）
+            outcome: 阶段结果（如缓存命中情况），没有时为 None
+        """
+        pass
+
 
 class ISDKClient(ABC):
     """
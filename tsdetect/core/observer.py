@@ -0,0 +1,160 @@
+"""
+TsDetect 检测观察者
+
+按（算法, 阶段）聚合 IDetectionObserver 接收的耗时，输出分阶段的耗时分布。
+
+使用示例：
+    observer = InMemoryObserver()
+    algo = SimpleRingRatioAlgorithm(config=..., history_fetcher=fetcher, observer=observer)
+    algo.detect_records(data_points)
+    observer.print_report()
+"""
+
+import sys
+import threading
+from collections import Counter
+from typing import Any, TextIO
+
+from tsdetect.core.interfaces import IDetectionObserver
+
+# 热路径阶段
+PHASE_GET_CONTEXT = "get_context"
+PHASE_EXTRA_CONTEXT = "extra_context"
+PHASE_FETCH_HISTORY = "fetch_history_point"
+PHASE_EVALUATE = "evaluate"
+PHASE_FORMAT_MESSAGE = "format_message"
+PHASE_PRE_DETECT = "pre_detect"
+
+
+class PhaseStats:
+    """
+    单个（算法, 阶段）的聚合统计
+
+    Attributes:
+        count: 调用次数
+        total: 总耗时（秒）
+        max: 最大单次耗时（秒）
+        outcomes: 各结果的次数
+    """
+
+    __slots__ = ("count", "total", "max", "outcomes")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.outcomes: Counter[str] = Counter()
+
+    def add(self, duration: float, outcome: str | None = None):
+        """累加一次调用"""
+        self.count += 1
+        self.total += duration
+        if duration > self.max:
+            self.max = duration
+        if outcome is not None:
+            self.outcomes[outcome] += 1
+
+    @property
+    def mean(self) -> float:
+        """平均耗时（秒）"""
+        return self.total / self.count if self.count else 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        """转换为字典"""
+        return {
+            "count": self.count,
+            "total": self.total,
+            "mean": self.mean,
+            "max": self.max,
+            "outcomes": dict(self.outcomes),
+        }
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} count={self.count} total={self.total:.6f}>"
+
+
+class InMemoryObserver(IDetectionObserver):
+    """
+    内存聚合观察者
+
+    线程安全。各阶段的耗时是包含子阶段的：extra_context 包含其中的 fetch_history_point，
+    各阶段耗时之和可能大于总耗时。
+    """
+
+    def __init__(self):
+        self._stats: dict[tuple[str, str], PhaseStats] = {}
+        self._lock = threading.Lock()
+
+    def record(self, algorithm: str, phase: str, duration: float, outcome: str | None = None):
+        """记录一个阶段的耗时"""
+        key = (algorithm, phase)
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = PhaseStats()
+            stats.add(duration, outcome)
+
+    def get(self, algorithm: str, phase: str) -> PhaseStats | None:
+        """
+        获取（算法, 阶段）的统计
+
+        Args:
+            algorithm: 算法名称
+            phase: 阶段名称
+
+        Returns:
+            聚合统计，没有记录时返回 None
+        """
+        return self._stats.get((algorithm, phase))
+
+    def snapshot(self) -> dict[str, dict[str, dict[str, Any]]]:
+        """
+        导出统计
+
+        Returns:
+            {算法名称: {阶段名称: 统计字典}}
+        """
+        result: dict[str, dict[str, dict[str, Any]]] = {}
+        with self._lock:
+            for (algorithm, phase), stats in self._stats.items():
+                result.setdefault(algorithm, {})[phase] = stats.as_dict()
+        return result
+
+    def reset(self):
+        """清空统计"""
+        with self._lock:
+            self._stats.clear()
+
+    def format_report(self) -> str:
+        """
+        格式化分阶段的耗时分布
+
+        Returns:
+            报告文本，每个算法一段，阶段按总耗时降序排列
+        """
+        lines = []
+        for algorithm, phases in sorted(self.snapshot().items()):
+            lines.append(algorithm)
+            lines.append(f"  {'phase':<22}{'count':>10}{'total ms':>12}{'mean us':>10}{'max us':>10}  outcomes")
+            for phase, stats in sorted(phases.items(), key=lambda item: -item[1]["total"]):
+                outcomes = " ".join(f"{k}={v}" for k, v in sorted(stats["outcomes"].items()))
+                lines.append(
+                    f"  {phase:<22}{stats['count']:>10}{stats['total'] * 1e3:>12.2f}"
+                    f"{stats['mean'] * 1e6:>10.1f}{stats['max'] * 1e6:>10.1f}  {outcomes}".rstrip()
+                )
+        return "\n".join(lines)
+
+    def print_report(self, file: TextIO | None = None):
+        """
+        打印分阶段的耗时分布
+
+        Args:
+            file: 输出流，默认为标准输出
+        """
+        print(self.format_report(), file=file or sys.stdout)
+
+    def __len__(self) -> int:
+        return len(self._stats)
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} entries={len(self)}>"
@@ -0,0 +1,392 @@
+"""
+TsDetect 检测计划
+
+同一批数据点上运行多个算法（检测策略）时，合并各算法的重复工作：
+    - HistoryPlanner：汇总同比/环比算法的历史偏移量，每个偏移量只查询一次，所有算法共享同一个历史存储
+    - DetectionPlan：在 HistoryPlanner 的基础上共享检测上下文（历史基准值），并对相同的比较只求值一次
+
+使用示例：
+    planner = HistoryPlanner([ring_ratio, year_round, amplitude], history_fetcher=fetcher)
+    anomalies = planner.detect_records(points)
+
+    plan = DetectionPlan.from_configs([(ThresholdAlgorithm, config) for config in strategy_configs])
+    anomalies = plan.detect_records(points)
+"""
+
+import logging
+from collections.abc import Hashable, Iterable, Iterator, Sequence
+from contextlib import contextmanager
+from typing import Any
+
+from tsdetect.core.algorithms import BaseAlgorithm, BaseAlgorithmCollection, DetectContext, RangeRatioAlgorithm
+from tsdetect.core.base import BaseAnomalyPoint
+from tsdetect.core.history import MISSING, HistoryStore
+from tsdetect.core.interfaces import IDataPoint, IHistoryFetcher
+from tsdetect.utils.expression import CompiledExpression
+
+logger = logging.getLogger(__name__)
+
+
+class HistoryPlanner:
+    """
+    历史数据预取计划
+
+    prefetch 按去重后的偏移量逐个调用 batch_fetch，写入共享存储。
+
+    检测期间（attached 上下文内）同比/环比算法的 history_store（以及未设置的 history_fetcher）
+    被临时替换为共享存储和共享获取器，各算法的 query_history_points 发现数据已在存储中，
+    不会再次查询；退出后恢复算法原有的获取器和存储，算法仍可以单独使用。
+    """
+
+    def __init__(
+        self,
+        algorithms: Sequence[BaseAlgorithm],
+        history_fetcher: IHistoryFetcher | None = None,
+        history_store: HistoryStore | None = None,
+    ):
+        """
+        初始化预取计划
+
+        Args:
+            algorithms: 同一检测任务中的算法列表，非同比/环比算法不参与预取
+            history_fetcher: 历史数据获取器，为空时使用第一个设置了获取器的算法的获取器
+            history_store: 共享历史存储，为空时创建不限容量的存储（由 release 释放）
+        """
+        self.algorithms = list(algorithms)
+        self.history_store = history_store if history_store is not None else HistoryStore(max_size=None)
+
+        range_algorithms = [algo for algo in self.algorithms if isinstance(algo, RangeRatioAlgorithm)]
+        if history_fetcher is None:
+            history_fetcher = next(
+                (algo.history_fetcher for algo in range_algorithms if algo.history_fetcher is not None), None
+            )
+        self.history_fetcher = history_fetcher
+
+        # 只接管使用同一获取器（或未设置获取器）的算法，其余算法保持独立查询
+        self.range_algorithms: list[RangeRatioAlgorithm] = [
+            algo for algo in range_algorithms if algo.history_fetcher is None or algo.history_fetcher is history_fetcher
+        ]
+        # 接管期间保存的 (算法, 原获取器, 原存储)
+        self._originals: list[tuple[RangeRatioAlgorithm, IHistoryFetcher | None, HistoryStore]] = []
+        self._attach_depth = 0
+
+        # 去重后的偏移量，保持首次出现的顺序
+        self.offsets: tuple[int, ...] = tuple(
+            dict.fromkeys(offset for algo in self.range_algorithms for offset in algo.history_offsets)
+        )
+
+        # 统计信息
+        self.fetch_count = 0
+
+    @contextmanager
+    def attached(self) -> Iterator["HistoryPlanner"]:
+        """
+        临时接管算法的历史数据获取器和存储
+
+        可以嵌套使用，最外层退出时恢复算法原有的获取器和存储。
+
+        Yields:
+            预取计划本身
+        """
+        if self._attach_depth == 0:
+            self._originals = [(algo, algo.history_fetcher, algo.history_store) for algo in self.range_algorithms]
+            for algo in self.range_algorithms:
+                algo.history_fetcher = self.history_fetcher
+                algo.history_store = self.history_store
+        self._attach_depth += 1
+        try:
+            yield self
+        finally:
+            self._attach_depth -= 1
+            if self._attach_depth == 0:
+                for algo, history_fetcher, history_store in self._originals:
+                    algo.history_fetcher = history_fetcher
+                    algo.history_store = history_store
+                self._originals = []
+
+    def prefetch(self, data_points: Iterable[IDataPoint]):
+        """
+        预取所有算法需要的历史数据
+
+        每个偏移量调用一次 batch_fetch，只查询存储中尚未缓存的数据点。
+
+        Args:
+            data_points: 数据点列表
+        """
+        if self.history_fetcher is None:
+            return
+
+        points = list(data_points)
+        store = self.history_store
+        for offset in self.offsets:
+            pending = [dp for dp in points if store.get(dp.record_id, offset) is MISSING]
+            if not pending:
+                continue
+            # 获取器未返回的数据点记为“历史点不存在”，避免算法再次回源
+            history_data: dict[str, Sequence[IDataPoint | None]] = {dp.record_id: [None] for dp in pending}
+            history_data.update(self.history_fetcher.batch_fetch(pending, [offset]))
+            store.update(history_data, [offset])
+            self.fetch_count += 1
+
+    def release(self, data_points: Iterable[IDataPoint]):
+        """
+        释放预取的历史数据
+
+        Args:
+            data_points: 数据点列表
+        """
+        for dp in data_points:
+            self.history_store.discard(dp.record_id, self.offsets)
+
+    def detect_records(self, data_points: list[IDataPoint], level: int = 1) -> list[BaseAnomalyPoint]:
+        """
+        预取历史数据后依次执行所有算法的批量检测
+
+        Args:
+            data_points: 数据点列表
+            level: 告警级别
+
+        Returns:
+            所有算法的异常数据点列表（按算法顺序）
+        """
+        self.prefetch(data_points)
+        try:
+            with self.attached():
+                anomalies = []
+                for algo in self.algorithms:
+                    anomalies.extend(algo.detect_records(data_points, level=level))
+                return anomalies
+        finally:
+            self.release(data_points)
+
+    def __repr__(self) -> str:
+        return (
+            f"<{self.__class__.__name__} algorithms={len(self.range_algorithms)}/{len(self.algorithms)} "
+            f"offsets={len(self.offsets)}>"
+        )
+
+
+class DetectionPlan:
+    """
+    多策略检测计划
+
+    构造时把算法列表编译为共享的求值计划：
+        1. 历史数据由 HistoryPlanner 按去重后的偏移量统一预取
+        2. plan_context_key 相同的算法共用一个检测上下文（由组内第一个算法构建），
+           历史基准值等上下文变量对每个数据点只计算一次
+        3. 同一上下文中表达式相同的检测器合并为一个比较，对每个数据点只求值一次
+
+    比较结果按各算法的 expr_op 组合，只有触发的算法才构建自己的上下文生成异常点和消息，
+    触发时上下文立即加载，释放历史数据后仍可生成消息，检测结果与逐个算法检测一致。
+    plan_context_key 为 None 的算法（如智能检测、增量基线）独立检测。
+    """
+
+    def __init__(
+        self,
+        algorithms: Sequence[BaseAlgorithm],
+        history_fetcher: IHistoryFetcher | None = None,
+        history_store: HistoryStore | None = None,
+    ):
+        """
+        初始化检测计划
+
+        Args:
+            algorithms: 同一数据流上的算法列表
+            history_fetcher: 历史数据获取器，为空时使用第一个设置了获取器的算法的获取器
+            history_store: 共享历史存储，为空时创建不限容量的存储
+        """
+        self.algorithms = list(algorithms)
+        # 共享上下文的键包含历史存储，在接管历史存储期间计算
+        self.history_planner = HistoryPlanner(self.algorithms, history_fetcher, history_store)
+        with self.history_planner.attached():
+            self._compile()
+
+        # 统计信息
+        self.evaluation_count = 0
+
+    def _compile(self):
+        """把算法列表编译为共享的上下文和比较"""
+
+        # 上下文编号 -> 构建上下文的算法
+        self.context_owners: list[BaseAlgorithm] = []
+        # 比较编号 -> (上下文编号, 编译后的表达式)
+        self.comparisons: list[tuple[int, CompiledExpression | None]] = []
+        # 每个算法的 (上下文编号, 比较编号列表)，独立检测的算法为 None
+        self.steps: list[tuple[int, list[int]] | None] = []
+
+        context_ids: dict[Hashable, int] = {}
+        comparison_ids: dict[tuple[int, str], int] = {}
+        for algo in self.algorithms:
+            key = algo.plan_context_key() if isinstance(algo, BaseAlgorithmCollection) else None
+            if key is None:
+                self.steps.append(None)
+                continue
+
+            context_id = context_ids.get(key)
+            if context_id is None:
+                context_id = context_ids[key] = len(self.context_owners)
+                self.context_owners.append(algo)
+
+            ids = []
+            for detector in algo.detectors:
+                comparison_key = (context_id, detector.expr)
+                comparison_id = comparison_ids.get(comparison_key)
+                if comparison_id is None:
+                    comparison_id = comparison_ids[comparison_key] = len(self.comparisons)
+                    self.comparisons.append((context_id, detector._compiled))
+                ids.append(comparison_id)
+            self.steps.append((context_id, ids))
+
+        # 需要预加载的算法：上下文的构建者和独立检测的算法，其余算法的历史数据已在共享存储中
+        self.prepared_algorithms: list[BaseAlgorithm] = list(
+            dict.fromkeys(
+                [algo for algo, step in zip(self.algorithms, self.steps, strict=True) if step is None]
+                + self.context_owners
+            )
+        )
+
+    @classmethod
+    def from_configs(
+        cls,
+        strategies: Iterable[tuple[type[BaseAlgorithm], Any]],
+        history_fetcher: IHistoryFetcher | None = None,
+        history_store: HistoryStore | None = None,
+        **algorithm_kwargs,
+    ) -> "DetectionPlan":
+        """
+        由 (算法类, 配置) 列表创建检测计划
+
+        Args:
+            strategies: (算法类, 配置) 列表
+            history_fetcher: 历史数据获取器
+            history_store: 共享历史存储
+            **algorithm_kwargs: 其他构造参数（如 unit、unit_converter），所有算法共用
+
+        Returns:
+            检测计划
+
+        Raises:
+            InvalidAlgorithmConfigError: 配置无效
+        """
+        algorithms = [algorithm_class(config=config, **algorithm_kwargs) for algorithm_class, config in strategies]
+        return cls(algorithms, history_fetcher=history_fetcher, history_store=history_store)
+
+    def prepare_records(self, data_points: list[IDataPoint]):
+        """
+        预取历史数据并执行各算法的预加载
+
+        Args:
+            data_points: 数据点列表
+        """
+        self.history_planner.prefetch(data_points)
+        with self.history_planner.attached():
+            for algo in self.prepared_algorithms:
+                algo.prepare_records(data_points)
+
+    def release_records(self, data_points: list[IDataPoint]):
+        """
+        释放预取的历史数据
+
+        Args:
+            data_points: 数据点列表
+        """
+        self.history_planner.release(data_points)
+
+    def _evaluate(self, comparison_id: int, data_point: IDataPoint, contexts: list[DetectContext | None]) -> bool:
+        """对数据点求值一个比较，共享上下文在首次使用时构建"""
+        self.evaluation_count += 1
+        context_id, compiled = self.comparisons[comparison_id]
+        if compiled is None:
+            return False
+
+        context = contexts[context_id]
+        if context is None:
+            context = contexts[context_id] = self.context_owners[context_id].get_context(data_point)
+
+        try:
+            return bool(compiled.evaluate(context))
+        except Exception as e:
+            logger.warning(f"Expression evaluation failed: {e}, expr={compiled.expr}, record_id={data_point.record_id}")
+            return False
+
+    def detect(self, data_point: IDataPoint) -> list[list[BaseAnomalyPoint]]:
+        """
+        检测数据点
+
+        Args:
+            data_point: 数据点
+
+        Returns:
+            与算法一一对应的异常数据点列表
+        """
+        with self.history_planner.attached():
+            return self._detect(data_point)
+
+    def _detect(self, data_point: IDataPoint) -> list[list[BaseAnomalyPoint]]:
+        """在接管历史存储期间检测数据点"""
+        contexts: list[DetectContext | None] = [None] * len(self.context_owners)
+        outcomes: list[bool | None] = [None] * len(self.comparisons)
+
+        results = []
+        for algo, step in zip(self.algorithms, self.steps, strict=True):
+            if step is None:
+                results.append(algo.detect(data_point))
+                continue
+
+            context_id, comparison_ids = step
+            triggered = []
+            for detector, comparison_id in zip(algo.detectors, comparison_ids, strict=True):
+                outcome = outcomes[comparison_id]
+                if outcome is None:
+                    outcome = outcomes[comparison_id] = self._evaluate(comparison_id, data_point, contexts)
+                if outcome:
+                    triggered.append(detector)
+                elif algo.expr_op == "and":
+                    # 与逐个检测一致，任一比较未触发即可结束
+                    triggered = []
+                    break
+
+            if not triggered:
+                results.append([])
+                continue
+
+            # 上下文的构建者直接使用共享上下文，其他算法构建自己的上下文（消息中的阈值等参数各不相同）
+            context = contexts[context_id] if self.context_owners[context_id] is algo else None
+            if context is None:
+                context = algo.get_context(data_point)
+            # 异常消息和上下文快照在首次访问时才生成，此时共享历史存储可能已经释放，
+            # 先加载上下文变量（历史数据仍在存储中），之后生成消息不会再逐点查询历史数据
+            context.materialize()
+            anomalies = [detector._create_anomaly_point(data_point, context) for detector in triggered]
+            results.append(algo._merge_anomalies(data_point, anomalies, triggered, context))
+        return results
+
+    def detect_records(self, data_points: list[IDataPoint], level: int = 1) -> list[BaseAnomalyPoint]:
+        """
+        批量检测
+
+        Args:
+            data_points: 数据点列表
+            level: 告警级别
+
+        Returns:
+            所有算法的异常数据点列表（按算法顺序）
+        """
+        self.prepare_records(data_points)
+        try:
+            per_algorithm: list[list[BaseAnomalyPoint]] = [[] for _ in self.algorithms]
+            with self.history_planner.attached():
+                for dp in data_points:
+                    for anomalies, result in zip(per_algorithm, self._detect(dp), strict=True):
+                        for anomaly in result:
+                            anomaly.level = level
+                            anomalies.append(anomaly)
+            return [anomaly for anomalies in per_algorithm for anomaly in anomalies]
+        finally:
+            self.release_records(data_points)
+
+    def __repr__(self) -> str:
+        return (
+            f"<{self.__class__.__name__} algorithms={len(self.algorithms)} contexts={len(self.context_owners)} "
+            f"comparisons={len(self.comparisons)}>"
+        )
@@ -0,0 +1,266 @@
+"""
+TsDetect 环形缓冲区历史数据存储
+
+在进程内保存每条序列最近一段时间的数据，作为 IHistoryFetcher 直接回答历史数据查询，
+由检测数据流本身写入（DetectionPipeline 的 history_recorder），只有缺口才回退到较慢的获取器（如 TSDB）。
+
+使用示例：
+    store = RingBufferHistoryStore(interval=60, retention=86400, fallback=tsdb_fetcher)
+    algorithm = SimpleRingRatioAlgorithm(config=..., history_fetcher=store)
+    pipeline = DetectionPipeline(algorithm, window_size=1000, history_recorder=store)
+"""
+
+import math
+import threading
+from collections import OrderedDict
+from collections.abc import Iterable, Sequence
+
+from tsdetect.core.base import CompactDataPoint
+from tsdetect.core.dimensions import dimensions_digest
+from tsdetect.core.interfaces import IDataPoint, IHistoryFetcher
+from tsdetect.utils.optional import np, require_numpy
+
+# 空槽位的时间戳，任何时间槽都不会与之匹配
+_EMPTY = -(2**62)
+
+
+class SeriesRing:
+    """
+    单条序列的环形缓冲区
+
+    时间槽 slot = timestamp // interval 保存在 slot % capacity 处，
+    同时保存写入时的时间戳，用于判断槽位中的值是否属于所查询的时间槽。
+    值为 NaN 表示该时间槽已确认没有数据。
+    """
+
+    __slots__ = ("values", "timestamps", "last_slot")
+
+    def __init__(self, capacity: int):
+        self.values = np.full(capacity, np.nan, dtype=np.float64)
+        self.timestamps = np.full(capacity, _EMPTY, dtype=np.int64)
+        self.last_slot = _EMPTY
+
+
+class RingBufferHistoryStore(IHistoryFetcher):
+    """
+    环形缓冲区历史数据存储
+
+    每条序列（按维度摘要区分，与 record_id 的维度部分一致）一个固定间隔的 NumPy 环形缓冲区，
+    保存最近 retention 秒的数据。查询偏移量时直接由时间戳计算槽位，批量查询一次完成整组偏移量的索引。
+
+    未命中（从未写入、已被覆盖或超出保留范围）的偏移量批量交给 fallback 获取，结果回填到缓冲区，
+    不存在的历史点记为空值，之后不再重复查询。
+
+    内存占用约为 序列数 * (retention / interval) * 16 字节，
+    例如 1 万条序列、1 分钟间隔、保留 1 天约 230 MB；同比算法需要保留 7 天以上。
+    """
+
+    def __init__(
+        self,
+        interval: int = 60,
+        retention: int = 86400,
+        fallback: IHistoryFetcher | None = None,
+        max_series: int | None = 100000,
+    ):
+        """
+        初始化环形缓冲区历史数据存储
+
+        Args:
+            interval: 时间槽长度（秒），应与数据的采集间隔一致
+            retention: 保留时长（秒）
+            fallback: 缓冲区未命中时使用的历史数据获取器
+            max_series: 最多保存的序列数，超过时淘汰最久未写入的序列
+
+        Raises:
+            ImportError: 未安装 numpy
+        """
+        require_numpy("RingBufferHistoryStore")
+        if interval <= 0 or retention < interval:
+            raise ValueError("interval must be positive and retention must cover at least one interval")
+
+        self.interval = interval
+        self.retention = retention
+        self.capacity = retention // interval + 1
+        self.fallback = fallback
+        self.max_series = max_series
+        self._series: OrderedDict[str, SeriesRing] = OrderedDict()
+        self._lock = threading.Lock()
+
+        # 统计信息
+        self.hits = 0
+        self.misses = 0
+        self.fallback_calls = 0
+
+    def _series_key(self, data_point: IDataPoint) -> str:
+        return dimensions_digest(data_point.dimensions)
+
+    def _get_series(self, key: str) -> SeriesRing:
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = SeriesRing(self.capacity)
+            if self.max_series is not None and len(self._series) > self.max_series:
+                self._series.popitem(last=False)
+        else:
+            self._series.move_to_end(key)
+        return series
+
+    def _put(self, series: SeriesRing, timestamp: int, value: float):
+        """写入时间槽，超出保留范围的旧数据忽略"""
+        slot = timestamp // self.interval
+        if slot <= series.last_slot - self.capacity:
+            return
+        index = slot % self.capacity
+        series.values[index] = value
+        series.timestamps[index] = timestamp
+        if slot > series.last_slot:
+            series.last_slot = slot
+
+    def observe(self, data_point: IDataPoint):
+        """
+        记录数据点，作为后续检测的历史数据
+
+        Args:
+            data_point: 数据点
+        """
+        with self._lock:
+            self._put(self._get_series(self._series_key(data_point)), data_point.timestamp, float(data_point.value))
+
+    def observe_many(self, data_points: Iterable[IDataPoint]):
+        """
+        批量记录数据点
+
+        Args:
+            data_points: 数据点列表
+        """
+        with self._lock:
+            for dp in data_points:
+                self._put(self._get_series(self._series_key(dp)), dp.timestamp, float(dp.value))
+
+    def _lookup(self, data_point: IDataPoint, offsets: "np.ndarray") -> tuple[list[IDataPoint | None], tuple[int, ...]]:
+        """
+        从缓冲区查询一个数据点的全部偏移量
+
+        Returns:
+            (与偏移量对应的历史点列表, 未命中的偏移量下标)
+        """
+        size = len(offsets)
+        series = self._series.get(self._series_key(data_point))
+        if series is None:
+            self.misses += size
+            return [None] * size, tuple(range(size))
+
+        wanted = data_point.timestamp - offsets
+        slots = wanted // self.interval
+        indexes = slots % self.capacity
+        stored = series.timestamps[indexes]
+        known = (stored // self.interval == slots).tolist()
+        values = series.values[indexes].tolist()
+        stored = stored.tolist()
+
+        points: list[IDataPoint | None] = []
+        missed = []
+        for i in range(size):
+            if not known[i]:
+                points.append(None)
+                missed.append(i)
+            elif math.isnan(values[i]):
+                points.append(None)
+            else:
+                points.append(
+                    CompactDataPoint(
+                        value=values[i],
+                        timestamp=stored[i],
+                        unit=data_point.unit,
+                        dimensions=data_point.dimensions,
+                    )
+                )
+        self.misses += len(missed)
+        self.hits += size - len(missed)
+        return points, tuple(missed)
+
+    def _backfill(self, data_point: IDataPoint, offset: int, point: IDataPoint | None):
+        """回填获取器的结果，不存在的历史点记为 NaN"""
+        series = self._get_series(self._series_key(data_point))
+        self._put(series, data_point.timestamp - offset, float(point.value) if point is not None else math.nan)
+
+    def fetch(self, data_point: IDataPoint, offsets: Sequence[int]) -> list[IDataPoint | None]:
+        """
+        获取单个数据点的历史数据
+
+        Args:
+            data_point: 当前数据点
+            offsets: 时间偏移列表（秒）
+
+        Returns:
+            与偏移量对应的历史数据点列表
+        """
+        offsets = list(offsets)
+        with self._lock:
+            points, missed = self._lookup(data_point, np.asarray(offsets, dtype=np.int64))
+        if not missed or self.fallback is None:
+            return points
+
+        missed_offsets = [offsets[i] for i in missed]
+        fetched = self.fallback.fetch(data_point, missed_offsets)
+        with self._lock:
+            self.fallback_calls += 1
+            for i, offset, point in zip(missed, missed_offsets, fetched, strict=False):
+                points[i] = point
+                self._backfill(data_point, offset, point)
+        return points
+
+    def batch_fetch(
+        self, data_points: Sequence[IDataPoint], offsets: Sequence[int]
+    ) -> dict[str, list[IDataPoint | None]]:
+        """
+        批量获取历史数据
+
+        缓冲区未命中的数据点按未命中的偏移量分组，每组调用一次 fallback.batch_fetch。
+
+        Args:
+            data_points: 数据点列表
+            offsets: 时间偏移列表（秒）
+
+        Returns:
+            {record_id: 与偏移量对应的历史数据点列表}
+        """
+        offsets = list(offsets)
+        offset_array = np.asarray(offsets, dtype=np.int64)
+        result: dict[str, list[IDataPoint | None]] = {}
+        pending: dict[tuple[int, ...], list[IDataPoint]] = {}
+        with self._lock:
+            for dp in data_points:
+                points, missed = self._lookup(dp, offset_array)
+                result[dp.record_id] = points
+                if missed:
+                    pending.setdefault(missed, []).append(dp)
+
+        if not pending or self.fallback is None:
+            return result
+
+        for missed, points in pending.items():
+            missed_offsets = [offsets[i] for i in missed]
+            fetched = self.fallback.batch_fetch(points, missed_offsets)
+            with self._lock:
+                self.fallback_calls += 1
+                for dp in points:
+                    history = fetched.get(dp.record_id) or []
+                    target = result[dp.record_id]
+                    for i, offset, point in zip(missed, missed_offsets, history, strict=False):
+                        target[i] = point
+                        self._backfill(dp, offset, point)
+        return result
+
+    def clear(self):
+        """清空所有序列"""
+        with self._lock:
+            self._series.clear()
+
+    def __len__(self) -> int:
+        return len(self._series)
+
+    def __repr__(self) -> str:
+        return (
+            f"<{self.__class__.__name__} interval={self.interval} retention={self.retention} "
+            f"series={len(self)} hits={self.hits} misses={self.misses}>"
+        )
@@ -0,0 +1,331 @@
+"""
+TsDetect 历史数据快照
+
+将多条序列导出为列式快照目录，回放时以内存映射方式读取，作为离线回测的历史数据源：
+    - values.npy：float64 数值，按（序列, 时间戳）排序
+    - timestamps.npy：int64 时间戳（秒），与 values 一一对应
+    - index.json：序列字典，每条序列的维度、单位和在数组中的行范围 [start, stop)
+
+读取时数组通过 np.load(mmap_mode="r") 映射，单条序列的数据是数组的切片（零拷贝），
+只有 index.json 需要解析。
+
+使用示例：
+    with SnapshotWriter("/data/snapshots/cpu-2024w01") as writer:
+        writer.add_many(data_points)
+
+    snapshot = HistorySnapshot("/data/snapshots/cpu-2024w01")
+    fetcher = MmapHistoryFetcher(snapshot)
+    algorithm = SimpleYearRoundAlgorithm(config=..., history_fetcher=fetcher)
+    algorithm.detect_records(list(snapshot.iter_points(start=replay_start)))
+"""
+
+import json
+import os
+from array import array
+from collections.abc import Iterable, Iterator, Sequence
+from typing import Any
+
+from tsdetect.core.base import CompactDataPoint
+from tsdetect.core.dimensions import canonical_dimension_key, dimensions_digest
+from tsdetect.core.interfaces import IDataPoint, IHistoryFetcher
+from tsdetect.utils.optional import np, require_numpy
+
+SNAPSHOT_VERSION = 1
+
+VALUES_FILE = "values.npy"
+TIMESTAMPS_FILE = "timestamps.npy"
+INDEX_FILE = "index.json"
+
+
+class SnapshotWriter:
+    """
+    快照写入器
+
+    数据点按序列缓存在紧凑数组中，close 时每条序列按时间戳排序（同一时间戳保留最后写入的值）后写入快照目录。
+    """
+
+    def __init__(self, path: str):
+        """
+        初始化快照写入器
+
+        Args:
+            path: 快照目录，不存在时创建
+
+        Raises:
+            ImportError: 未安装 numpy
+        """
+        require_numpy("history snapshots")
+        self.path = path
+        self._series: dict[tuple, tuple[dict[str, Any], str, array, array]] = {}
+        self.closed = False
+
+    def add(self, data_point: IDataPoint):
+        """
+        写入数据点
+
+        Args:
+            data_point: 数据点
+        """
+        dimensions = data_point.dimensions
+        key = canonical_dimension_key(dimensions)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = (dict(dimensions), data_point.unit, array("q"), array("d"))
+        series[2].append(int(data_point.timestamp))
+        series[3].append(float(data_point.value))
+
+    def add_many(self, data_points: Iterable[IDataPoint]):
+        """
+        批量写入数据点
+
+        Args:
+            data_points: 数据点列表
+        """
+        for dp in data_points:
+            self.add(dp)
+
+    def close(self):
+        """写入快照目录"""
+        if self.closed:
+            return
+        self.closed = True
+
+        timestamps_parts = []
+        values_parts = []
+        series_index = []
+        row = 0
+        for dimensions, unit, timestamps, values in self._series.values():
+            ts = np.frombuffer(timestamps, dtype=np.int64)
+            vs = np.frombuffer(values, dtype=np.float64)
+            order = np.argsort(ts, kind="stable")
+            ts, vs = ts[order], vs[order]
+            # 同一时间戳保留最后写入的值
+            keep = np.append(ts[1:] != ts[:-1], True)
+            ts, vs = ts[keep], vs[keep]
+
+            timestamps_parts.append(ts)
+            values_parts.append(vs)
+            series_index.append({"dimensions": dimensions, "unit": unit, "start": row, "stop": row + len(ts)})
+            row += len(ts)
+
+        os.makedirs(self.path, exist_ok=True)
+        np.save(
+            os.path.join(self.path, TIMESTAMPS_FILE),
+            np.concatenate(timestamps_parts) if timestamps_parts else np.empty(0, dtype=np.int64),
+        )
+        np.save(
+            os.path.join(self.path, VALUES_FILE),
+            np.concatenate(values_parts) if values_parts else np.empty(0, dtype=np.float64),
+        )
+        with open(os.path.join(self.path, INDEX_FILE), "w") as f:
+            json.dump({"version": SNAPSHOT_VERSION, "rows": row, "series": series_index}, f)
+
+        self._series.clear()
+
+    def __enter__(self) -> "SnapshotWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        # 出错时不写入不完整的快照
+        if exc_type is None:
+            self.close()
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} path={self.path!r} series={len(self._series)}>"
+
+
+def write_snapshot(path: str, data_points: Iterable[IDataPoint]) -> str:
+    """
+    快捷写入快照
+
+    Args:
+        path: 快照目录
+        data_points: 数据点迭代器
+
+    Returns:
+        快照目录
+    """
+    with SnapshotWriter(path) as writer:
+        writer.add_many(data_points)
+    return path
+
+
+class HistorySnapshot:
+    """
+    内存映射的历史数据快照
+
+    Attributes:
+        values: 全部数值（只读内存映射）
+        timestamps: 全部时间戳（只读内存映射）
+        dimensions: 各序列的维度
+        units: 各序列的单位
+    """
+
+    def __init__(self, path: str):
+        """
+        打开快照
+
+        Args:
+            path: 快照目录
+
+        Raises:
+            ImportError: 未安装 numpy
+            ValueError: 快照版本不受支持
+        """
+        require_numpy("history snapshots")
+        self.path = path
+        with open(os.path.join(path, INDEX_FILE)) as f:
+            index = json.load(f)
+        if index.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported snapshot version: {index.get('version')}")
+
+        self.values = np.load(os.path.join(path, VALUES_FILE), mmap_mode="r")
+        self.timestamps = np.load(os.path.join(path, TIMESTAMPS_FILE), mmap_mode="r")
+
+        series = index["series"]
+        self.dimensions: list[dict[str, Any]] = [s["dimensions"] for s in series]
+        self.units: list[str] = [s["unit"] for s in series]
+        self._bounds: list[tuple[int, int]] = [(s["start"], s["stop"]) for s in series]
+        # 摘要按当前进程的维度摘要算法计算
+        self._series_ids = {dimensions_digest(dims): i for i, dims in enumerate(self.dimensions)}
+        # 按时间顺序回放时的行顺序和行所属序列，首次回放时计算
+        self._time_order = None
+        self._ordered_timestamps = None
+        self._row_series = None
+
+    def series_id(self, dimensions: dict[str, Any]) -> int | None:
+        """
+        根据维度查找序列编号
+
+        Args:
+            dimensions: 维度字典
+
+        Returns:
+            序列编号，不存在返回 None
+        """
+        return self._series_ids.get(dimensions_digest(dimensions))
+
+    def series(self, series_id: int) -> tuple["np.ndarray", "np.ndarray"]:
+        """
+        获取序列的数据（零拷贝切片）
+
+        Args:
+            series_id: 序列编号
+
+        Returns:
+            (时间戳数组, 数值数组)，按时间戳递增
+        """
+        start, stop = self._bounds[series_id]
+        return self.timestamps[start:stop], self.values[start:stop]
+
+    def iter_points(self, start: int | None = None, end: int | None = None) -> Iterator[CompactDataPoint]:
+        """
+        按时间顺序回放数据点
+
+        Args:
+            start: 起始时间戳（含），None 表示不限制
+            end: 结束时间戳（不含），None 表示不限制
+
+        Yields:
+            数据点，时间戳相同时按序列顺序
+        """
+        if self._time_order is None:
+            self._time_order = np.argsort(self.timestamps, kind="stable")
+            row_series = np.zeros(len(self.timestamps), dtype=np.int64)
+            for series_id, (lo, hi) in enumerate(self._bounds):
+                row_series[lo:hi] = series_id
+            self._row_series = row_series
+            self._ordered_timestamps = self.timestamps[self._time_order]
+
+        order = self._time_order
+        ordered_ts = self._ordered_timestamps
+        lo = 0 if start is None else int(np.searchsorted(ordered_ts, start, side="left"))
+        hi = len(order) if end is None else int(np.searchsorted(ordered_ts, end, side="left"))
+
+        rows = order[lo:hi]
+        for series_id, timestamp, value in zip(
+            self._row_series[rows].tolist(),
+            ordered_ts[lo:hi].tolist(),
+            self.values[rows].tolist(),
+            strict=True,
+        ):
+            yield CompactDataPoint(
+                value=value,
+                timestamp=timestamp,
+                unit=self.units[series_id],
+                dimensions=self.dimensions[series_id],
+            )
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} path={self.path!r} series={len(self.dimensions)} rows={len(self)}>"
+
+
+class MmapHistoryFetcher(IHistoryFetcher):
+    """
+    基于快照的历史数据获取器
+
+    在序列的时间戳切片上二分查找 dp.timestamp - offset，整组偏移量一次 searchsorted 完成；
+    只返回时间戳精确匹配的数据点。
+    """
+
+    def __init__(self, snapshot: HistorySnapshot | str):
+        """
+        初始化获取器
+
+        Args:
+            snapshot: 快照或快照目录
+        """
+        self.snapshot = snapshot if isinstance(snapshot, HistorySnapshot) else HistorySnapshot(snapshot)
+
+    def fetch(self, data_point: IDataPoint, offsets: Sequence[int]) -> list[IDataPoint | None]:
+        """
+        获取单个数据点的历史数据
+
+        Args:
+            data_point: 当前数据点
+            offsets: 时间偏移列表（秒）
+
+        Returns:
+            与偏移量对应的历史数据点列表
+        """
+        snapshot = self.snapshot
+        series_id = snapshot.series_id(data_point.dimensions)
+        if series_id is None:
+            return [None] * len(offsets)
+
+        timestamps, values = snapshot.series(series_id)
+        if not len(timestamps):
+            return [None] * len(offsets)
+
+        wanted = data_point.timestamp - np.asarray(offsets, dtype=np.int64)
+        positions = np.minimum(np.searchsorted(timestamps, wanted), len(timestamps) - 1)
+        matched = (timestamps[positions] == wanted).tolist()
+        found = values[positions].tolist()
+
+        unit = snapshot.units[series_id]
+        dimensions = data_point.dimensions
+        return [
+            CompactDataPoint(value=value, timestamp=timestamp, unit=unit, dimensions=dimensions) if hit else None
+            for hit, value, timestamp in zip(matched, found, wanted.tolist(), strict=True)
+        ]
+
+    def batch_fetch(
+        self, data_points: Sequence[IDataPoint], offsets: Sequence[int]
+    ) -> dict[str, list[IDataPoint | None]]:
+        """
+        批量获取历史数据
+
+        Args:
+            data_points: 数据点列表
+            offsets: 时间偏移列表（秒）
+
+        Returns:
+            {record_id: 与偏移量对应的历史数据点列表}
+        """
+        return {dp.record_id: self.fetch(dp, offsets) for dp in data_points}
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} snapshot={self.snapshot!r}>"
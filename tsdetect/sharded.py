@@ -0,0 +1,282 @@
+"""
+TsDetect 多进程分片检测
+
+历史数据加载完成后检测是纯 CPU 计算，受 GIL 限制单进程只能使用一个核。
+ShardedDetector 按序列（record_id 中的维度摘要）把一批数据点划分到多个工作进程：
+    - 向工作进程传输算法配置（AlgorithmSpec）而不是算法实例，每个进程只构造一次算法
+    - 数据点以 DataPointBlock 的定长数组传输，而不是逐个序列化数据点对象
+    - 结果按（算法顺序, 输入顺序）合并，与单进程依次执行各算法的顺序一致
+
+使用示例：
+    specs = [AlgorithmSpec("Threshold", [[{"method": "gt", "threshold": 90}]])]
+    with ShardedDetector(specs, workers=16) as detector:
+        anomalies = detector.detect_records(points)
+"""
+
+import os
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+
+from tsdetect.algorithms import get_algorithm
+from tsdetect.core.algorithms import BaseAlgorithm, BaseAlgorithmCollection
+from tsdetect.core.base import BaseAnomalyPoint
+from tsdetect.core.block import DataPointBlock
+from tsdetect.core.exceptions import DetectionError
+from tsdetect.core.interfaces import IDataPoint
+
+# 工作进程内构造的算法实例（由 _init_worker 设置）
+_worker_algorithms: list[BaseAlgorithm] = []
+
+
+class AlgorithmSpec:
+    """
+    算法配置
+
+    可序列化的算法描述，在工作进程中通过 build 重建算法实例。
+    options 中的参数（如 history_fetcher）同样会被传输到工作进程，需要支持 pickle。
+    """
+
+    __slots__ = ("algorithm", "config", "options")
+
+    def __init__(self, algorithm: str | type[BaseAlgorithm], config: Any = None, **options):
+        """
+        初始化算法配置
+
+        Args:
+            algorithm: 算法注册名称（见 ALGORITHM_REGISTRY）或算法类
+            config: 算法配置
+            **options: 其他构造参数（unit、history_fetcher 等）
+        """
+        self.algorithm = algorithm
+        self.config = config
+        self.options = options
+
+    def build(self) -> BaseAlgorithm:
+        """
+        构造算法实例
+
+        Returns:
+            算法实例
+
+        Raises:
+            KeyError: 算法不存在
+        """
+        algorithm_class = get_algorithm(self.algorithm) if isinstance(self.algorithm, str) else self.algorithm
+        return algorithm_class(config=self.config, **self.options)
+
+    def __getstate__(self):
+        return self.algorithm, self.config, self.options
+
+    def __setstate__(self, state):
+        self.algorithm, self.config, self.options = state
+
+    def __repr__(self) -> str:
+        name = self.algorithm if isinstance(self.algorithm, str) else self.algorithm.__name__
+        return f"<{self.__class__.__name__} algorithm={name}>"
+
+
+def _init_worker(specs: Sequence[AlgorithmSpec]):
+    """工作进程初始化：构造算法实例"""
+    global _worker_algorithms
+    _worker_algorithms = [spec.build() for spec in specs]
+
+
+def _child_indexes(algorithm: BaseAlgorithm, anomaly: BaseAnomalyPoint) -> list[int]:
+    """子检测器在算法检测器列表中的位置"""
+    if not isinstance(algorithm, BaseAlgorithmCollection):
+        return []
+    return [algorithm.detectors.index(detector) for detector in anomaly.child_detectors]
+
+
+def _detect_shard(block: DataPointBlock, level: int, with_context: bool) -> list[tuple]:
+    """
+    在工作进程中检测一个分片
+
+    Returns:
+        [(算法序号, 分片内行号, 异常消息, 异常 ID, 异常时间, 子检测器序号, 上下文)]
+
+    Raises:
+        DetectionError: 异常点的数据点不属于该分片
+    """
+    points = list(block)
+    rows = {id(dp): row for row, dp in enumerate(points)}
+    # 部分算法（如智能检测）会用新的数据点对象创建异常点，按 record_id 对应回行号
+    record_rows = {dp.record_id: row for row, dp in reversed(list(enumerate(points)))}
+
+    results = []
+    for algo_index, algorithm in enumerate(_worker_algorithms):
+        try:
+            anomalies = algorithm.detect_records(points, level=level)
+        finally:
+            algorithm.release_records(points)
+
+        for anomaly in anomalies:
+            record_id = anomaly.data_point.record_id
+            row = rows.get(id(anomaly.data_point), record_rows.get(record_id))
+            if row is None:
+                raise DetectionError(
+                    f"Anomaly data point is not in the shard: record_id={record_id}",
+                    algorithm=type(algorithm).__name__,
+                )
+            results.append(
+                (
+                    algo_index,
+                    row,
+                    anomaly.anomaly_message,
+                    anomaly.anomaly_id,
+                    anomaly.anomaly_time,
+                    _child_indexes(algorithm, anomaly),
+                    anomaly.context if with_context else None,
+                )
+            )
+    return results
+
+
+class ShardedDetector:
+    """
+    多进程分片检测器
+
+    进程池在首次检测时创建并在多次检测之间复用，使用完毕后调用 close（或使用 with 语句）。
+    同一序列（相同维度）的数据点总是落在同一分片，依赖序列内连续数据的算法（如增量基线）行为不变。
+    """
+
+    def __init__(
+        self,
+        specs: Sequence[AlgorithmSpec],
+        workers: int | None = None,
+        level: int = 1,
+        with_context: bool = False,
+        mp_context=None,
+    ):
+        """
+        初始化分片检测器
+
+        Args:
+            specs: 算法配置列表
+            workers: 工作进程数，默认为 CPU 核数
+            level: 告警级别
+            with_context: 是否把检测上下文传回主进程（上下文需要支持 pickle），默认不传输
+            mp_context: multiprocessing 上下文，默认使用平台默认的启动方式
+        """
+        workers = workers or os.cpu_count() or 1
+        if workers <= 0:
+            raise ValueError("workers must be positive")
+
+        self.specs = list(specs)
+        self.workers = workers
+        self.level = level
+        self.with_context = with_context
+        self.mp_context = mp_context
+
+        # 主进程中的算法实例，用作异常点的 detector
+        self.algorithms = [spec.build() for spec in self.specs]
+        self._executor: ProcessPoolExecutor | None = None
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        """进程池（首次访问时创建）"""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=self.mp_context,
+                initializer=_init_worker,
+                initargs=(self.specs,),
+            )
+        return self._executor
+
+    def partition(self, block: DataPointBlock) -> list[list[int]]:
+        """
+        按序列哈希划分分片
+
+        Args:
+            block: 数据点块
+
+        Returns:
+            每个分片包含的行号列表，空分片被省略
+        """
+        shard_of_dimension: dict[int, int] = {}
+        shards: list[list[int]] = [[] for _ in range(self.workers)]
+
+        for row, dim_id in enumerate(block.dimension_ids):
+            shard = shard_of_dimension.get(dim_id)
+            if shard is None:
+                shard = shard_of_dimension[dim_id] = int(block.dimension_digest(dim_id)[:8], 16) % self.workers
+            shards[shard].append(row)
+        return [rows for rows in shards if rows]
+
+    def detect_records(self, data_points: Sequence[IDataPoint] | DataPointBlock) -> list[BaseAnomalyPoint]:
+        """
+        分片并行检测
+
+        Args:
+            data_points: 数据点列表或数据点块
+
+        Returns:
+            异常数据点列表，按算法顺序、同一算法内按输入顺序排列
+
+        Raises:
+            DetectionError: 分片返回的异常点无法对应到输入数据点
+        """
+        if isinstance(data_points, DataPointBlock):
+            block = data_points
+            points: Sequence[IDataPoint] = data_points
+        else:
+            points = list(data_points)
+            block = DataPointBlock.from_points(points)
+        if not len(block):
+            return []
+
+        shards = self.partition(block)
+        futures = [
+            self.executor.submit(_detect_shard, block.take(rows, compact=True), self.level, self.with_context)
+            for rows in shards
+        ]
+
+        merged = []
+        for rows, future in zip(shards, futures, strict=True):
+            for algo_index, row, *fields in future.result():
+                merged.append((algo_index, rows[row], fields))
+        merged.sort(key=lambda item: (item[0], item[1]))
+
+        return [self._restore(points[row], algo_index, *fields) for algo_index, row, fields in merged]
+
+    def _restore(
+        self,
+        data_point: IDataPoint,
+        algo_index: int,
+        message: str,
+        anomaly_id: str,
+        anomaly_time: str,
+        child_indexes: list[int],
+        context: dict[str, Any] | None,
+    ) -> BaseAnomalyPoint:
+        """在主进程中重建异常点"""
+        algorithm = self.algorithms[algo_index]
+        anomaly = BaseAnomalyPoint(
+            data_point=data_point,
+            detector=algorithm,
+            anomaly_message=message,
+            anomaly_id=anomaly_id,
+            context=context,
+        )
+        anomaly.anomaly_time = anomaly_time
+        anomaly.level = self.level
+        for index in child_indexes:
+            anomaly.add_child_detector(algorithm.detectors[index])
+        return anomaly
+
+    def close(self):
+        """关闭进程池"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self) -> "ShardedDetector":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} algorithms={len(self.specs)} workers={self.workers}>"
@@ -0,0 +1,265 @@
+"""
+TsDetect 流式检测
+
+以固定大小的窗口消费数据流（同步或异步迭代器），
+窗口内批量预加载历史数据后检测，并以生成器的形式逐个产出异常点。
+内存占用由窗口大小决定，与输入总量无关。
+
+使用示例：
+    pipeline = DetectionPipeline(algorithm, window_size=500)
+    for anomaly in pipeline.run(kafka_consumer_records()):
+        send_alert(anomaly)
+"""
+
+import asyncio
+import logging
+from collections.abc import AsyncIterable, AsyncIterator, Callable, Iterable, Iterator
+from typing import Any
+
+from tsdetect.core.algorithms import BaseAlgorithm
+from tsdetect.core.base import BaseAnomalyPoint, SimpleDataPoint
+from tsdetect.core.exceptions import InvalidDataPointError
+from tsdetect.core.interfaces import IDataPoint
+from tsdetect.core.ringbuffer import RingBufferHistoryStore
+
+logger = logging.getLogger(__name__)
+
+# 原始记录 -> 数据点
+PointFactory = Callable[[dict[str, Any]], IDataPoint]
+
+
+class DetectionPipeline:
+    """
+    流式检测管道
+
+    每凑满 window_size 条记录执行一次：
+        1. algorithm.prepare_records：批量预加载（历史数据走 IHistoryFetcher.batch_fetch）
+        2. 逐点检测并产出异常点
+        3. algorithm.release_records：释放该窗口的预加载数据
+        4. 设置 history_recorder 时，将该窗口的数据点写入本地历史存储，供后续窗口查询
+    """
+
+    def __init__(
+        self,
+        algorithm: BaseAlgorithm,
+        window_size: int = 1000,
+        level: int = 1,
+        point_factory: PointFactory = SimpleDataPoint,
+        strict: bool = False,
+        history_recorder: RingBufferHistoryStore | None = None,
+    ):
+        """
+        初始化流式检测管道
+
+        Args:
+            algorithm: 检测算法
+            window_size: 窗口大小（每批记录数）
+            level: 告警级别
+            point_factory: 原始字典转换为数据点的工厂函数
+            strict: 遇到无效记录时是否抛出异常，默认记录日志后跳过
+            history_recorder: 记录已检测数据点的本地历史存储（通常同时作为算法的 history_fetcher）
+        """
+        if window_size <= 0:
+            raise ValueError("window_size must be positive")
+
+        self.algorithm = algorithm
+        self.window_size = window_size
+        self.level = level
+        self.point_factory = point_factory
+        self.strict = strict
+        self.history_recorder = history_recorder
+
+        # 统计信息
+        self.processed = 0
+        self.skipped = 0
+        self.anomaly_count = 0
+
+    def _to_point(self, record: dict[str, Any] | IDataPoint) -> IDataPoint | None:
+        """原始记录转换为数据点，无效记录返回 None"""
+        if isinstance(record, IDataPoint):
+            return record
+
+        try:
+            return self.point_factory(record)
+        except InvalidDataPointError as e:
+            if self.strict:
+                raise
+            self.skipped += 1
+            logger.warning(f"Skip invalid record: {e}")
+            return None
+
+    def detect_window(self, data_points: list[IDataPoint]) -> list[BaseAnomalyPoint]:
+        """
+        检测一个窗口的数据点
+
+        Args:
+            data_points: 数据点列表
+
+        Returns:
+            异常数据点列表
+        """
+        if not data_points:
+            return []
+
+        try:
+            anomalies = self.algorithm.detect_records(data_points, level=self.level)
+        finally:
+            self.algorithm.release_records(data_points)
+
+        # 检测完成后再记录，窗口内的数据点不会作为彼此的历史数据
+        if self.history_recorder is not None:
+            self.history_recorder.observe_many(data_points)
+
+        self.processed += len(data_points)
+        self.anomaly_count += len(anomalies)
+        return anomalies
+
+    async def adetect_window(self, data_points: list[IDataPoint]) -> list[BaseAnomalyPoint]:
+        """
+        异步检测一个窗口的数据点
+
+        预加载（如异步历史数据查询）在事件循环中并发执行，检测在线程中执行。
+
+        Args:
+            data_points: 数据点列表
+
+        Returns:
+            异常数据点列表
+        """
+        if not data_points:
+            return []
+
+        try:
+            await self.algorithm.aprepare_records(data_points)
+        except Exception:
+            self.algorithm.release_records(data_points)
+            raise
+        return await asyncio.to_thread(self.detect_window, data_points)
+
+    def windows(self, records: Iterable[dict[str, Any] | IDataPoint]) -> Iterator[list[IDataPoint]]:
+        """
+        将记录流切分为窗口
+
+        Args:
+            records: 原始记录或数据点的迭代器
+
+        Yields:
+            数据点窗口
+        """
+        window: list[IDataPoint] = []
+        for record in records:
+            dp = self._to_point(record)
+            if dp is None:
+                continue
+            window.append(dp)
+            if len(window) >= self.window_size:
+                yield window
+                window = []
+
+        if window:
+            yield window
+
+    def run(self, records: Iterable[dict[str, Any] | IDataPoint]) -> Iterator[BaseAnomalyPoint]:
+        """
+        同步流式检测
+
+        Args:
+            records: 原始记录或数据点的迭代器
+
+        Yields:
+            异常数据点
+        """
+        for window in self.windows(records):
+            yield from self.detect_window(window)
+
+    async def arun(
+        self,
+        records: AsyncIterable[dict[str, Any] | IDataPoint] | Iterable[dict[str, Any] | IDataPoint],
+        max_wait: float | None = None,
+    ) -> AsyncIterator[BaseAnomalyPoint]:
+        """
+        异步流式检测
+
+        预加载通过 algorithm.aprepare_records 异步执行，检测在线程中执行，不阻塞事件循环。
+
+        Args:
+            records: 原始记录或数据点的（异步）迭代器
+            max_wait: 窗口最长等待时间（秒），超时后即使未凑满也立即检测，
+                适用于流量较低的持续数据流；None 表示只按窗口大小切分
+
+        Yields:
+            异常数据点
+        """
+        if not isinstance(records, AsyncIterable):
+            for window in self.windows(records):
+                for anomaly in await self.adetect_window(window):
+                    yield anomaly
+            return
+
+        iterator = aiter(records)
+        window: list[IDataPoint] = []
+        pending: asyncio.Future | None = None
+        loop = asyncio.get_running_loop()
+        deadline: float | None = None
+
+        try:
+            while True:
+                if pending is None:
+                    pending = asyncio.ensure_future(anext(iterator))
+
+                timeout = None
+                if max_wait is not None and window:
+                    timeout = max(deadline - loop.time(), 0)
+
+                done, _ = await asyncio.wait({pending}, timeout=timeout)
+
+                if not done:
+                    # 等待超时，先检测已收到的记录，未完成的读取继续保留
+                    flushed, window = window, []
+                    for anomaly in await self.adetect_window(flushed):
+                        yield anomaly
+                    continue
+
+                try:
+                    record = pending.result()
+                except StopAsyncIteration:
+                    pending = None
+                    break
+                pending = None
+
+                dp = self._to_point(record)
+                if dp is None:
+                    continue
+                if not window and max_wait is not None:
+                    deadline = loop.time() + max_wait
+                window.append(dp)
+
+                if len(window) >= self.window_size:
+                    flushed, window = window, []
+                    for anomaly in await self.adetect_window(flushed):
+                        yield anomaly
+
+            if window:
+                for anomaly in await self.adetect_window(window):
+                    yield anomaly
+        finally:
+            if pending is not None and not pending.done():
+                pending.cancel()
+
+
+def detect_stream(
+    algorithm: BaseAlgorithm, records: Iterable[dict[str, Any] | IDataPoint], window_size: int = 1000, level: int = 1
+) -> Iterator[BaseAnomalyPoint]:
+    """
+    快捷流式检测
+
+    Args:
+        algorithm: 检测算法
+        records: 原始记录或数据点的迭代器
+        window_size: 窗口大小
+        level: 告警级别
+
+    Yields:
+        异常数据点
+    """
+    return DetectionPipeline(algorithm, window_size=window_size, level=level).run(records)
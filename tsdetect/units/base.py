@@ -4,10 +4,76 @@ TsDetect 单位转换系统
 提供可插拔的单位转换功能。
 """
 
+import bisect
 from abc import ABC
+from typing import Any
 
 from tsdetect.core.interfaces import IUnitConverter
 
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy 为可选依赖（tsdetect[full]）
+    np = None
+
+
+class UnitScale:
+    """
+    单位组的显示单位选择表
+
+    auto_convert 按组内顺序选择第一个使 1 <= |值| < 1000 的单位，都不满足时使用最后一个单位。
+    该规则只与最小单位下的 |值| 有关，且在各单位的区间端点 |m|、1000|m| 之间保持不变，
+    因此预先计算有序的端点和每段选中的单位，查询时二分查找即可。
+    """
+
+    __slots__ = ("units", "breakpoints", "selections", "_arrays")
+
+    def __init__(self, units: list[str], multipliers: dict[str, float]):
+        """
+        初始化选择表
+
+        Args:
+            units: 组内单位（按选择顺序）
+            multipliers: 单位乘数映射
+        """
+        self.units = tuple(units)
+        scales = [(unit, multipliers.get(unit, 1)) for unit in self.units]
+
+        # 乘数为 0 时不做换算，区间按乘数 1 计算
+        bounds = [abs(multiplier) if multiplier else 1 for _, multiplier in scales]
+        self.breakpoints = sorted({b for bound in bounds for b in (bound, bound * 1000)})
+
+        def select(magnitude: float) -> tuple[str, float]:
+            for (unit, multiplier), bound in zip(scales, bounds, strict=True):
+                if bound <= magnitude < bound * 1000:
+                    return unit, multiplier
+            return scales[-1]
+
+        # selections[i] 对应 |值| 落在 [breakpoints[i-1], breakpoints[i]) 的情况
+        self.selections: list[tuple[str, float]] = [select(0.0)] + [select(b) for b in self.breakpoints]
+        self._arrays = None
+
+    def select(self, magnitude: float) -> tuple[str, float]:
+        """
+        根据最小单位下的 |值| 选择显示单位
+
+        Returns:
+            (单位, 乘数)
+        """
+        return self.selections[bisect.bisect_right(self.breakpoints, magnitude)]
+
+    def arrays(self) -> tuple[Any, Any, Any]:
+        """端点、选中单位、选中乘数的 NumPy 数组（首次调用时创建）"""
+        if self._arrays is None:
+            self._arrays = (
+                np.asarray(self.breakpoints, dtype=np.float64),
+                np.asarray([unit for unit, _ in self.selections], dtype=object),
+                np.asarray([multiplier for _, multiplier in self.selections], dtype=np.float64),
+            )
+        return self._arrays
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} units={list(self.units)}>"
+
 
 class BaseUnitConverter(IUnitConverter, ABC):
     """
@@ -64,6 +130,85 @@ class BaseUnitConverter(IUnitConverter, ABC):
         """
         return self.convert(value, unit, None)
 
+    def rebuild_unit_index(self):
+        """
+        重建单位索引：单位 -> 所属单位组（第一个包含该单位的组）的选择表
+
+        修改 UNIT_MULTIPLIERS / UNIT_GROUPS 后需要调用。
+        """
+        index: dict[str, UnitScale] = {}
+        for units in self.UNIT_GROUPS.values():
+            if not units:
+                continue
+            scale = UnitScale(units, self.UNIT_MULTIPLIERS)
+            for unit in units:
+                index.setdefault(unit, scale)
+        self._unit_index = index
+
+    def unit_scale(self, unit: str) -> UnitScale | None:
+        """
+        获取单位所属单位组的选择表
+
+        Args:
+            unit: 单位
+
+        Returns:
+            选择表，单位不属于任何组时返回 None
+        """
+        index = self.__dict__.get("_unit_index")
+        if index is None:
+            self.rebuild_unit_index()
+            index = self._unit_index
+        return index.get(unit)
+
+    def _scale_auto_convert(self, value: float, scale: UnitScale, unit: str, decimal: int) -> tuple[float, str]:
+        """按选择表选择显示单位"""
+        min_value = self.convert(value, unit, None)
+        best_unit, multiplier = scale.select(abs(min_value))
+        converted = min_value / multiplier if multiplier else min_value
+        return round(converted, decimal), best_unit
+
+    def auto_convert_many(self, values, unit: str, decimal: int | None = None) -> tuple[Any, Any]:
+        """
+        批量自动选择显示单位
+
+        对整列数据用 searchsorted 选择显示单位，结果与逐个调用 auto_convert 一致
+        （舍入使用 numpy.round，在个别舍入边界上可能与内置 round 相差一个末位）。
+
+        Args:
+            values: 数值数组
+            unit: 原始单位
+            decimal: 小数位数
+
+        Returns:
+            (转换后的值数组, 单位数组)
+
+        Raises:
+            ImportError: 未安装 numpy
+        """
+        if np is None:
+            raise ImportError("auto_convert_many requires numpy, install it with `pip install tsdetect[full]`")
+        if decimal is None:
+            decimal = getattr(self, "default_decimal", 2)
+
+        values = np.asarray(values, dtype=np.float64)
+        scale = self._auto_convert_scale(unit)
+        if scale is None:
+            return np.round(values, decimal), np.full(values.shape, unit or "", dtype=object)
+
+        min_values = np.asarray(self.convert(values, unit, None), dtype=np.float64)
+        breakpoints, units, multipliers = scale.arrays()
+        index = np.searchsorted(breakpoints, np.abs(min_values), side="right")
+        selected = multipliers[index]
+        converted = np.where(selected != 0, min_values / np.where(selected != 0, selected, 1), min_values)
+        return np.round(converted, decimal), units[index]
+
+    def _auto_convert_scale(self, unit: str) -> UnitScale | None:
+        """auto_convert 使用的选择表，不做单位换算时返回 None"""
+        if not unit:
+            return None
+        return self.unit_scale(unit)
+
 
 class NoOpUnitConverter(BaseUnitConverter):
     """
@@ -163,6 +308,7 @@ class SimpleUnitConverter(BaseUnitConverter):
             default_decimal: 默认小数位数
         """
         self.default_decimal = default_decimal
+        self.rebuild_unit_index()
 
     def auto_convert(self, value: float, unit: str, decimal: int = None) -> tuple[float, str]:
         """
@@ -182,34 +328,11 @@ class SimpleUnitConverter(BaseUnitConverter):
         if not unit:
             return round(value, decimal), ""
 
-        # 查找单位所属的组
-        unit_group = None
-        for _group_name, units in self.UNIT_GROUPS.items():
-            if unit in units:
-                unit_group = units
-                break
-
-        if not unit_group:
+        scale = self.unit_scale(unit)
+        if scale is None:
             return round(value, decimal), unit
 
-        # 先转换为最小单位
-        min_value = self.convert(value, unit, None)
-
-        # 找到最合适的单位
-        best_unit = unit_group[0]
-        best_value = min_value
-
-        for target_unit in unit_group:
-            multiplier = self.UNIT_MULTIPLIERS.get(target_unit, 1)
-            converted = min_value / multiplier if multiplier else min_value
-
-            # 选择使值在 1-1000 范围内的单位
-            if 1 <= abs(converted) < 1000 or target_unit == unit_group[-1]:
-                best_unit = target_unit
-                best_value = converted
-                break
-
-        return round(best_value, decimal), best_unit
+        return self._scale_auto_convert(value, scale, unit, decimal)
 
     def get_unit_suffix(self, unit: str) -> str:
         """
@@ -260,6 +383,7 @@ class MappedUnitConverter(BaseUnitConverter):
         self.UNIT_MULTIPLIERS = unit_multipliers or {}
         self.UNIT_GROUPS = unit_groups or {}
         self.default_decimal = default_decimal
+        self.rebuild_unit_index()
 
     def add_unit(self, unit: str, multiplier: float, group: str | None = None):
         """
@@ -278,6 +402,8 @@ class MappedUnitConverter(BaseUnitConverter):
             if unit not in self.UNIT_GROUPS[group]:
                 self.UNIT_GROUPS[group].append(unit)
 
+        self.rebuild_unit_index()
+
     def auto_convert(self, value: float, unit: str, decimal: int = None) -> tuple[float, str]:
         """
         自动选择最佳单位进行转换
@@ -288,30 +414,14 @@ class MappedUnitConverter(BaseUnitConverter):
         if not unit or unit not in self.UNIT_MULTIPLIERS:
             return round(value, decimal), unit
 
-        # 查找单位所属的组
-        unit_group = None
-        for _group_name, units in self.UNIT_GROUPS.items():
-            if unit in units:
-                unit_group = units
-                break
-
-        if not unit_group:
+        scale = self.unit_scale(unit)
+        if scale is None:
             return round(value, decimal), unit
 
-        # 先转换为最小单位
-        min_value = self.convert(value, unit, None)
-
-        # 找到最合适的单位
-        best_unit = unit_group[0]
-        best_value = min_value
+        return self._scale_auto_convert(value, scale, unit, decimal)
 
-        for target_unit in unit_group:
-            multiplier = self.UNIT_MULTIPLIERS.get(target_unit, 1)
-            converted = min_value / multiplier if multiplier else min_value
-
-            if 1 <= abs(converted) < 1000 or target_unit == unit_group[-1]:
-                best_unit = target_unit
-                best_value = converted
-                break
-
-        return round(best_value, decimal), best_unit
+    def _auto_convert_scale(self, unit: str) -> UnitScale | None:
+        """auto_convert 使用的选择表，不做单位换算时返回 None"""
+        if not unit or unit not in self.UNIT_MULTIPLIERS:
+            return None
+        return self.unit_scale(unit)
@@ -2,9 +2,18 @@
 TsDetect 工具模块
 """
 
-from tsdetect.utils.expression import ExpressionBuilder, safe_eval
+from tsdetect.utils.expression import CompiledExpression, ExpressionBuilder, compile_expression, safe_eval
+from tsdetect.utils.optional import require_numpy
+from tsdetect.utils.template import FormatTemplateEngine, TemplateCache, compile_format_template, get_template_cache
 
 __all__ = [
     "ExpressionBuilder",
+    "CompiledExpression",
+    "compile_expression",
     "safe_eval",
+    "FormatTemplateEngine",
+    "TemplateCache",
+    "compile_format_template",
+    "get_template_cache",
+    "require_numpy",
 ]
@@ -5,9 +5,14 @@ TsDetect 工具模块 - 表达式处理
 """
 
 import ast
+import builtins
+import functools
 import logging
+from collections.abc import Callable, Mapping
 from typing import Any
 
+from tsdetect.core.exceptions import ExpressionError
+
 logger = logging.getLogger(__name__)
 
 
@@ -58,6 +63,11 @@ ALLOWED_OPS = {
     ast.USub,
 }
 
+# 编译后的表达式可直接引用的内置函数（True/False/None 为关键字，无需绑定）
+SAFE_BUILTINS: dict[str, Any] = {
+    name: getattr(builtins, name) for name in ALLOWED_BUILTINS if name not in ("True", "False", "None")
+}
+
 
 class ExpressionValidator(ast.NodeVisitor):
     """
@@ -158,6 +168,225 @@ def safe_eval(expr: str, context: dict[str, Any], validate: bool = True) -> Any:
         raise ValueError(f"Expression evaluation failed: {e}") from None
 
 
+# 检测上下文提供的函数（见 BaseAlgorithm.get_context），未指定上下文变量时允许调用
+CONTEXT_FUNCTIONS = frozenset({"unit_convert_min", "unit_auto_convert"})
+
+
+class _CompileValidator(ExpressionValidator):
+    """
+    编译期验证器
+
+    在 ExpressionValidator 白名单的基础上按作用域分析名称：lambda 参数和推导式变量只在各自的作用域内有效，
+    同名变量在外层作用域中的引用仍然是自由变量（上下文变量）。
+
+    函数调用只允许调用内置函数、上下文函数、作用域内绑定的名称、方法和表达式内定义的 lambda；
+    指定上下文变量时，引用的自由变量也必须是上下文变量。
+    """
+
+    def __init__(self, context_names: frozenset[str] | None = None):
+        """
+        初始化验证器
+
+        Args:
+            context_names: 上下文变量名集合，None 表示自由变量在执行时从上下文读取，不做检查
+        """
+        super().__init__(set(context_names or ()))
+        self.context_names = context_names
+        # 内层作用域栈：(是否为推导式, 绑定的名称)
+        self.scopes: list[tuple[bool, set[str]]] = []
+        # 顶层作用域中由海象表达式绑定的名称
+        self.top_bound: set[str] = set()
+        # 自由变量 -> 首次出现的位置
+        self.free: dict[str, tuple[int, int]] = {}
+
+    @property
+    def names(self) -> tuple[str, ...]:
+        """按首次出现顺序排列的自由变量"""
+        return tuple(sorted(self.free, key=self.free.__getitem__))
+
+    def _is_bound(self, name: str) -> bool:
+        return name in self.top_bound or any(name in bound for _, bound in self.scopes)
+
+    def _bind_target(self, target: ast.AST, bound: set[str]):
+        """绑定推导式的循环变量，非名称的部分按普通表达式检查"""
+        if isinstance(target, ast.Name):
+            bound.add(target.id)
+        elif isinstance(target, ast.Tuple | ast.List):
+            for elt in target.elts:
+                self._bind_target(elt, bound)
+        elif isinstance(target, ast.Starred):
+            self._bind_target(target.value, bound)
+        else:
+            self.visit(target)
+
+    def _load(self, node: ast.Name, is_call: bool = False):
+        name = node.id
+        if self._is_bound(name) or name in ALLOWED_BUILTINS:
+            return
+        if self.context_names is not None:
+            if name not in self.context_names:
+                kind = "function" if is_call else "variable"
+                self.errors.append(f"Undefined {kind}: {name}")
+        elif is_call and name not in CONTEXT_FUNCTIONS:
+            self.errors.append(f"Undefined function: {name}")
+        self.free.setdefault(name, (node.lineno, node.col_offset))
+
+    def visit_Name(self, node):  # noqa: N802
+        """记录自由变量并检查变量名"""
+        if isinstance(node.ctx, ast.Load):
+            self._load(node)
+
+    def visit_Call(self, node):  # noqa: N802
+        """检查函数调用"""
+        func = node.func
+        if isinstance(func, ast.Name):
+            self._load(func, is_call=True)
+        elif isinstance(func, ast.Attribute | ast.Lambda):
+            self.visit(func)
+        else:
+            self.errors.append("Invalid function call")
+        for arg in node.args:
+            self.visit(arg)
+        for keyword in node.keywords:
+            self.visit(keyword.value)
+
+    def visit_Lambda(self, node):  # noqa: N802
+        """lambda 参数只在函数体内有效，默认值在外层作用域求值"""
+        for default in [*node.args.defaults, *node.args.kw_defaults]:
+            if default is not None:
+                self.visit(default)
+        args = node.args
+        params = [*args.posonlyargs, *args.args, *args.kwonlyargs, args.vararg, args.kwarg]
+        self.scopes.append((False, {arg.arg for arg in params if arg is not None}))
+        self.visit(node.body)
+        self.scopes.pop()
+
+    def visit_NamedExpr(self, node):  # noqa: N802
+        """海象表达式绑定到最近的非推导式作用域"""
+        self.visit(node.value)
+        for is_comprehension, bound in reversed(self.scopes):
+            if not is_comprehension:
+                bound.add(node.target.id)
+                return
+        self.top_bound.add(node.target.id)
+
+    def _comprehension(self, node, *elements: ast.AST):
+        """第一个迭代对象在外层作用域求值，其余部分在推导式作用域内"""
+        bound: set[str] = set()
+        for i, generator in enumerate(node.generators):
+            if i == 0:
+                self.visit(generator.iter)
+                self.scopes.append((True, bound))
+            else:
+                self.visit(generator.iter)
+            self._bind_target(generator.target, bound)
+            for condition in generator.ifs:
+                self.visit(condition)
+        for element in elements:
+            self.visit(element)
+        self.scopes.pop()
+
+    def visit_ListComp(self, node):  # noqa: N802
+        self._comprehension(node, node.elt)
+
+    visit_SetComp = visit_ListComp  # noqa: N815
+    visit_GeneratorExp = visit_ListComp  # noqa: N815
+
+    def visit_DictComp(self, node):  # noqa: N802
+        self._comprehension(node, node.key, node.value)
+
+
+class CompiledExpression:
+    """
+    编译后的检测表达式
+
+    表达式被改写为一个以自由变量为位置参数的 Python 函数，
+    求值时只需要取出 names 中的变量，变量访问走函数局部变量而不是字典查找。
+    """
+
+    __slots__ = ("expr", "names", "func")
+
+    def __init__(self, expr: str, names: tuple[str, ...], func: Callable[..., Any]):
+        self.expr = expr
+        self.names = names
+        self.func = func
+
+    def __call__(self, *args) -> Any:
+        """按 names 的顺序传入变量值执行表达式"""
+        return self.func(*args)
+
+    def evaluate(self, context: Mapping[str, Any]) -> Any:
+        """
+        从上下文中取出表达式引用的变量并执行
+
+        Args:
+            context: 执行上下文
+
+        Returns:
+            执行结果
+
+        Raises:
+            KeyError: 上下文缺少表达式引用的变量
+        """
+        return self.func(*[context[name] for name in self.names])
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} expr={self.expr!r} names={self.names}>"
+
+
+@functools.lru_cache(maxsize=1024)
+def compile_expression(expr: str, context_names: frozenset[str] | None = None) -> CompiledExpression:
+    """
+    将检测表达式编译为 Python 函数
+
+    相同的表达式只会编译一次（进程内缓存）。表达式内的 lambda 和推导式保留各自的作用域，
+    只有外层作用域引用的自由变量会成为函数参数。
+
+    Args:
+        expr: 表达式字符串
+        context_names: 上下文变量名集合，指定时引用其他名称的表达式在编译时被拒绝；
+            None 表示自由变量在执行时从上下文读取，只允许调用内置函数和上下文函数
+
+    Returns:
+        编译后的表达式
+
+    Raises:
+        ExpressionError: 表达式语法错误或包含不安全的操作
+    """
+    try:
+        tree = ast.parse(expr, mode="eval")
+    except SyntaxError as e:
+        raise ExpressionError(f"Failed to compile expression: {e}", expression=expr) from None
+
+    validator = _CompileValidator(context_names)
+    validator.visit(tree)
+    if validator.errors:
+        raise ExpressionError(f"Unsafe expression: {'; '.join(validator.errors)}", expression=expr)
+    names = validator.names
+
+    # 改写为 lambda <names>: <expr>
+    func_node = ast.Expression(
+        body=ast.Lambda(
+            args=ast.arguments(
+                posonlyargs=[],
+                args=[ast.arg(arg=name) for name in names],
+                kwonlyargs=[],
+                kw_defaults=[],
+                defaults=[],
+            ),
+            body=tree.body,
+        )
+    )
+    try:
+        code = compile(ast.fix_missing_locations(func_node), "<tsdetect-expr>", "eval")
+    except SyntaxError as e:
+        # 如推导式中的海象表达式重新绑定循环变量
+        raise ExpressionError(f"Failed to compile expression: {e}", expression=expr) from None
+    func = eval(code, {"__builtins__": {}, **SAFE_BUILTINS})
+
+    return CompiledExpression(expr, names, func)
+
+
 class ExpressionBuilder:
     """
     表达式构建器
@@ -0,0 +1,28 @@
+"""
+TsDetect 工具模块 - 可选依赖
+
+numpy 为可选依赖（tsdetect[full]），需要它的模块统一从这里导入 np 和 require_numpy。
+"""
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy 为可选依赖（tsdetect[full]）
+    np = None
+
+
+def require_numpy(feature: str = "tsdetect.batch"):
+    """
+    确保 numpy 可用
+
+    Args:
+        feature: 需要 numpy 的功能名称，用于错误信息
+
+    Returns:
+        numpy 模块
+
+    Raises:
+        ImportError: 未安装 numpy
+    """
+    if np is None:
+        raise ImportError(f"{feature} requires numpy, install it with `pip install tsdetect[full]`")
+    return np
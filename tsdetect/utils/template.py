@@ -0,0 +1,211 @@
+"""
+TsDetect 工具模块 - 消息模板
+
+提供编译后模板的缓存，以及基于 str.format 的快速模板引擎。
+"""
+
+import functools
+import re
+import string
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping
+from typing import Any
+
+from tsdetect.core.interfaces import ITemplateEngine
+
+# 编译失败（或模板引擎不支持编译）的标记，之后直接调用 render
+UNCOMPILED = object()
+
+_FIELD_ROOT = re.compile(r"[.\[]")
+
+
+def _field_names(template: str) -> tuple[str, ...]:
+    """解析模板引用的上下文变量名（字段的根名称，包括格式说明中的嵌套字段）"""
+    names = []
+    for _literal, field_name, format_spec, _conversion in string.Formatter().parse(template):
+        if field_name is None:
+            continue
+        root = _FIELD_ROOT.split(field_name, 1)[0]
+        if root and not root.isdigit():
+            names.append(root)
+        if format_spec and "{" in format_spec:
+            names.extend(_field_names(format_spec))
+    return tuple(dict.fromkeys(names))
+
+
+class CompiledFormatTemplate:
+    """
+    编译后的 str.format 模板
+
+    Attributes:
+        template: 模板字符串
+        names: 模板引用的上下文变量名
+    """
+
+    __slots__ = ("template", "names")
+
+    def __init__(self, template: str):
+        self.template = template
+        self.names = _field_names(template)
+
+    def render(self, context: Mapping[str, Any]) -> str:
+        """
+        渲染模板，只读取模板引用的变量
+
+        Args:
+            context: 上下文（可以是惰性映射）
+
+        Returns:
+            渲染后的字符串
+
+        Raises:
+            KeyError: 模板引用的变量不存在
+        """
+        values = {name: context[name] for name in self.names if name in context}
+        return self.template.format_map(values)
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} names={list(self.names)}>"
+
+
+@functools.lru_cache(maxsize=1024)
+def compile_format_template(template: str) -> CompiledFormatTemplate:
+    """
+    编译 str.format 模板（进程内缓存）
+
+    Args:
+        template: 模板字符串
+
+    Returns:
+        编译后的模板
+
+    Raises:
+        ValueError: 模板格式错误
+    """
+    return CompiledFormatTemplate(template)
+
+
+class FormatTemplateEngine(ITemplateEngine):
+    """
+    基于 str.format 的模板引擎
+
+    编译时用 string.Formatter().parse 解析出模板引用的变量，
+    渲染时只从上下文中读取这些变量，惰性上下文中其他变量不会被计算。
+    """
+
+    lazy_context = True
+
+    def render(self, template: str, context: Mapping[str, Any]) -> str:
+        """渲染模板"""
+        return compile_format_template(template).render(context)
+
+    def compile(self, template: str) -> CompiledFormatTemplate:
+        """编译模板"""
+        return compile_format_template(template)
+
+    def render_compiled(self, compiled: CompiledFormatTemplate, context: Mapping[str, Any]) -> str:
+        """使用编译后的模板渲染"""
+        return compiled.render(context)
+
+
+class TemplateCache:
+    """
+    编译后模板的缓存
+
+    以（模板引擎, 模板）为键的 LRU 缓存，线程安全，每个模板在每个引擎上只编译一次。
+    编译失败的模板记为 UNCOMPILED，之后直接调用引擎的 render。
+    """
+
+    def __init__(self, maxsize: int | None = 4096):
+        """
+        初始化模板缓存
+
+        Args:
+            maxsize: 最多缓存的模板数，None 表示不限制
+        """
+        self.maxsize = maxsize
+        # 值中保存引擎引用，保证引擎标识在条目被淘汰前不会被复用
+        self._data: OrderedDict[tuple[int, str], tuple[ITemplateEngine, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+        # 统计信息
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, engine: ITemplateEngine, template: str) -> Any:
+        """
+        获取编译后的模板，不存在时编译并缓存
+
+        Args:
+            engine: 模板引擎
+            template: 模板字符串
+
+        Returns:
+            编译后的模板，编译失败返回 UNCOMPILED
+        """
+        key = (id(engine), template)
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] is engine:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        try:
+            compiled = engine.compile(template)
+        except Exception:
+            compiled = UNCOMPILED
+        # 默认的 render_compiled 需要编译结果提供 render 方法
+        default_render = type(engine).render_compiled is ITemplateEngine.render_compiled
+        if compiled is None or (default_render and not hasattr(compiled, "render")):
+            compiled = UNCOMPILED
+
+        with self._lock:
+            self._data[key] = (engine, compiled)
+            self._data.move_to_end(key)
+            if self.maxsize is not None:
+                while len(self._data) > self.maxsize:
+                    self._data.popitem(last=False)
+        return compiled
+
+    def render(self, engine: ITemplateEngine, template: str, context: Mapping[str, Any]) -> str:
+        """
+        使用编译后的模板渲染
+
+        引擎声明 lazy_context 时直接传入（惰性）上下文，否则传入上下文的字典副本。
+
+        Args:
+            engine: 模板引擎
+            template: 模板字符串
+            context: 上下文
+
+        Returns:
+            渲染后的字符串
+        """
+        values = context if engine.lazy_context else dict(context)
+        compiled = self.get(engine, template)
+        if compiled is UNCOMPILED:
+            return engine.render(template, values)
+        return engine.render_compiled(compiled, values)
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} size={len(self)} hits={self.hits} misses={self.misses}>"
+
+
+# 进程级默认模板缓存
+_default_cache = TemplateCache()
+
+
+def get_template_cache() -> TemplateCache:
+    """获取进程级默认模板缓存"""
+    return _default_cache